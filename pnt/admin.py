@@ -1,23 +1,229 @@
+# -*- coding: utf-8 -*-
 from models import *
+from categories import CategoricalChoiceField, field_group, is_categorical
+from pagination import EstimatedCountPaginator, KeysetPaginator
+from instrumentation import instrumented_view
+from summary import appointment_summaries
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList, ALL_VAR, ORDER_VAR
+from django.core.paginator import InvalidPage
+from django.db.models import F
+from django.utils.text import capfirst
 
 
-class HipChemTakenAdmin(admin.ModelAdmin):
-    list_display = ('casehistory', 'hipotension_chemical')
-    search_fields = ('casehistory__patient__last_name',)
+class CategoricalChoicesMixin(object):
+    """
+    Pola CategoricalValue z grupą w limit_choices_to mają wybory i walidację
+    z rejestru categories zamiast zapytania z JOIN-em do grup dla każdego pola;
+    pola bez grupy zostają przy domyślnym querysecie Django.
+    """
+    def formfield_for_foreignkey(self, db_field, request=None, **kwargs):
+        if (is_categorical(db_field) and field_group(db_field) is not None and 'queryset' not in kwargs
+                and db_field.name not in self.raw_id_fields):
+            return CategoricalChoiceField(field_group(db_field), required=not db_field.blank,
+                                          label=capfirst(db_field.verbose_name), help_text=db_field.help_text,
+                                          **kwargs)
+        return super(CategoricalChoicesMixin, self).formfield_for_foreignkey(db_field, request, **kwargs)
 
 
-admin.site.register(Patient)
-admin.site.register(Address)
-admin.site.register(Disease)
-admin.site.register(CaseHistory)
-admin.site.register(HipotensionChemical)
-admin.site.register(HipotensionChemicalTaken, HipChemTakenAdmin)
-admin.site.register(PharmaGroup)
-admin.site.register(ChemicalInternationalType)
-admin.site.register(Etiology)
-admin.site.register(Meal)
-admin.site.register(Appointment)
+class PNTModelAdmin(CategoricalChoicesMixin, admin.ModelAdmin):
+    @instrumented_view
+    def changelist_view(self, request, extra_context=None):
+        return super(PNTModelAdmin, self).changelist_view(request, extra_context)
+
+    @instrumented_view
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        return super(PNTModelAdmin, self).change_view(request, object_id, form_url, extra_context)
+
+
+class PatientSearchMixin(object):
+    """
+    Wyszukiwanie w liście zmian przez Patient.objects.search() - indeksowane
+    prefiksy nazwiska, imienia, PESEL-u i telefonu. patient_lookup to ścieżka
+    od modelu admina do pacjenta (pusta dla samego Patient).
+    """
+    patient_lookup = ''
+
+    def _patient_path(self, field):
+        return '%s__%s' % (self.patient_lookup, field) if self.patient_lookup else field
+
+    def get_search_fields(self, request):
+        return (self._patient_path('last_name_search'),)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        patients = Patient.objects.search(search_term).values('pk')
+        return queryset.filter(**{self._patient_path('pk__in'): patients}), False
+
+
+class PatientAdmin(PatientSearchMixin, PNTModelAdmin):
+    list_display = ('last_name', 'first_name', 'pesel', 'phone')
+
+
+class LargeTableAdmin(PNTModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class VisitSectionAdmin(PatientSearchMixin, LargeTableAdmin):
+    """
+    Sekcje wizyty, których __unicode__ sięga do appointment.patient:
+    pacjent dociągany jest JOIN-em, a kolumny daty i pacjenta pochodzą z adnotacji.
+    """
+    list_display = ('__str__', 'appointment_date', 'patient_name')
+    list_select_related = ('appointment__patient',)
+    patient_lookup = 'appointment__patient'
+
+    def get_queryset(self, request):
+        return super(VisitSectionAdmin, self).get_queryset(request).annotate(
+            _appointment_date=F('appointment__date'),
+            _patient_last_name=F('appointment__patient__last_name'),
+            _patient_first_name=F('appointment__patient__first_name'))
+
+    def appointment_date(self, obj):
+        return obj._appointment_date
+    appointment_date.short_description = "Data wizyty"
+    appointment_date.admin_order_field = '_appointment_date'
+
+    def patient_name(self, obj):
+        return u"%s %s" % (obj._patient_last_name, obj._patient_first_name)
+    patient_name.short_description = "Pacjent"
+    patient_name.admin_order_field = '_patient_last_name'
+
+
+class HipotensionChemicalAdmin(PNTModelAdmin):
+    list_display = ('name', 'international_name_name', 'pharma_group_name')
+    list_select_related = ('international_name', 'pharma_group')
+
+    def get_queryset(self, request):
+        return super(HipotensionChemicalAdmin, self).get_queryset(request).annotate(
+            _international_name=F('international_name__name'),
+            _pharma_group=F('pharma_group__name'))
+
+    def international_name_name(self, obj):
+        return obj._international_name
+    international_name_name.short_description = "Nazwa międzynarodowa"
+    international_name_name.admin_order_field = '_international_name'
 
+    def pharma_group_name(self, obj):
+        return obj._pharma_group
+    pharma_group_name.short_description = "Grupa farmakoterapeutyczna"
+    pharma_group_name.admin_order_field = '_pharma_group'
 
 
+# parametry kursora listy stronicowanej kluczem
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Lista zmian stronicowana kluczem model_admin.keyset_keys (KeysetPaginator)
+    zamiast OFFSET, dopóki nie wybrano sortowania kolumny (?o=) ani "pokaż
+    wszystko" - wtedy zwykłe stronicowanie. Strony wskazują parametry
+    ?after=/?before= z kursorem; liczba wyników pochodzi z paginatora admina.
+    """
+    def __init__(self, request, *args, **kwargs):
+        # kursor nie jest filtrem - ChangeList odrzuciłby nieznany parametr
+        self.cursor = dict((name, request.GET[name]) for name in (AFTER_VAR, BEFORE_VAR) if name in request.GET)
+        if self.cursor:
+            request.GET = request.GET.copy()
+            for name in self.cursor:
+                del request.GET[name]
+        self.keyset_page = None
+        super(KeysetChangeList, self).__init__(request, *args, **kwargs)
+
+    def get_results(self, request):
+        keys = getattr(self.model_admin, 'keyset_keys', None)
+        if not keys or ORDER_VAR in self.params or ALL_VAR in self.params:
+            return super(KeysetChangeList, self).get_results(request)
+        try:
+            page = KeysetPaginator(self.queryset, keys, self.list_per_page).page(
+                self.cursor.get(AFTER_VAR), self.cursor.get(BEFORE_VAR))
+        except InvalidPage:
+            raise IncorrectLookupParameters
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = page.has_next() or page.has_previous()
+        self.result_list = page.object_list
+        self.keyset_page = page
+
+    def next_url(self):
+        return self.get_query_string({AFTER_VAR: self.keyset_page.next_cursor})
+
+    def previous_url(self):
+        return self.get_query_string({BEFORE_VAR: self.keyset_page.previous_cursor})
+
+
+class SummaryChangeList(KeysetChangeList):
+    """Podsumowania wizyt ze strony listy pobierane jednym odczytem z summary."""
+    def get_results(self, request):
+        super(SummaryChangeList, self).get_results(request)
+        summaries = appointment_summaries([obj.pk for obj in self.result_list])
+        for obj in self.result_list:
+            obj._summary = summaries.get(obj.pk) or {}
+
+
+class AppointmentAdmin(PatientSearchMixin, LargeTableAdmin):
+    """
+    Wizyty od najnowszych stronicowane kluczem jak Appointment.objects.timeline();
+    lista jednego pacjenta to filtr ?patient__id__exact=<id>.
+    """
+    list_display = ('__str__', 'date', 'time', 'sf36_total', 'epworth_points', 'apnoea_at_risk', 'medications')
+    list_select_related = ('patient',)
+    patient_lookup = 'patient'
+    ordering = TIMELINE_KEYS
+    keyset_keys = TIMELINE_KEYS
+
+    def get_changelist(self, request, **kwargs):
+        return SummaryChangeList
+
+    def sf36_total(self, obj):
+        return obj._summary.get('sf36_total')
+    sf36_total.short_description = "SF-36"
+
+    def epworth_points(self, obj):
+        return obj._summary.get('epworth_points')
+    epworth_points.short_description = "Epworth"
+
+    def apnoea_at_risk(self, obj):
+        return obj._summary.get('apnoea_at_risk')
+    apnoea_at_risk.short_description = "Ryzyko bezdechu"
+    apnoea_at_risk.boolean = True
+
+    def medications(self, obj):
+        return obj._summary.get('medications')
+    medications.short_description = "Leki"
+
+
+class HipChemTakenAdmin(PatientSearchMixin, LargeTableAdmin):
+    list_display = ('casehistory', 'hipotension_chemical')
+    list_select_related = ('casehistory__appointment__patient',
+                           'hipotension_chemical__international_name', 'hipotension_chemical__pharma_group')
+    patient_lookup = 'casehistory__appointment__patient'
+
+
+admin.site.register(Patient, PatientAdmin)
+admin.site.register(Address, PNTModelAdmin)
+admin.site.register(Disease, PNTModelAdmin)
+admin.site.register(CaseHistory, VisitSectionAdmin)
+admin.site.register(HipotensionChemical, HipotensionChemicalAdmin)
+admin.site.register(HipotensionChemicalTaken, HipChemTakenAdmin)
+admin.site.register(PharmaGroup, PNTModelAdmin)
+admin.site.register(ChemicalInternationalType, PNTModelAdmin)
+admin.site.register(Etiology, VisitSectionAdmin)
+admin.site.register(Meal, PNTModelAdmin)
+admin.site.register(Appointment, AppointmentAdmin)
+admin.site.register(Antropometrics, VisitSectionAdmin)
+admin.site.register(BodyPressure, VisitSectionAdmin)
+admin.site.register(HeartEcho, VisitSectionAdmin)
+admin.site.register(Biochemistry, VisitSectionAdmin)
+admin.site.register(ABI, VisitSectionAdmin)
+admin.site.register(CartoidUSG, VisitSectionAdmin)
+admin.site.register(EKG, VisitSectionAdmin)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from django.apps import AppConfig, apps
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_save, post_delete, pre_save
+
+
+class PntConfig(AppConfig):
+    name = 'pnt'
+    verbose_name = u"Poradnia Nadciśnienia Tętniczego"
+
+    def ready(self):
+        from pnt.categories import invalidate_registry
+        for model in apps.get_app_config('records').get_models():
+            for name, signal in (('save', post_save), ('delete', post_delete)):
+                signal.connect(invalidate_registry, sender=model,
+                               dispatch_uid="pnt_categories_%s_%s" % (model._meta.model_name, name))
+
+        from pnt.summary import appointment_paths, invalidate_instance
+        for model in appointment_paths():
+            for name, signal in (('save', post_save), ('delete', post_delete)):
+                signal.connect(invalidate_instance, sender=model,
+                               dispatch_uid="pnt_summary_%s_%s" % (model._meta.model_name, name))
+
+        from pnt.bitmaps import indexed_fields, remember_patient, update_index
+        from pnt.models import Appointment, Patient
+        pre_save.connect(remember_patient, sender=Appointment, dispatch_uid="pnt_bitmaps_appointment_pre_save")
+        for model in [Appointment, Patient] + [model for model, _ in indexed_fields()]:
+            for name, signal in (('save', post_save), ('delete', post_delete)):
+                signal.connect(update_index, sender=model,
+                               dispatch_uid="pnt_bitmaps_%s_%s" % (model._meta.model_name, name))
+
+        from pnt.routers import finish, reset, written
+        request_started.connect(reset, dispatch_uid="pnt_routers_reset")
+        request_finished.connect(finish, dispatch_uid="pnt_routers_finish")
+        post_save.connect(written, dispatch_uid="pnt_routers_written")
+        # post_delete tylko dla modeli, które i tak mają już odbiorców - odbiorca bez
+        # nadawcy wyłączyłby szybkie usuwanie (bez wczytywania wierszy) wszystkich modeli
+        for model in set(appointment_paths()) | {Patient} | set(model for model, _ in indexed_fields()):
+            post_delete.connect(written, sender=model, dispatch_uid="pnt_routers_written_%s" % model._meta.model_name)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark najcięższych ścieżek PNT na syntetycznych danych.
+
+FixtureGenerator tworzy N pacjentów z M wizytami, każda ze wszystkimi
+sekcjami i tabelami pośrednimi. Wartości dobierane są z _meta modeli
+(choices, typ pola, zakresy z RANGES), wartości CategoricalValue tworzone są
+dla każdej grupy używanej przez pola PNT - kwestionariusze SF-36 wypełniane
+są w całości, żeby punktacja dawała poprawne wyniki.
+
+run_benchmarks() mierzy czas i liczbę zapytań dla wariantów "po instancji"
+i wsadowych oraz renderowania list w panelu administracyjnym i zwraca
+słownik gotowy do zapisania jako JSON (patrz komenda benchmark).
+"""
+import datetime
+import random
+from timeit import default_timer
+
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.urlresolvers import reverse
+from django.db import connections, router, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from categories import field_group, is_categorical, registry
+from history import bulk_create_with_history
+from importer import Node, VisitImporter
+from models import (Patient, Appointment, LifeQuality, Apnoea, SF36Score, BodyPressure, HipotensionChemicalTaken,
+                    APPOINTMENT_SECTIONS, child_relations)
+from pesel import MONTH_OFFSETS
+from scorecards import apnoea_records, lifequality_records
+
+
+# liczba pozycji w grupach kwestionariusza SF-36 (waga = numer pozycji)
+SF36_ITEMS = {'activitylimit': 10, 'healthproblem': 4, 'emotionalproblem': 3, 'moodsymptom': 9, 'healthselfopinion': 4}
+# kwestionariusze, w których tabele pośrednie mają wiersz dla każdej wartości grupy
+COMPLETE_MODELS = (LifeQuality,)
+CATEGORY_SIZE = 6
+POOL_SIZE = 8
+MAX_CHILDREN = 3
+
+# realistyczne zakresy dla wybranych pól liczbowych (nazwa pola -> (od, do))
+RANGES = {
+    'systolic_left': (100, 190), 'systolic_right': (100, 190), 'sbp': (100, 190),
+    'diastolic_left': (60, 115), 'diastolic_right': (60, 115), 'dbp': (60, 115),
+    'left_side': (0.6, 1.4), 'right_side': (0.6, 1.4),
+    'weight': (50, 130), 'height': (150, 200), 'weist_perimeter': (60, 140),
+    'diagnosis_year': (1980, 2012),
+}
+DOSES = (u"1", u"2", u"1/2", u"½", u"0", u"")
+FIRST_NAMES = (u"Anna", u"Maria", u"Katarzyna", u"Małgorzata", u"Jan", u"Andrzej", u"Piotr", u"Krzysztof", u"Łukasz")
+LAST_NAMES = (u"Nowak", u"Kowalski", u"Wiśniewski", u"Wójcik", u"Kowalczyk", u"Kamiński", u"Lewandowski", u"Zieliński")
+WORDS = (u"brak", u"umiarkowany", u"łagodny", u"prawidłowy", u"nieznaczny", u"znaczny", u"okresowy", u"stały")
+
+ADMIN_CHANGELISTS = (Patient, Appointment, BodyPressure, HipotensionChemicalTaken)
+
+
+def _pesel(birth_date, serial):
+    offset = [offset for offset, century in MONTH_OFFSETS if century <= birth_date.year < century + 100][0]
+    digits = '%02d%02d%02d%04d' % (birth_date.year % 100, birth_date.month + offset, birth_date.day, serial % 10000)
+    checksum = sum(int(digit) * weight for digit, weight in zip(digits, (1, 3, 7, 9) * 3)) % 10
+    return digits + str((10 - checksum) % 10)
+
+
+class FixtureGenerator(object):
+    def __init__(self, seed=0, using=None):
+        self.random = random.Random(seed)
+        self.using = using or router.db_for_write(Appointment)
+        self._categories = {}
+        self._pools = {}
+        self._counter = 0
+
+    # --- wartości pól ---
+
+    def _unique(self, model):
+        self._counter += 1
+        return u"%s %d" % (model._meta.model_name, self._counter)
+
+    def _value(self, model, field):
+        rnd = self.random
+        if field.choices:
+            return rnd.choice([key for key, _ in field.flatchoices])
+        if field.name in RANGES:
+            low, high = RANGES[field.name]
+            if field.get_internal_type() == 'FloatField':
+                return round(rnd.uniform(low, high), 2)
+            return rnd.randint(low, high)
+        kind = field.get_internal_type()
+        if field.name.endswith('_dose'):
+            return rnd.choice(DOSES)
+        if kind == 'EmailField':
+            return u"%s@example.com" % self._unique(model).replace(u" ", u".")
+        if kind == 'CharField':
+            unique = field.unique or any(field.name in fields for fields in model._meta.unique_together)
+            value = self._unique(model) if unique else rnd.choice(WORDS)
+            return value[:field.max_length]
+        if kind == 'TextField':
+            return u" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 8)))
+        if kind in ('IntegerField', 'PositiveIntegerField', 'SmallIntegerField', 'PositiveSmallIntegerField',
+                    'BigIntegerField'):
+            return rnd.randint(0, 20)
+        if kind in ('FloatField', 'DecimalField'):
+            return round(rnd.uniform(0.5, 150), 2)
+        if kind in ('BooleanField', 'NullBooleanField'):
+            return rnd.random() < 0.3
+        if kind == 'DateField':
+            return datetime.date(2005, 1, 1) + datetime.timedelta(days=rnd.randint(0, 3650))
+        if kind == 'TimeField':
+            return datetime.time(rnd.randint(8, 15), rnd.choice((0, 15, 30, 45)))
+        if kind == 'DateTimeField':
+            return datetime.datetime(2005, 1, 1) + datetime.timedelta(minutes=rnd.randint(0, 3650 * 24 * 60))
+        return u""
+
+    def _related(self, field):
+        if is_categorical(field):
+            return self.random.choice(self.category_ids(field_group(field) or field.name))
+        return self.random.choice(self.pool(field.related_model))
+
+    def _fill(self, model, exclude=(), **values):
+        """Niezapisana instancja z wartościami z values i losowymi dla pozostałych pól."""
+        for field in model._meta.concrete_fields:
+            if field.primary_key or not field.editable or field.name in exclude or field.attname in values:
+                continue
+            if field.is_relation:
+                values[field.attname] = self._related(field)
+            else:
+                values[field.attname] = self._value(model, field)
+        return model(**values)
+
+    # --- słowniki ---
+
+    def category_ids(self, group):
+        """Id wartości CategoricalValue grupy (tworzonych przy pierwszym użyciu), w kolejności wag."""
+        if group not in self._categories:
+            model = apps.get_model('records', 'CategoricalValue')
+            group_field = model._meta.get_field('group')
+            group_obj = self._fill(group_field.related_model, name=group)
+            group_obj.save(using=self.using)
+            ids = []
+            for weight in range(1, SF36_ITEMS.get(group, CATEGORY_SIZE) + 1):
+                value = self._fill(model, **{group_field.attname: group_obj.pk, 'weight': weight})
+                value.save(using=self.using)
+                ids.append(value.pk)
+            self._categories[group] = ids
+        return self._categories[group]
+
+    def pool(self, model):
+        """Id kilku obiektów modelu słownikowego (np. HipotensionChemical) tworzonych przy pierwszym użyciu."""
+        if model not in self._pools:
+            objs = [self._fill(model) for _ in range(POOL_SIZE)]
+            for obj in objs:
+                obj.save(using=self.using)
+            self._pools[model] = [obj.pk for obj in objs]
+        return self._pools[model]
+
+    # --- pacjenci i wizyty ---
+
+    def _node(self, model, parent=None, parent_field=None, **values):
+        node = Node(self._fill(model, exclude=(parent_field,), **values), parent, parent_field)
+        for _, related in sorted(child_relations(model).items()):
+            child, child_parent = related.related_model, related.field.name
+            if related.one_to_one:
+                node.children.append(self._node(child, node, child_parent))
+                continue
+            # pierwsze pole relacji poza rodzicem wyznacza wiersz tabeli pośredniej (unique_together)
+            items = [field for field in child._meta.concrete_fields if field.is_relation and field.name != child_parent]
+            if not items:
+                for _ in range(self.random.randint(0, MAX_CHILDREN)):
+                    node.children.append(self._node(child, node, child_parent))
+                continue
+            item = items[0]
+            if is_categorical(item):
+                choices = self.category_ids(field_group(item) or item.name)
+            else:
+                choices = self.pool(item.related_model)
+            if model not in COMPLETE_MODELS:
+                choices = self.random.sample(choices, self.random.randint(0, min(MAX_CHILDREN, len(choices))))
+            for pk in choices:
+                node.children.append(self._node(child, node, child_parent, **{item.attname: pk}))
+        return node
+
+    def create_patients(self, count):
+        patients = []
+        for i in range(count):
+            birth_date = datetime.date(1930, 1, 1) + datetime.timedelta(days=self.random.randint(0, 25000))
+            patients.append(self._fill(Patient, first_name=self.random.choice(FIRST_NAMES),
+                                       last_name=self.random.choice(LAST_NAMES), pesel=_pesel(birth_date, i),
+                                       phone=u"%09d" % self.random.randint(500000000, 899999999)))
+        return bulk_create_with_history(patients)
+
+    def create_appointments(self, patients, per_patient, chunk_size=200):
+        """Wizyty ze wszystkimi sekcjami zapisywane przez VisitImporter.save() (bulk_create na poziom)."""
+        importer = VisitImporter(chunk_size, self.using)
+        roots = []
+        for patient in patients:
+            date = datetime.date(2005, 1, 1) + datetime.timedelta(days=self.random.randint(0, 365))
+            for _ in range(per_patient):
+                roots.append(self._node(Appointment, patient_id=patient.pk, date=date))
+                date += datetime.timedelta(days=self.random.randint(30, 180))
+        for start in range(0, len(roots), chunk_size):
+            with transaction.atomic(using=self.using):
+                importer.save(roots[start:start + chunk_size])
+        return len(roots)
+
+    def generate(self, patients, appointments_per_patient):
+        return self.create_appointments(self.create_patients(patients), appointments_per_patient)
+
+
+# --- pomiary ---
+
+def measure(function, repeat=3, using='default'):
+    """Najkrótszy i środkowy czas [s] z repeat wywołań oraz liczba zapytań jednego wywołania."""
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connections[using]) as context:
+            start = default_timer()
+            function()
+            timings.append(default_timer() - start)
+    timings.sort()
+    return {'seconds': timings[0], 'median_seconds': timings[len(timings) // 2],
+            'queries': len(context.captured_queries)}
+
+
+def _changelist(model, user):
+    def render():
+        request = RequestFactory().get(reverse('admin:%s_%s_changelist' % (model._meta.app_label, model._meta.model_name)))
+        request.user = user
+        admin.site._registry[model].changelist_view(request).render()
+    return render
+
+
+def _score_sf36():
+    # NumPy potrzebny tylko dla tego wariantu
+    from scoring import score_sf36
+    return score_sf36().total()
+
+
+def benchmark_cases(user):
+    """Lista (nazwa, funkcja) - warianty tej samej operacji mają wspólny prefiks."""
+    cases = [
+        ('appointment.get_data', lambda: [a.get_data() for a in Appointment.objects.all()]),
+        ('appointment.get_data.with_sections', lambda: [a.get_data() for a in Appointment.objects.with_sections()]),
+        ('appointment.load_bundles', lambda: Appointment.objects.load_bundles()),
+        ('sf36.get_sf36_points_sum', lambda: [lq.get_sf36_points_sum() for lq in LifeQuality.objects.all()]),
+        ('sf36.score_sf36', _score_sf36),
+        ('sf36.stored', lambda: list(SF36Score.objects.values_list('lifequality', 'total'))),
+        ('sf36.records', lambda: [record.sf36_points_sum() for record in lifequality_records()]),
+        ('apnoea.at_apnoea_risk', lambda: [apnoea.at_apnoea_risk() for apnoea in Apnoea.objects.all()]),
+        ('apnoea.annotate_risk', lambda: list(Apnoea.objects.annotate_risk().values_list('pk', 'apnoea_at_risk'))),
+        ('apnoea.records', lambda: [record.at_apnoea_risk() for record in apnoea_records()]),
+    ]
+    for model in ADMIN_CHANGELISTS:
+        cases.append(('admin.changelist.%s' % model._meta.model_name, _changelist(model, user)))
+    return cases
+
+
+def run_benchmarks(repeat=3, only=None, using='default'):
+    """
+    Wyniki wszystkich przypadków (lub tych, których nazwa zaczyna się od
+    któregoś z prefiksów only) jako słownik gotowy do json.dump().
+    """
+    user_model = get_user_model()
+    user = user_model.objects.filter(is_superuser=True).first()
+    if user is None:
+        user = user_model.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+    registry.invalidate()
+    results = []
+    for name, function in benchmark_cases(user):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        result = measure(function, repeat, using)
+        result['name'] = name
+        results.append(result)
+    counts = dict((model._meta.model_name, model.objects.count())
+                  for model in (Patient, Appointment, LifeQuality, Apnoea, HipotensionChemicalTaken))
+    return {'database': connections[using].vendor, 'repeat': repeat, 'sections': len(APPOINTMENT_SECTIONS),
+            'counts': counts, 'results': results}
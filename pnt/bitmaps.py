@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+Indeks bitmapowy odpowiedzi kategorycznych: dla każdej wartości
+CategoricalValue w każdym polu modeli zapisywanych z wizytą (sekcje, tabele
+pośrednie) bitmapa id wizyt i bitmapa id pacjentów, u których występuje.
+
+    index = get_index()
+    query = Term(Disease, 'disease', u"Cukrzyca") & ~Term(Stimulant, 'stimulant', u"Alkohol")
+    index.count(query, PATIENTS)      # liczba pacjentów
+    index.ids(query, APPOINTMENTS)    # posortowane id wizyt
+
+Bitmapy to pyroaring.BitMap (skompresowane), a bez pyroaring - IntBitmap na
+liczbie całkowitej Pythona, bez kompresji: każda bitmapa zajmuje ok.
+(największe id) / 8 bajtów niezależnie od liczby ustawionych bitów, więc przy
+dużych tabelach i wielu wartościach trzeba zainstalować pyroaring.
+
+Indeks budowany jest przy pierwszym użyciu (z pliku PNT_BITMAP_INDEX_PATH
+zapisanego przez komendę rebuild_bitmap_index albo z bazy) i od tej chwili
+aktualizowany sygnałami zapisu/usunięcia w bieżącym procesie. Plik zawiera
+znacznik stanu bazy z chwili budowy (liczba wierszy i największe id modeli
+indeksu); gdy nie zgadza się z bazą, indeks budowany jest od nowa. Zmiany
+z pominięciem sygnałów, które nie zmieniają liczby wierszy (update(), także
+przeniesienie wizyt do innego pacjenta), widoczne są dopiero po przebudowie.
+"""
+import binascii
+import os
+import pickle
+import threading
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from categories import is_categorical, value_id
+from models import Appointment, Patient
+from summary import appointment_id_for, appointment_paths
+
+
+try:
+    from pyroaring import BitMap as Bitmap
+    BACKEND = 'pyroaring'
+except ImportError:
+    Bitmap = None
+    BACKEND = 'int'
+
+APPOINTMENTS = 'appointments'
+PATIENTS = 'patients'
+LEVELS = (APPOINTMENTS, PATIENTS)
+
+
+class IntBitmap(object):
+    """
+    Zbiór nieujemnych liczb całkowitych jako bity jednej liczby (zastępstwo
+    pyroaring.BitMap, bez kompresji).
+    """
+    __slots__ = ('bits',)
+
+    def __init__(self, values=(), bits=0):
+        values = list(values)
+        if values:
+            data = bytearray(max(values) // 8 + 1)
+            for value in values:
+                data[value >> 3] |= 1 << (value & 7)
+            data.reverse()
+            bits |= int(binascii.hexlify(data), 16)
+        self.bits = bits
+
+    def copy(self):
+        return IntBitmap(bits=self.bits)
+
+    def add(self, value):
+        self.bits |= 1 << value
+
+    def discard(self, value):
+        self.bits &= ~(1 << value)
+
+    def __contains__(self, value):
+        return bool(self.bits >> value & 1)
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def __iter__(self):
+        digits = bin(self.bits)[:1:-1]
+        return (i for i, digit in enumerate(digits) if digit == '1')
+
+    def __and__(self, other):
+        return IntBitmap(bits=self.bits & other.bits)
+
+    def __or__(self, other):
+        return IntBitmap(bits=self.bits | other.bits)
+
+    def __sub__(self, other):
+        return IntBitmap(bits=self.bits & ~other.bits)
+
+if Bitmap is None:
+    Bitmap = IntBitmap
+
+
+# --- wyrażenia ---
+
+class Expression(object):
+    def __and__(self, other):
+        return _Combined('and', self, other)
+
+    def __or__(self, other):
+        return _Combined('or', self, other)
+
+    def __invert__(self):
+        return _Not(self)
+
+
+class Term(Expression):
+    """Wartość CategoricalValue (etykieta lub id) w polu field_name modelu."""
+    def __init__(self, model, field_name, value):
+        field = model._meta.get_field(field_name)
+        self.key = (model._meta.model_name, field.name, value_id(field, value))
+
+    def evaluate(self, index, level):
+        return index.bitmap(self.key, level)
+
+
+class _Combined(Expression):
+    def __init__(self, operator, *children):
+        self.operator = operator
+        self.children = children
+
+    def evaluate(self, index, level):
+        bitmaps = [child.evaluate(index, level) for child in self.children]
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result & bitmap if self.operator == 'and' else result | bitmap
+        return result
+
+
+class _Not(Expression):
+    def __init__(self, child):
+        self.child = child
+
+    def evaluate(self, index, level):
+        return index.universe[level] - self.child.evaluate(index, level)
+
+
+# --- indeks ---
+
+def indexed_fields():
+    """[(model, [pola CategoricalValue])] dla modeli zapisywanych z wizytą."""
+    result = []
+    for model in appointment_paths():
+        fields = [field for field in model._meta.concrete_fields if is_categorical(field)]
+        if fields:
+            result.append((model, fields))
+    return result
+
+
+def _path(model):
+    return '__'.join(appointment_paths()[model])
+
+
+def _field_values(bitmaps):
+    """Poziom -> {(model, pole): wartości mające bitmapę}, aby zmiana pola nie przeglądała całego poziomu."""
+    result = dict((level, {}) for level in LEVELS)
+    for level in LEVELS:
+        for model_name, field_name, value in bitmaps[level]:
+            result[level].setdefault((model_name, field_name), set()).add(value)
+    return result
+
+
+def watermark():
+    """Model -> (liczba wierszy, największe id) dla Appointment, Patient i modeli z indexed_fields()."""
+    result = {}
+    for model in [Appointment, Patient] + [model for model, _ in indexed_fields()]:
+        values = model._default_manager.aggregate(count=Count('pk'), last=Max('pk'))
+        result[model._meta.label] = (values['count'], values['last'])
+    return result
+
+
+class BitmapIndex(object):
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.bitmaps = dict((level, {}) for level in LEVELS)
+        self.universe = dict((level, Bitmap()) for level in LEVELS)
+        self.field_values = _field_values(self.bitmaps)
+        self.watermark = None
+
+    def bitmap(self, key, level=APPOINTMENTS):
+        """Kopia bitmapy - zmiany wyniku nie mogą trafić do indeksu."""
+        with self._lock:
+            bitmap = self.bitmaps[level].get(key)
+            return bitmap.copy() if bitmap is not None else Bitmap()
+
+    def keys(self):
+        return sorted(self.bitmaps[APPOINTMENTS])
+
+    def evaluate(self, expression, level=APPOINTMENTS):
+        with self._lock:
+            return expression.evaluate(self, level)
+
+    def count(self, expression, level=APPOINTMENTS):
+        return len(self.evaluate(expression, level))
+
+    def ids(self, expression, level=APPOINTMENTS):
+        return sorted(self.evaluate(expression, level))
+
+    # --- budowa ---
+
+    def build(self):
+        """Pełna przebudowa z bazy: jedno zapytanie na model z polami kategorycznymi."""
+        # przed odczytem danych - zapis w trakcie budowy da niezgodny znacznik i przebudowę po wczytaniu
+        state = watermark()
+        bitmaps, universe = dict((level, {}) for level in LEVELS), {}
+        universe[APPOINTMENTS] = Bitmap(Appointment.objects.values_list('pk', flat=True))
+        universe[PATIENTS] = Bitmap(Patient.objects.values_list('pk', flat=True))
+        for model, fields in indexed_fields():
+            path = _path(model)
+            ids = dict((level, {}) for level in LEVELS)
+            rows = model.objects.values_list(path, path + '__patient', *[field.attname for field in fields])
+            for row in rows.iterator():
+                for field, value in zip(fields, row[2:]):
+                    if value is not None:
+                        key = (model._meta.model_name, field.name, value)
+                        ids[APPOINTMENTS].setdefault(key, []).append(row[0])
+                        ids[PATIENTS].setdefault(key, []).append(row[1])
+            for level in LEVELS:
+                for key, values in ids[level].items():
+                    bitmaps[level][key] = Bitmap(values)
+        field_values = _field_values(bitmaps)
+        with self._lock:
+            self.bitmaps, self.universe, self.field_values, self.watermark = bitmaps, universe, field_values, state
+        return self
+
+    # --- aktualizacja ---
+
+    def _set(self, level, model, fields, pk, present):
+        """Bit pk w bitmapach pól fields ustawiony dokładnie dla wartości z present[pole]."""
+        bitmaps, field_values = self.bitmaps[level], self.field_values[level]
+        for field in fields:
+            key = (model._meta.model_name, field.name)
+            known = field_values.setdefault(key, set())
+            for value in known - present[field.name]:
+                bitmaps[key + (value,)].discard(pk)
+            for value in present[field.name]:
+                bitmaps.setdefault(key + (value,), Bitmap()).add(pk)
+            known.update(present[field.name])
+
+    def _read(self, level, model, fields, lookup, pk):
+        present = dict((field.name, set()) for field in fields)
+        for row in model.objects.filter(**{lookup: pk}).values_list(*[field.attname for field in fields]):
+            for field, value in zip(fields, row):
+                if value is not None:
+                    present[field.name].add(value)
+        self._set(level, model, fields, pk, present)
+
+    def refresh(self, model, appointment_id):
+        """Ponownie odczytuje wartości pól modelu dla wizyty i jej pacjenta (trzy zapytania)."""
+        fields = dict(indexed_fields()).get(model)
+        if not fields:
+            return
+        patient_id = Appointment.objects.filter(pk=appointment_id).values_list('patient', flat=True).first()
+        if patient_id is None:
+            return
+        path = _path(model)
+        with self._lock:
+            self._read(APPOINTMENTS, model, fields, path, appointment_id)
+            self._read(PATIENTS, model, fields, path + '__patient', patient_id)
+
+    def refresh_patient(self, patient_id):
+        """Ponownie odczytuje bity pacjenta we wszystkich modelach (zapytanie na model), np. po przeniesieniu wizyty."""
+        with self._lock:
+            for model, fields in indexed_fields():
+                self._read(PATIENTS, model, fields, _path(model) + '__patient', patient_id)
+
+    def add(self, level, pk):
+        with self._lock:
+            self.universe[level].add(pk)
+
+    def remove(self, level, pk):
+        with self._lock:
+            self.universe[level].discard(pk)
+            for bitmap in self.bitmaps[level].values():
+                bitmap.discard(pk)
+
+    # --- plik ---
+
+    def save(self, path):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as stream:
+            with self._lock:
+                pickle.dump({'backend': BACKEND, 'bitmaps': self.bitmaps, 'universe': self.universe,
+                             'watermark': self.watermark}, stream, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Indeks z pliku albo None, gdy pliku nie ma, zapisano go z innym rodzajem
+        bitmap lub jego znacznik nie zgadza się z bieżącym stanem bazy.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as stream:
+            data = pickle.load(stream)
+        if data.get('backend') != BACKEND or data.get('watermark') != watermark():
+            return None
+        index = cls()
+        index.bitmaps, index.universe, index.watermark = data['bitmaps'], data['universe'], data['watermark']
+        index.field_values = _field_values(index.bitmaps)
+        return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                path = getattr(settings, 'PNT_BITMAP_INDEX_PATH', None)
+                index = BitmapIndex.load(path) if path else None
+                _index = index or BitmapIndex().build()
+    return _index
+
+
+def reset_index():
+    global _index
+    _index = None
+
+
+def remember_patient(sender, instance, raw=False, **kwargs):
+    """Sygnał pre_save Appointment: dotychczasowy pacjent wizyty, którego bity trzeba odświeżyć po przeniesieniu."""
+    if _index is None or instance.pk is None:
+        return
+    instance._index_patient_id = Appointment.objects.filter(pk=instance.pk).values_list('patient', flat=True).first()
+
+
+def update_index(sender, instance, raw=False, **kwargs):
+    """Sygnał post_save/post_delete modeli z indexed_fields(), Appointment i Patient."""
+    if _index is None:
+        return
+    deleted = 'created' not in kwargs
+    if sender is Patient:
+        (_index.remove if deleted else _index.add)(PATIENTS, instance.pk)
+        return
+    if sender is Appointment:
+        if deleted:
+            _index.remove(APPOINTMENTS, instance.pk)
+            return
+        _index.add(APPOINTMENTS, instance.pk)
+        previous = getattr(instance, '_index_patient_id', None)
+        if previous is not None and previous != instance.patient_id:
+            _index.refresh_patient(previous)
+            _index.refresh_patient(instance.patient_id)
+    appointment_id = appointment_id_for(instance)
+    if appointment_id is not None:
+        _index.refresh(sender, appointment_id)
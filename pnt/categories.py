@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Rejestr wartości records.CategoricalValue trzymany w pamięci procesu.
+
+Słowniki kategorii są praktycznie statyczne, a korzysta z nich prawie każdy
+model PNT (~40 kluczy obcych z limit_choices_to={'group__name': ...}).
+Rejestr trzyma je w pamięci: wybory dla grupy, wagę i etykietę po id oraz pole
+formularza, które nie odpytuje bazy. Zapis/usunięcie dowolnego modelu z
+aplikacji records (sygnały podłącza PntConfig.ready()) unieważnia rejestr
+w bieżącym procesie, a pozostałe procesy
+wczytują go ponownie po PNT_CATEGORIES_TTL sekundach (domyślnie 300) - tyle
+najdłużej widzą np. wagę sprzed zmiany w panelu administracyjnym.
+"""
+import threading
+import time
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.encoding import force_text
+
+
+def field_group(field):
+    """
+    Nazwa grupy wartości dla klucza obcego do CategoricalValue z limit_choices_to,
+    None dla pól bez ograniczenia (dowolna wartość, np. Meal.meat_type).
+    """
+    limit = field.remote_field.limit_choices_to
+    if isinstance(limit, dict) and 'group__name' in limit:
+        return limit['group__name']
+    return None
+
+
+def is_categorical(field):
+    related = getattr(field, 'related_model', None)
+    return related is not None and related._meta.label == 'records.CategoricalValue'
+
+
+class CategoricalRegistry(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._expires = 0
+        # id nieznalezione mimo przeładowania - kolejne odwołania nie przeładowują ponownie
+        self._missed = set()
+
+    def _load(self):
+        model = apps.get_model('records', 'CategoricalValue')
+        by_id, by_group, by_label, labels = {}, {}, {}, {}
+        for value in model.objects.select_related('group'):
+            group, label = value.group.name, force_text(value)
+            by_id[value.pk] = (group, value)
+            by_group.setdefault(group, []).append(value)
+            by_label[(group, label)] = value
+            labels.setdefault(label, []).append(value)
+        # pola bez grupy: etykieta musi być jednoznaczna we wszystkich grupach
+        by_label.update(((None, label), values[0]) for label, values in labels.items() if len(values) == 1)
+        return by_id, by_group, by_label
+
+    @property
+    def _loaded(self):
+        data = self._data
+        if data is None or time.time() >= self._expires:
+            with self._lock:
+                if self._data is None or time.time() >= self._expires:
+                    self._data = self._load()
+                    self._missed = set()
+                    self._expires = time.time() + getattr(settings, 'PNT_CATEGORIES_TTL', 300)
+                data = self._data
+        return data
+
+    def invalidate(self):
+        self._data = None
+        self._missed = set()
+
+    def _entry(self, pk):
+        entries = self._loaded[0]
+        if pk not in entries and pk not in self._missed:
+            # wartość dodana w innym procesie - jedno przeładowanie na nieznane id
+            self.invalidate()
+            entries = self._loaded[0]
+            if pk not in entries:
+                self._missed.add(pk)
+        return entries[pk]
+
+    def get(self, pk):
+        return self._entry(pk)[1]
+
+    def group(self, pk):
+        return self._entry(pk)[0]
+
+    def weight(self, pk):
+        return self.get(pk).weight
+
+    def label(self, pk):
+        return force_text(self.get(pk))
+
+    def resolve(self, group, label):
+        """
+        Wartość grupy o podanej etykiecie (KeyError, gdy jej nie ma); dla group=None
+        wartość o tej etykiecie w dowolnej grupie, o ile jest tylko jedna.
+        """
+        return self._loaded[2][(group, force_text(label))]
+
+    def values(self, group):
+        return list(self._loaded[1].get(group, ()))
+
+    def ids(self, group):
+        return [value.pk for value in self._loaded[1].get(group, ())]
+
+    def choices(self, group):
+        return [(value.pk, force_text(value)) for value in self._loaded[1].get(group, ())]
+
+
+registry = CategoricalRegistry()
+
+
+def weight(pk):
+    return registry.weight(pk)
+
+
+def value_id(field, value):
+    """Id wartości pola CategoricalValue podanej etykietą lub id (KeyError, gdy etykiety nie ma w grupie pola)."""
+    if value is None or isinstance(value, (int, long)):
+        return value
+    return registry.resolve(field_group(field), value).pk
+
+
+def invalidate_registry(sender, **kwargs):
+    """Sygnał post_save/post_delete modeli aplikacji records (PntConfig.ready())."""
+    registry.invalidate()
+
+
+class CategoricalChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField dla jednej grupy CategoricalValue, którego wybory i walidacja
+    korzystają z rejestru zamiast z bazy.
+    """
+    def __init__(self, group, *args, **kwargs):
+        self.group = group
+        model = apps.get_model('records', 'CategoricalValue')
+        super(CategoricalChoiceField, self).__init__(model.objects.filter(group__name=group), *args, **kwargs)
+
+    def _get_choices(self):
+        choices = registry.choices(self.group)
+        if self.empty_label is not None:
+            choices.insert(0, (u"", self.empty_label))
+        return choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            pk = int(getattr(value, 'pk', value))
+            if registry.group(pk) != self.group:
+                raise KeyError(pk)
+        except (KeyError, ValueError, TypeError):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return registry.get(pk)
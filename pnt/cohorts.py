@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Deklaratywne kryteria kohort badawczych kompilowane do jednego zapytania.
+
+Każde kryterium to "istnieje wiersz tabeli pośredniej spełniający warunki",
+np. disease(u"Cukrzyca"), family_disease(u"Zawał serca", member='b'),
+pharma_group(u"Beta-blokery"). Kryteria łączy się operatorami &, | i ~:
+
+    criteria = disease(u"Cukrzyca") & ~stimulant(u"Alkohol", frequency=('a', 'b'))
+    Cohort(criteria).patients()       # pacjenci, u których kryteria spełniają dowolne wizyty
+    Cohort(criteria).appointments()   # wizyty, na których wszystkie kryteria są spełnione
+
+Każde kryterium staje się adnotacją EXISTS (podzapytanie skorelowane z
+pacjentem lub wizytą), a całe wyrażenie logiczne - warunkiem WHERE na tych
+adnotacjach. Wartości CategoricalValue można podawać etykietą (rozwiązywaną
+z rejestru categories w grupie pola) albo id.
+
+Kohorty to zwykłe querysety na bazie głównej; aby czytać je z repliki, należy
+je wyliczyć (także jako podzapytanie innego querysetu) wewnątrz
+routers.use_replica().
+"""
+from django.db.models import Exists, OuterRef, Q
+
+from categories import is_categorical, value_id
+from models import (Appointment, Patient, Disease, GeneralDisease, FamilyDisease, Stimulant, HipotensionChemicalTaken,
+                    SideIssueFactor)
+from summary import appointment_paths
+
+
+class Criterion(object):
+    def __and__(self, other):
+        return _Combined(Q.AND, self, other)
+
+    def __or__(self, other):
+        return _Combined(Q.OR, self, other)
+
+    def __invert__(self):
+        return _Not(self)
+
+
+class Row(Criterion):
+    """Istnieje wiersz modelu należącego do wizyty (patrz summary.appointment_paths()) z podanymi filtrami."""
+    def __init__(self, model, **filters):
+        self.model = model
+        self.filters = filters
+        self.path = '__'.join(appointment_paths()[model])
+
+    def subquery(self, level):
+        lookup = self.path + '__patient' if level is Patient else self.path
+        return self.model.objects.filter(**{lookup: OuterRef('pk')}).filter(**self.filters)
+
+    def compile(self, level, annotations):
+        name = '_cohort_%d' % len(annotations)
+        annotations.append((name, Exists(self.subquery(level).values('pk'))))
+        return Q(**{name: True})
+
+
+class _Combined(Criterion):
+    def __init__(self, connector, *children):
+        self.connector = connector
+        self.children = children
+
+    def compile(self, level, annotations):
+        result = Q()
+        for child in self.children:
+            compiled = child.compile(level, annotations)
+            result = result & compiled if self.connector == Q.AND else result | compiled
+        return result
+
+
+class _Not(Criterion):
+    def __init__(self, child):
+        self.child = child
+
+    def compile(self, level, annotations):
+        return ~self.child.compile(level, annotations)
+
+
+def _value(model, field_name, value):
+    field = model._meta.get_field(field_name)
+    if not is_categorical(field):
+        return value
+    try:
+        return value_id(field, value)
+    except KeyError:
+        raise ValueError(u"Nieznana wartość %s dla pola %s.%s" % (value, model.__name__, field_name))
+
+
+def _choices(values):
+    return values if isinstance(values, (list, tuple, set, frozenset)) else (values,)
+
+
+def categorical(model, field_name, value, **filters):
+    """Wiersz model z wartością CategoricalValue (etykieta lub id) w polu field_name."""
+    filters[model._meta.get_field(field_name).attname] = _value(model, field_name, value)
+    return Row(model, **filters)
+
+
+def disease(value):
+    return categorical(Disease, 'disease', value)
+
+
+def general_disease(value):
+    return categorical(GeneralDisease, 'generaldisease', value)
+
+
+def family_disease(value, member=None):
+    """Choroba w rodzinie, opcjonalnie u konkretnego członka (kod z FamilyDisease.MEMBERS lub kilka kodów)."""
+    filters = {'member__in': _choices(member)} if member is not None else {}
+    return categorical(FamilyDisease, 'familydisease', value, **filters)
+
+
+def stimulant(value, frequency=None):
+    """Spożycie używki, opcjonalnie z częstotliwością (kod z Stimulant.FREQ lub kilka kodów)."""
+    filters = {'usage_frequency__in': _choices(frequency)} if frequency is not None else {}
+    return categorical(Stimulant, 'stimulant', value, **filters)
+
+
+def side_issue_factor(value):
+    return categorical(SideIssueFactor, 'sideissuefactor', value)
+
+
+def _medication(lookup, value, min_daily_dose=None):
+    filters = {'hipotension_chemical__%s' % (lookup if isinstance(value, (int, long)) else lookup + '__name'): value}
+    if min_daily_dose is not None:
+        filters['daily_dose__gte'] = min_daily_dose
+    return Row(HipotensionChemicalTaken, **filters)
+
+
+def pharma_group(value, min_daily_dose=None):
+    """Przyjmowany lek hipotensyjny z grupy farmakoterapeutycznej (nazwa lub id)."""
+    return _medication('pharma_group', value, min_daily_dose)
+
+
+def international_name(value, min_daily_dose=None):
+    """Przyjmowany lek hipotensyjny o nazwie międzynarodowej (nazwa lub id)."""
+    return _medication('international_name', value, min_daily_dose)
+
+
+class Cohort(object):
+    def __init__(self, criteria):
+        self.criteria = criteria
+
+    def _filter(self, queryset, level):
+        annotations = []
+        condition = self.criteria.compile(level, annotations)
+        for name, expression in annotations:
+            queryset = queryset.annotate(**{name: expression})
+        return queryset.filter(condition)
+
+    def patients(self, queryset=None):
+        """Pacjenci, dla których każde kryterium spełnia dowolna z ich wizyt."""
+        return self._filter(Patient.objects.all() if queryset is None else queryset, Patient)
+
+    def appointments(self, queryset=None):
+        """Wizyty, na których spełnione są kryteria."""
+        return self._filter(Appointment.objects.all() if queryset is None else queryset, Appointment)
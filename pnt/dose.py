@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Odczyt dawek leków zapisanych tekstem (pola *_dose, max. 4 znaki) jako liczby
+tabletek: "1", "0.5", "0,5", "1/2", "½", "1½", "1 1/2". Puste pole lub "-"
+oznacza brak dawki (0), tekst, którego nie da się odczytać - None.
+"""
+from __future__ import division
+
+import re
+
+FRACTIONS = {u"½": 0.5, u"¼": 0.25, u"¾": 0.75, u"⅓": 1 / 3, u"⅔": 2 / 3}
+
+_NUMBER = re.compile(r'^(\d+(?:\.\d+)?)?\s*(?:(\d+)/(\d+))?$')
+
+
+def parse_dose(text):
+    """Dawka jako float albo None, gdy tekstu nie da się odczytać."""
+    text = (text or u"").strip().replace(u",", u".")
+    if text in (u"", u"-"):
+        return 0.0
+    fraction = 0.0
+    if text[-1] in FRACTIONS:
+        fraction = FRACTIONS[text[-1]]
+        text = text[:-1].strip()
+        if not text:
+            return fraction
+    match = _NUMBER.match(text)
+    if match is None or not any(match.groups()):
+        return None
+    whole, numerator, denominator = match.groups()
+    value = float(whole) if whole else 0.0
+    if numerator:
+        if fraction or not int(denominator):
+            return None
+        fraction = int(numerator) / int(denominator)
+    return value + fraction
+
+
+def dose_values(morning, midday, evening):
+    """
+    (poranna, południowa, wieczorna, dobowa) - dawka dobowa to suma pozostałych
+    albo None, gdy którejś nie da się odczytać.
+    """
+    values = (parse_dose(morning), parse_dose(midday), parse_dose(evening))
+    return values + (None if None in values else sum(values),)
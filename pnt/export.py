@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Eksport "szerokich" wierszy: jedna wizyta na wiersz z danymi pacjenta,
+spłaszczonymi sekcjami z Appointment.get_data(), punktami SF-36 (SF36Score)
+i oceną bezdechu (apnoea_risk_annotations()).
+
+Dane pobierane są partiami po kluczu głównym (values_list, bez instancji
+modeli) i od razu zapisywane do pliku, więc zużycie pamięci nie zależy od
+liczby wizyt. Format kolumnowy to Parquet (wymaga pyarrow).
+"""
+import csv
+import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.encoding import force_text
+
+from categories import is_categorical, registry
+from models import Appointment, Patient, SF36Score, APPOINTMENT_SECTIONS, apnoea_risk_annotations
+from routers import on_replica, use_replica
+
+
+_KINDS = {
+    'AutoField': 'int', 'IntegerField': 'int', 'PositiveIntegerField': 'int', 'PositiveSmallIntegerField': 'int',
+    'SmallIntegerField': 'int', 'BigIntegerField': 'int', 'ForeignKey': 'int', 'OneToOneField': 'int',
+    'FloatField': 'float', 'DecimalField': 'float',
+    'BooleanField': 'bool', 'NullBooleanField': 'bool',
+    'DateField': 'date', 'TimeField': 'time', 'DateTimeField': 'datetime',
+}
+
+
+def _categorical_label(pk):
+    if pk is None:
+        return None
+    try:
+        return registry.label(pk)
+    except KeyError:
+        return force_text(pk)
+
+
+class Column(object):
+    def __init__(self, name, lookup, kind, convert=None):
+        self.name = name
+        self.lookup = lookup
+        self.kind = kind
+        self.convert = convert
+
+
+def _field_column(prefix, path, field):
+    if is_categorical(field):
+        return Column('%s.%s' % (prefix, field.name), path + field.name, 'text', _categorical_label)
+    return Column('%s.%s' % (prefix, field.name), path + field.name, _KINDS.get(field.get_internal_type(), 'text'))
+
+
+def appointment_columns(sections=APPOINTMENT_SECTIONS):
+    """Kolumny eksportu wyznaczone z _meta modeli pacjenta i sekcji wizyty."""
+    columns = [Column('appointment.id', 'pk', 'int'),
+               Column('appointment.date', 'date', 'date'),
+               Column('appointment.time', 'time', 'time')]
+    for field in Patient._meta.concrete_fields:
+        if not field.name.endswith('_search'):
+            columns.append(_field_column('patient', 'patient__', field))
+    for section in sections:
+        model = Appointment._meta.get_field(section).related_model
+        for field in model._meta.concrete_fields:
+            if not field.primary_key and field.name != 'appointment':
+                columns.append(_field_column(section, section + '__', field))
+    if 'lifequality' in sections:
+        for field in SF36Score._meta.concrete_fields:
+            if not field.primary_key:
+                columns.append(Column('sf36.%s' % field.name, 'lifequality__sf36score__%s' % field.name, 'int'))
+    return columns
+
+
+_APNOEA_PREFIX = 'export_apnoea_'
+_APNOEA_FLAGS = ('has_apnoea_related_diseases', 'has_apnoea_identifications', 'apnoea_suggestions', 'apnoea_at_risk')
+
+
+def export_columns(sections=APPOINTMENT_SECTIONS):
+    """Kolumny eksportu i adnotacje oceny bezdechu, które trzeba dodać do querysetu wizyt."""
+    columns = appointment_columns(sections)
+    annotations = []
+    if 'apnoea' in sections:
+        annotations = apnoea_risk_annotations(path='apnoea__', prefix=_APNOEA_PREFIX)
+        for name, _ in annotations:
+            short_name = name[len(_APNOEA_PREFIX):]
+            columns.append(Column('apnoea.%s' % short_name, name, 'bool' if short_name in _APNOEA_FLAGS else 'int'))
+    return columns, annotations
+
+
+def iter_rows(queryset=None, sections=APPOINTMENT_SECTIONS, chunk_size=2000):
+    """
+    Generator kolejnych partii wierszy (listy wartości w kolejności export_columns())
+    dla wizyt z querysetu, po chunk_size kolejnych kluczy głównych. Każda partia
+    czytana jest z repliki (routers.use_replica()).
+    """
+    if queryset is None:
+        queryset = Appointment.objects.all()
+    columns, annotations = export_columns(sections)
+    for name, expression in annotations:
+        queryset = queryset.annotate(**{name: expression})
+    lookups = [column.lookup for column in columns]
+    converters = [(i, column.convert) for i, column in enumerate(columns) if column.convert]
+
+    last_pk = None
+    while True:
+        chunk = queryset.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        with use_replica():
+            rows = [list(row) for row in chunk.values_list(*lookups)[:chunk_size]]
+        if not rows:
+            return
+        for row in rows:
+            for i, convert in converters:
+                row[i] = convert(row[i])
+        last_pk = rows[-1][0]
+        yield rows
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return force_text(value).encode('utf-8')
+
+
+class CSVExportWriter(object):
+    def __init__(self, path, columns):
+        self.file = open(path, 'wb')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([column.name.encode('utf-8') for column in columns])
+
+    def write(self, rows):
+        self.writer.writerows([_csv_value(value) for value in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExportWriter(object):
+    def __init__(self, path, columns):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImproperlyConfigured(u"Eksport do formatu Parquet wymaga pakietu pyarrow.")
+        self.pa = pyarrow
+        types = {'int': pyarrow.int64(), 'float': pyarrow.float64(), 'bool': pyarrow.bool_(),
+                 'date': pyarrow.date32(), 'time': pyarrow.time64('us'), 'datetime': pyarrow.timestamp('us'),
+                 'text': pyarrow.string()}
+        self.schema = pyarrow.schema([pyarrow.field(column.name, types[column.kind]) for column in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        arrays = [self.pa.array(list(values), type=field.type) for values, field in zip(zip(*rows), self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {'csv': CSVExportWriter, 'parquet': ParquetExportWriter}
+
+
+@on_replica
+def export_appointments(path, format='csv', queryset=None, sections=APPOINTMENT_SECTIONS, chunk_size=2000):
+    """Zapisuje eksport do pliku path, zwraca liczbę wierszy."""
+    columns, _ = export_columns(sections)
+    writer = WRITERS[format](path, columns)
+    count = 0
+    try:
+        for rows in iter_rows(queryset, sections, chunk_size):
+            writer.write(rows)
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
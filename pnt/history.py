@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Hurtowe zapisy modeli z HistoricalRecords razem z wpisami historii.
+
+bulk_create()/update() pomijają sygnały, z których HistoricalRecords tworzy
+wpisy historii, a zwykły save() to po jednym INSERT-cie historii na obiekt.
+bulk_*_with_history() zapisują obiekty i odpowiadające im wiersze historii
+partiami, w jednej transakcji.
+
+as_of()/snapshot_as_of() odtwarzają stan obiektu lub całej tabeli na dany
+moment z tabeli historii (indeks (id, history_date) z migracji 0007_history_as_of).
+"""
+from django.db import connections, router, transaction, DatabaseError
+from django.db.models import Case, When, Value, F, Max, OuterRef, Subquery
+from django.utils import timezone
+
+import routers
+from summary import appointment_id_for, invalidate as invalidate_summaries
+
+
+HISTORY_CREATED = '+'
+HISTORY_CHANGED = '~'
+HISTORY_DELETED = '-'
+
+
+def historical_model(model):
+    return model.history.model
+
+
+def _history_objects(model, objs, history_type, history_date):
+    history_model = historical_model(model)
+    history_fields = set(field.attname for field in history_model._meta.concrete_fields)
+    fields = [field.attname for field in model._meta.concrete_fields if field.attname in history_fields]
+    result = []
+    for obj in objs:
+        values = dict((attname, getattr(obj, attname)) for attname in fields)
+        values.update(history_date=history_date, history_type=history_type)
+        result.append(history_model(**values))
+    return result
+
+
+def bulk_create_history(model, objs, history_type=HISTORY_CREATED, using='default', batch_size=500):
+    """Same wpisy historii dla obiektów zapisanych już z pominięciem save()."""
+    historical_model(model).objects.using(using).bulk_create(
+        _history_objects(model, objs, history_type, timezone.now()), batch_size=batch_size)
+    routers.written()
+
+
+def _sync_derived(objs):
+    for obj in objs:
+        sync = getattr(obj, 'sync_derived_fields', None)
+        if sync is not None:
+            sync()
+
+
+def _unique_field(model):
+    for field in model._meta.concrete_fields:
+        if field.unique and not field.primary_key:
+            return field
+    return None
+
+
+def _assign_pks(model, objs, using, field):
+    """Uzupełnia pk obiektów po unikalnym polu field."""
+    values = [getattr(obj, field.attname) for obj in objs]
+    pks = {}
+    for start in range(0, len(values), 500):
+        lookup = {'%s__in' % field.name: values[start:start + 500]}
+        pks.update(model._default_manager.using(using).filter(**lookup).values_list(field.attname, 'pk'))
+    for obj in objs:
+        obj.pk = pks[getattr(obj, field.attname)]
+
+
+def bulk_create_with_pks(model, objs, using, batch_size=500):
+    """
+    bulk_create() uzupełniający pk obiektów także na bazach, które ich nie
+    zwracają (np. SQLite): przez unikalne pole modelu, a bez niego - jako nowe
+    klucze powyżej dotychczasowego maksimum, w kolejności wstawiania. Trzeba go
+    wywołać w transakcji; DatabaseError, gdy liczba nowych kluczy się nie zgadza.
+    """
+    manager = model._default_manager.using(using)
+    if connections[using].features.can_return_ids_from_bulk_insert:
+        manager.bulk_create(objs, batch_size=batch_size)
+        return
+    field = _unique_field(model)
+    if field is not None:
+        manager.bulk_create(objs, batch_size=batch_size)
+        _assign_pks(model, objs, using, field)
+        return
+    last_pk = manager.aggregate(last_pk=Max('pk'))['last_pk'] or 0
+    manager.bulk_create(objs, batch_size=batch_size)
+    pks = list(manager.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True))
+    if len(pks) != len(objs):
+        raise DatabaseError(u"%s: wstawiono %d wierszy, znaleziono %d nowych kluczy." % (
+            model.__name__, len(objs), len(pks)))
+    for obj, pk in zip(objs, pks):
+        obj.pk = pk
+
+
+def bulk_create_with_history(objs, batch_size=500):
+    objs = list(objs)
+    if not objs:
+        return objs
+    model = type(objs[0])
+    using = router.db_for_write(model)
+    _sync_derived(objs)
+    with transaction.atomic(using=using):
+        bulk_create_with_pks(model, objs, using, batch_size)
+        bulk_create_history(model, objs, HISTORY_CREATED, using, batch_size)
+    return objs
+
+
+def bulk_update_with_history(objs, fields, batch_size=500):
+    """
+    Aktualizuje podane pola obiektów jednym UPDATE ... CASE na partię
+    i dopisuje wpis historii ('~') dla każdego obiektu. Wpis historii to
+    pełny stan obiektu, więc obiekty nie powinny mieć odroczonych pól (only()).
+    """
+    objs = list(objs)
+    if not objs:
+        return 0
+    model = type(objs[0])
+    using = router.db_for_write(model)
+    _sync_derived(objs)
+    names = list(fields) + [name for name in getattr(model, 'derived_fields', ()) if name not in fields]
+    model_fields = [model._meta.get_field(name) for name in names]
+    updated = 0
+    with transaction.atomic(using=using):
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            values = {}
+            for field in model_fields:
+                whens = [When(pk=obj.pk, then=Value(getattr(obj, field.attname), output_field=field)) for obj in batch]
+                values[field.attname] = Case(*whens, output_field=field)
+            updated += model._default_manager.using(using).filter(pk__in=[obj.pk for obj in batch]).update(**values)
+        bulk_create_history(model, objs, HISTORY_CHANGED, using, batch_size)
+    # update() pomija sygnały unieważniające podsumowania wizyt
+    invalidate_summaries(set(appointment_id_for(obj) for obj in objs))
+    return updated
+
+# modele z HistoricalRecords (indeks (id, history_date) ich historii pod as_of() - migracja 0007_history_as_of)
+HISTORY_MODELS = ('Patient', 'CaseHistory', 'HipotensionChemicalTaken')
+
+
+def as_of(model, pk, when):
+    """
+    Wpis historii obiektu pk aktualny w chwili when (ostatni nie późniejszy),
+    albo None, jeśli obiekt wtedy nie istniał lub był już usunięty.
+    """
+    history_model = historical_model(model)
+    record = (history_model.objects.filter(id=pk, history_date__lte=when)
+              .order_by('-history_date', '-%s' % history_model._meta.pk.name).first())
+    if record is None or record.history_type == HISTORY_DELETED:
+        return None
+    return record
+
+
+def snapshot_as_of(model, when):
+    """
+    Queryset wpisów historii - stan całej tabeli w chwili when: dla każdego id
+    ostatni wpis nie późniejszy niż when, z pominięciem usuniętych obiektów.
+    Na PostgreSQL wpisy wybiera jedno podzapytanie DISTINCT ON (id) po indeksie
+    (id, history_date), na pozostałych bazach podzapytanie skorelowane z id.
+    """
+    history_model = historical_model(model)
+    pk_name = history_model._meta.pk.name
+    rows = history_model.objects.filter(history_date__lte=when)
+    if connections[router.db_for_read(history_model)].vendor == 'postgresql':
+        latest = rows.order_by('id', '-history_date', '-%s' % pk_name).distinct('id').values(pk_name)
+        rows = history_model.objects.filter(**{pk_name + '__in': latest})
+    else:
+        latest = (history_model.objects.filter(id=OuterRef('id'), history_date__lte=when)
+                  .order_by('-history_date', '-%s' % pk_name).values(pk_name)[:1])
+        rows = rows.annotate(_as_of=Subquery(latest)).filter(**{pk_name: F('_as_of')})
+    return rows.exclude(history_type=HISTORY_DELETED)
+
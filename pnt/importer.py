@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Hurtowy import wizyt (Appointment z sekcjami i tabelami pośrednimi).
+
+Wiersz wejściowy (JSON, jeden na linię) opisuje jedną wizytę istniejącego pacjenta:
+
+    {"pesel": "85010112345", "date": "2012-03-01", "time": "10:30",
+     "sections": {"bodypressure": {"systolic_left": 140, ...},
+                  "casehistory": {"diagnosis_year": 2005, "already_hospitalized": false,
+                                  "disease": [{"disease": "Cukrzyca"}],
+                                  "womensexlife": {...}},
+                  "apnoea": {"snooring": "2", ..., "epworthscale": {...}}}}
+
+Klucze zagnieżdżone to nazwy modeli PNT wskazujących na model nadrzędny
+(słownik dla OneToOne, lista dla ForeignKey). Wartości CategoricalValue podaje
+się etykietą (rozwiązywaną z rejestru categories w grupie pola) albo id,
+pozostałe klucze obce - id albo unikalną nazwą (np. HipotensionChemical.name).
+
+Wiersze są walidowane pojedynczo (błędy raportowane per wiersz), a poprawne
+zapisywane partiami: każda partia to jedna transakcja z bulk_create() na
+model i poziom zagnieżdżenia. Gdy partia nie przejdzie w bazie, jej wiersze
+zapisywane są pojedynczo, aby wskazać wadliwe. Po każdej partii zapisywany
+jest punkt kontrolny (numer ostatniej linii), od którego można wznowić import.
+
+bulk_create() nie wysyła sygnałów post_save: po zatwierdzeniu partii
+unieważniane są podsumowania jej wizyt i indeks bitmapowy bieżącego procesu;
+indeks w pliku i w innych procesach trzeba przebudować (rebuild_bitmap_index).
+"""
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import router, transaction, DatabaseError
+from django.utils.encoding import force_text
+
+from bitmaps import reset_index
+from categories import field_group, is_categorical, registry
+from history import HISTORY_MODELS, bulk_create_history, bulk_create_with_pks
+from models import Appointment, Patient, SF36Score, LifeQuality, ApnoeaScore, Apnoea, child_relations
+import routers
+from summary import invalidate as invalidate_summaries
+
+
+# model źródłowy -> tabela wyników przeliczanych po zapisie partii
+STORED_SCORES = {LifeQuality: SF36Score, Apnoea: ApnoeaScore}
+
+
+class RowError(Exception):
+    def __init__(self, messages):
+        super(RowError, self).__init__(messages)
+        self.messages = messages
+
+
+class Node(object):
+    """Niezapisany obiekt z obiektami podrzędnymi - jednostka zapisu VisitImporter.save()."""
+    __slots__ = ('instance', 'parent', 'parent_field', 'children')
+
+    def __init__(self, instance, parent=None, parent_field=None):
+        self.instance = instance
+        self.parent = parent
+        self.parent_field = parent_field
+        self.children = []
+
+
+class VisitImporter(object):
+    def __init__(self, chunk_size=500, using=None):
+        self.chunk_size = chunk_size
+        self.using = using or router.db_for_write(Appointment)
+        self._named = {}
+
+    # --- walidacja ---
+
+    def _named_lookup(self, model):
+        if model not in self._named:
+            lookup = {}
+            names = [field.name for field in model._meta.concrete_fields if field.unique and not field.primary_key]
+            if 'name' in names:
+                lookup = dict((force_text(name), pk) for name, pk in model._default_manager.values_list('name', 'pk'))
+            self._named[model] = lookup
+        return self._named[model]
+
+    def _resolve_fk(self, field, value):
+        if value is None or isinstance(value, (int, long)):
+            return value
+        if is_categorical(field):
+            return registry.resolve(field_group(field), value).pk
+        return self._named_lookup(field.related_model)[force_text(value)]
+
+    def _build(self, model, data, path, parent=None, parent_field=None):
+        if not isinstance(data, dict):
+            raise RowError({path: [u"Oczekiwano obiektu."]})
+        children = child_relations(model)
+        values, nested, errors = {}, [], {}
+        for key, value in data.items():
+            if key in children:
+                nested.append((children[key], value))
+                continue
+            try:
+                field = model._meta.get_field(key)
+            except FieldDoesNotExist:
+                errors['%s.%s' % (path, key)] = [u"Nieznane pole."]
+                continue
+            if not field.concrete or field.primary_key or field.name == parent_field:
+                errors['%s.%s' % (path, key)] = [u"Pola nie można importować."]
+            elif field.is_relation:
+                try:
+                    values[field.attname] = self._resolve_fk(field, value)
+                except KeyError:
+                    errors['%s.%s' % (path, key)] = [u"Nieznana wartość: %s" % force_text(value)]
+            else:
+                values[field.attname] = value
+        instance = model(**values)
+        exclude = [field.name for field in model._meta.concrete_fields if field.is_relation]
+        try:
+            instance.full_clean(exclude=exclude, validate_unique=False)
+        except ValidationError as error:
+            for key, messages in error.message_dict.items():
+                errors['%s.%s' % (path, key)] = messages
+        node = Node(instance, parent, parent_field)
+        for related, value in nested:
+            child_path = '%s.%s' % (path, related.related_model._meta.model_name)
+            items = [value] if related.one_to_one else value
+            if not isinstance(items, list):
+                errors[child_path] = [u"Oczekiwano listy."]
+                continue
+            for i, item in enumerate(items):
+                try:
+                    node.children.append(self._build(related.related_model, item, '%s[%d]' % (child_path, i),
+                                                     node, related.field.name))
+                except RowError as error:
+                    errors.update(error.messages)
+        if errors:
+            raise RowError(errors)
+        return node
+
+    def parse(self, data, patients):
+        """Buduje drzewo niezapisanych obiektów dla wiersza albo rzuca RowError."""
+        if not isinstance(data, dict):
+            raise RowError({'row': [u"Oczekiwano obiektu."]})
+        patient_id = patients.get(force_text(data.get('pesel', u"")))
+        if patient_id is None:
+            raise RowError({'pesel': [u"Nie znaleziono pacjenta."]})
+        sections = data.get('sections') or {}
+        if not isinstance(sections, dict):
+            raise RowError({'sections': [u"Oczekiwano obiektu."]})
+        unknown = set(sections) - set(child_relations(Appointment))
+        if unknown:
+            raise RowError(dict(('sections.%s' % key, [u"Nieznana sekcja."]) for key in unknown))
+        visit = dict(sections)
+        for key in ('date', 'time'):
+            if data.get(key) is not None:
+                visit[key] = data[key]
+        root = self._build(Appointment, visit, 'appointment')
+        root.instance.patient_id = patient_id
+        return root
+
+    # --- zapis ---
+
+    def _insert(self, model, objs, has_children):
+        for obj in objs:
+            sync = getattr(obj, 'sync_derived_fields', None)
+            if sync is not None:
+                sync()
+        history = model.__name__ in HISTORY_MODELS
+        if has_children or history:
+            # klucze główne potrzebne są obiektom podrzędnym i wpisom historii
+            bulk_create_with_pks(model, objs, self.using, self.chunk_size)
+        else:
+            model._default_manager.using(self.using).bulk_create(objs, batch_size=self.chunk_size)
+        routers.written()
+        if history:
+            bulk_create_history(model, objs, using=self.using, batch_size=self.chunk_size)
+
+    def save(self, roots):
+        level = roots
+        source_ids = dict((source, []) for source in STORED_SCORES)
+        while level:
+            by_model = {}
+            for node in level:
+                if node.parent is not None:
+                    setattr(node.instance, node.parent_field + '_id', node.parent.instance.pk)
+                by_model.setdefault(type(node.instance), []).append(node)
+            for model, nodes in by_model.items():
+                self._insert(model, [node.instance for node in nodes], any(node.children for node in nodes))
+                if model in source_ids:
+                    source_ids[model].extend(node.instance.pk for node in nodes)
+            level = [child for node in level for child in node.children]
+        for source, ids in source_ids.items():
+            if ids:
+                STORED_SCORES[source].objects.db_manager(self.using).refresh(ids)
+        appointment_ids = [root.instance.pk for root in roots]
+        transaction.on_commit(lambda: _committed(appointment_ids), using=self.using)
+
+    def _patients(self, rows):
+        pesels = set(force_text(data.get('pesel', u"")) for _, data in rows if isinstance(data, dict))
+        return dict(Patient.objects.using(self.using).filter(pesel__in=pesels).values_list('pesel', 'pk'))
+
+    def import_chunk(self, rows):
+        """
+        Importuje partię [(numer linii, dane)]. Zwraca (liczba zapisanych wizyt,
+        lista (numer linii, błędy)).
+        """
+        patients = self._patients(rows)
+        parsed, errors = [], []
+        for line, data in rows:
+            try:
+                parsed.append((line, self.parse(data, patients)))
+            except RowError as error:
+                errors.append((line, error.messages))
+        try:
+            with transaction.atomic(using=self.using):
+                self.save([root for _, root in parsed])
+            return len(parsed), errors
+        except DatabaseError:
+            pass
+        saved = 0
+        for line, root in parsed:
+            for node in _walk(root):
+                node.instance.pk = None
+            try:
+                with transaction.atomic(using=self.using):
+                    self.save([root])
+                saved += 1
+            except DatabaseError as error:
+                errors.append((line, {'database': [force_text(error)]}))
+        errors.sort()
+        return saved, errors
+
+    def run(self, lines, start_line=0, checkpoint=None, report=None):
+        """
+        Importuje linie JSON (iterowalne), pomijając pierwsze start_line.
+        checkpoint(numer linii) wywoływany jest po każdej zatwierdzonej partii,
+        report(numer linii, błędy) dla każdego odrzuconego wiersza.
+        """
+        saved, failed = 0, 0
+        chunk = []
+        for line, text in enumerate(lines, 1):
+            if line <= start_line or not text.strip():
+                continue
+            try:
+                chunk.append((line, json.loads(text)))
+            except ValueError as error:
+                failed += 1
+                if report:
+                    report(line, {'json': [force_text(error)]})
+            if len(chunk) >= self.chunk_size:
+                saved, failed = self._flush(chunk, saved, failed, checkpoint, report)
+                chunk = []
+        if chunk:
+            saved, failed = self._flush(chunk, saved, failed, checkpoint, report)
+        return saved, failed
+
+    def _flush(self, chunk, saved, failed, checkpoint, report):
+        chunk_saved, errors = self.import_chunk(chunk)
+        for line, messages in errors:
+            if report:
+                report(line, messages)
+        if checkpoint:
+            checkpoint(chunk[-1][0])
+        return saved + chunk_saved, failed + len(errors)
+
+
+def _committed(appointment_ids):
+    invalidate_summaries(appointment_ids)
+    reset_index()
+
+
+def _walk(node):
+    yield node
+    for child in node.children:
+        for descendant in _walk(child):
+            yield descendant
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Rejestr wskaźników klinicznych liczonych z pomiarów jednej sekcji wizyty
+(WHR, MAP, różnica ciśnień między ramionami, ABI, IMT, LDL/HDL).
+
+Wzór wskaźnika zapisany jest raz i daje zarówno wyrażenie SQL (adnotacje,
+update()), jak i wartość dla obiektu w Pythonie. Wskaźniki stored=True mają
+kolumnę o tej samej nazwie w modelu sekcji (z indeksem), uzupełnianą
+w save() (IndicatorModel) i przez import/historię jak pozostałe derived_fields,
+a dla istniejących wierszy - komendą backfill_indicators. Progi można wtedy
+sprawdzać w bazie:
+
+    Appointment.objects.with_indicators().filter(mean_arterial_pressure__gt=110, imt_max__gt=0.9)
+"""
+from __future__ import division
+
+from collections import OrderedDict
+
+from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.functions import Greatest, Least
+
+
+class _SQL(object):
+    """Funkcje wzorów jako wyrażenia bazy danych."""
+    least = staticmethod(Least)
+    greatest = staticmethod(Greatest)
+
+    @staticmethod
+    def abs(expression):
+        return Func(expression, function='ABS', output_field=models.FloatField())
+
+    @staticmethod
+    def nullif(expression, value):
+        return Func(expression, Value(value), function='NULLIF', output_field=models.FloatField())
+
+
+class _Python(object):
+    """Te same funkcje dla wartości pól obiektu (None jak NULL w SQL)."""
+    @staticmethod
+    def least(*values):
+        return None if None in values else min(values)
+
+    @staticmethod
+    def greatest(*values):
+        return None if None in values else max(values)
+
+    @staticmethod
+    def abs(value):
+        return None if value is None else abs(value)
+
+    @staticmethod
+    def nullif(value, other):
+        return None if value == other else value
+
+
+class Indicator(object):
+    def __init__(self, name, model_name, label, formula, stored=True):
+        """formula(field, fn): field(nazwa pola) daje wartość pola, fn - funkcje least/greatest/abs/nullif."""
+        self.name = name
+        self.model_name = model_name
+        self.label = label
+        self.formula = formula
+        self.stored = stored
+
+    def expression(self, path=''):
+        """Wyrażenie SQL; path wskazuje model sekcji względem modelu querysetu (np. 'bodypressure__')."""
+        return self.formula(lambda field: F(path + field), _SQL)
+
+    def value(self, obj):
+        try:
+            return self.formula(lambda field: getattr(obj, field), _Python)
+        except TypeError:
+            # brak któregoś pomiaru (None) - jak NULL w SQL
+            return None
+
+
+INDICATORS = OrderedDict()
+
+
+def register(*args, **kwargs):
+    indicator = Indicator(*args, **kwargs)
+    INDICATORS[indicator.name] = indicator
+    return indicator
+
+
+register('waist_hip_ratio', 'antropometrics', u"WHR",
+         lambda field, fn: field('weist_perimeter') / fn.nullif(field('loins_perimeter'), 0))
+register('mean_arterial_pressure', 'bodypressure', u"MAP [mmHg]",
+         lambda field, fn: (field('systolic_left') + field('systolic_right')
+                            + 2 * (field('diastolic_left') + field('diastolic_right'))) / 6)
+register('inter_arm_difference', 'bodypressure', u"Różnica ciśnień skurczowych między ramionami [mmHg]",
+         lambda field, fn: fn.abs(field('systolic_left') - field('systolic_right')))
+register('abi_min', 'abi', u"ABI (mniejsza wartość)",
+         lambda field, fn: fn.least(field('left_side'), field('right_side')))
+register('imt_max', 'cartoidusg', u"IMT (większa wartość) [mm]",
+         lambda field, fn: fn.greatest(field('imt_left'), field('imt_right')))
+register('ldl_hdl_ratio', 'biochemistry', u"LDL/HDL",
+         lambda field, fn: field('ldl') / fn.nullif(field('ahdl'), 0))
+
+
+def for_model(model_name):
+    return [indicator for indicator in INDICATORS.values() if indicator.model_name == model_name]
+
+
+def stored_models():
+    """Nazwy modeli sekcji z kolumnami wskaźników."""
+    return list(OrderedDict((indicator.model_name, None) for indicator in INDICATORS.values() if indicator.stored))
+
+
+def sync(obj):
+    """Uzupełnia kolumny wskaźników obiektu sekcji z jego pól."""
+    for indicator in for_model(obj._meta.model_name):
+        if indicator.stored:
+            setattr(obj, indicator.name, indicator.value(obj))
+
+
+def update_stored(queryset):
+    """Przelicza kolumny wskaźników wierszy querysetu jednym UPDATE w bazie."""
+    values = dict((indicator.name, indicator.expression())
+                  for indicator in for_model(queryset.model._meta.model_name) if indicator.stored)
+    return queryset.update(**values) if values else 0
+
+
+def annotations(names=None, computed=False):
+    """
+    Lista (nazwa, wyrażenie) wskaźników dla querysetu Appointment. Wskaźniki
+    zapisane odczytywane są z kolumny, pozostałe (lub wszystkie przy
+    computed=True) liczone wzorem.
+    """
+    result = []
+    for name in names or INDICATORS:
+        indicator = INDICATORS[name]
+        path = indicator.model_name + '__'
+        if indicator.stored and not computed:
+            result.append((name, F(path + name)))
+        else:
+            result.append((name, indicator.expression(path)))
+    return result
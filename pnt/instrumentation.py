@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Opcjonalny pomiar metod modeli i widoków panelu administracyjnego: liczba
+wywołań, czas i liczba zapytań do bazy, sumowane na żądanie i na metodę.
+
+Włączane ustawieniem PNT_INSTRUMENTATION = True (przy wyłączonym dekoratory
+tylko sprawdzają ustawienie). Do MIDDLEWARE należy dodać
+'pnt.instrumentation.InstrumentationMiddleware' - po każdym żądaniu
+podsumowanie trafia do loggera 'pnt.instrumentation', a sumy procesu do
+raportu views.instrumentation_report (pnt/urls.py).
+
+Zapytania liczy licznik połączenia zwiększany przez kursor _CountingCursor
+(zakładany przy pierwszym pomiarze), a nie connection.queries_log - ten ma
+ograniczoną długość i przestaje rosnąć po 9000 zapytaniach. Wartości metod
+zawierają wywołania zagnieżdżone, np. get_sf36_points_sum() obejmuje
+get_sf36_groups().
+"""
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from timeit import default_timer
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.utils import CursorWrapper
+
+
+logger = logging.getLogger('pnt.instrumentation')
+
+# liczba ostatnich żądań pamiętanych dla raportu
+RECENT_REQUESTS = 50
+# liczba najdroższych metod w logu żądania
+LOGGED_METHODS = 10
+
+_local = threading.local()
+_lock = threading.Lock()
+_totals = {}
+_recent = deque(maxlen=RECENT_REQUESTS)
+
+
+def enabled():
+    return getattr(settings, 'PNT_INSTRUMENTATION', False)
+
+
+def _state():
+    if not hasattr(_local, 'depth'):
+        _local.depth = 0
+        _local.collector = None
+    return _local
+
+
+class _CountingCursor(CursorWrapper):
+    """Kursor zwiększający licznik zapytań swojego połączenia (connection.pnt_queries)."""
+    def execute(self, sql, params=None):
+        self.db.pnt_queries += 1
+        return super(_CountingCursor, self).execute(sql, params)
+
+    def executemany(self, sql, param_list):
+        self.db.pnt_queries += 1
+        return super(_CountingCursor, self).executemany(sql, param_list)
+
+
+def _counted(connection):
+    """Licznik zapytań połączenia - przy pierwszym użyciu opakowuje tworzenie jego kursorów."""
+    if not hasattr(connection, 'pnt_queries'):
+        connection.pnt_queries = 0
+        make_cursor, make_debug_cursor = connection.make_cursor, connection.make_debug_cursor
+        connection.make_cursor = lambda cursor: _CountingCursor(make_cursor(cursor), connection)
+        connection.make_debug_cursor = lambda cursor: _CountingCursor(make_debug_cursor(cursor), connection)
+    return connection.pnt_queries
+
+
+def _query_count():
+    return sum(_counted(connection) for connection in connections.all())
+
+
+def _add(stats, name, seconds, queries, calls=1):
+    entry = stats.setdefault(name, [0, 0.0, 0])
+    entry[0] += calls
+    entry[1] += seconds
+    entry[2] += queries
+
+
+def _merge(stats):
+    with _lock:
+        for name, (calls, seconds, queries) in stats.items():
+            _add(_totals, name, seconds, queries, calls)
+
+
+@contextmanager
+def record(name):
+    """Mierzy blok kodu jako wywołanie name (nic nie robi przy wyłączonym pomiarze)."""
+    if not enabled():
+        yield
+        return
+    state = _state()
+    state.depth += 1
+    queries, start = _query_count(), default_timer()
+    try:
+        yield
+    finally:
+        seconds, queries = default_timer() - start, _query_count() - queries
+        state.depth -= 1
+        if state.collector is not None:
+            _add(state.collector, name, seconds, queries)
+        else:
+            _merge({name: [1, seconds, queries]})
+
+
+def instrumented(method):
+    """Dekorator metody mierzonej jako "<Klasa>.<metoda>"."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not enabled():
+            return method(self, *args, **kwargs)
+        with record('%s.%s' % (type(self).__name__, method.__name__)):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def instrumented_view(view):
+    """Dekorator widoku ModelAdmin mierzonego jako "admin.<model>.<widok>" razem z renderowaniem szablonu."""
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        if not enabled():
+            return view(self, request, *args, **kwargs)
+        with record('admin.%s.%s' % (self.model._meta.model_name, view.__name__)):
+            response = view(self, request, *args, **kwargs)
+            # TemplateResponse renderuje się dopiero po wyjściu z widoku, a tam wołane są __unicode__
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+    return wrapper
+
+
+class InstrumentationMiddleware(object):
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not enabled():
+            return self.get_response(request)
+        state = _state()
+        state.collector = {}
+        try:
+            with record('request'):
+                response = self.get_response(request)
+        finally:
+            stats, state.collector = state.collector, None
+            _merge(stats)
+            self.log(request, stats)
+        return response
+
+    def log(self, request, stats):
+        calls, seconds, queries = stats.pop('request')
+        methods = sorted(stats.items(), key=lambda item: -item[1][1])
+        with _lock:
+            _recent.append({'path': request.path, 'method': request.method, 'seconds': seconds, 'queries': queries,
+                            'calls': [_row(name, entry) for name, entry in methods]})
+        logger.info(u"%s %s: %.3f s, %d zapytań%s", request.method, request.path, seconds, queries,
+                    u"".join(u"\n  %s: %d wywołań, %.3f s, %d zapytań" % ((name,) + tuple(entry))
+                             for name, entry in methods[:LOGGED_METHODS]))
+
+
+def _row(name, entry):
+    calls, seconds, queries = entry
+    return {'name': name, 'calls': calls, 'seconds': seconds, 'queries': queries,
+            'ms_per_call': 1000.0 * seconds / calls, 'queries_per_call': float(queries) / calls}
+
+
+def report():
+    """Sumy procesu (od startu lub reset()) posortowane malejąco po czasie i ostatnie żądania."""
+    with _lock:
+        totals = sorted((_row(name, entry) for name, entry in _totals.items()), key=lambda row: -row['seconds'])
+        return {'totals': totals, 'recent': list(reversed(_recent))}
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+        _recent.clear()
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pnt.dose import dose_values
+from pnt.models import HipotensionChemicalTaken, OtherChemical
+
+
+class Command(BaseCommand):
+    help = u"Uzupełnia liczbowe dawki leków (DoseModel) na podstawie pól tekstowych."
+
+    def handle(self, *args, **options):
+        for model in (HipotensionChemicalTaken, OtherChemical):
+            # dawek jest niewiele różnych - jedno update() na kombinację zamiast na wiersz,
+            # update() zamiast save(), aby backfill nie tworzył wpisów historii
+            doses = model.objects.values_list('morning_dose', 'midday_dose', 'evening_dose').distinct()
+            updated, invalid = 0, 0
+            with transaction.atomic():
+                for morning, midday, evening in doses:
+                    values = dose_values(morning, midday, evening)
+                    count = model.objects.filter(morning_dose=morning, midday_dose=midday, evening_dose=evening).update(
+                        **dict(zip(model.derived_fields, values)))
+                    updated += count
+                    if values[-1] is None:
+                        invalid += count
+            self.stdout.write(u"%s: zaktualizowano %d wierszy, nieczytelna dawka: %d." % (
+                model._meta.verbose_name_plural, updated, invalid))
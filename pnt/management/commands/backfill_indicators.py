@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pnt.indicators import stored_models, update_stored
+
+
+class Command(BaseCommand):
+    help = u"Uzupełnia zapisane kolumny wskaźników (pnt/indicators.py) w sekcjach wizyt."
+
+    def handle(self, *args, **options):
+        # jedno UPDATE z wyrażeniem na model - bez save(), a więc i bez wpisów historii
+        with transaction.atomic():
+            for model_name in stored_models():
+                model = apps.get_model('pnt', model_name)
+                count = update_stored(model.objects.all())
+                self.stdout.write(u"%s: zaktualizowano %d wierszy." % (model._meta.verbose_name_plural, count))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pnt.models import Patient
+from pnt.pesel import decode_birth_date, decode_sex_digit
+
+
+class Command(BaseCommand):
+    help = u"Uzupełnia datę urodzenia i cyfrę płci pacjentów na podstawie numeru PESEL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        groups = defaultdict(list)
+        for pk, pesel in Patient.objects.order_by('pk').values_list('pk', 'pesel').iterator():
+            groups[(decode_birth_date(pesel), decode_sex_digit(pesel))].append(pk)
+        # jedno update() ... WHERE pk IN (...) na parę (data urodzenia, cyfra płci) zamiast na pacjenta,
+        # update() zamiast save(), aby backfill nie tworzył wpisów historii
+        batches = [(key, pks[start:start + chunk_size]) for key, pks in groups.items()
+                   for start in range(0, len(pks), chunk_size)]
+        updated, invalid = 0, 0
+        while batches:
+            # transakcja obejmuje około chunk_size pacjentów
+            with transaction.atomic():
+                size = 0
+                while batches and size < chunk_size:
+                    (birth_date, sex_digit), pks = batches.pop()
+                    Patient.objects.filter(pk__in=pks).update(birth_date=birth_date, sex_digit=sex_digit)
+                    size += len(pks)
+                    if birth_date is None:
+                        invalid += len(pks)
+                updated += size
+        self.stdout.write(u"Zaktualizowano %d pacjentów, niepoprawny PESEL: %d." % (updated, invalid))
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from pnt.benchmark import FixtureGenerator, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (u"Tworzy testową bazę danych z syntetycznymi pacjentami i wizytami, mierzy czas i liczbę "
+            u"zapytań najcięższych operacji i wypisuje wyniki jako JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=100)
+        parser.add_argument('--appointments', type=int, default=3, help=u"Liczba wizyt na pacjenta.")
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--only', action='append', help=u"Prefiks nazwy przypadku (można powtarzać).")
+        parser.add_argument('--output', help=u"Plik wynikowy (domyślnie standardowe wyjście).")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            FixtureGenerator(options['seed']).generate(options['patients'], options['appointments'])
+            result = run_benchmarks(options['repeat'], options['only'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        result.update(patients=options['patients'], appointments_per_patient=options['appointments'],
+                      seed=options['seed'])
+        output = json.dumps(result, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                stream.write(output + '\n')
+        else:
+            self.stdout.write(output)
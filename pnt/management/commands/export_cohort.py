@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pnt.export import WRITERS, export_appointments
+from pnt.models import Appointment, APPOINTMENT_SECTIONS
+
+
+def _date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    help = u"Eksportuje wizyty (jedna wizyta na wiersz, wszystkie sekcje) do pliku CSV lub Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help=u"Ścieżka pliku wynikowego.")
+        parser.add_argument('--format', choices=sorted(WRITERS), default='csv')
+        parser.add_argument('--date-from', type=_date, help=u"Data wizyty od (RRRR-MM-DD).")
+        parser.add_argument('--date-to', type=_date, help=u"Data wizyty do (RRRR-MM-DD).")
+        parser.add_argument('--sections', help=u"Sekcje oddzielone przecinkami (domyślnie wszystkie).")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        sections = APPOINTMENT_SECTIONS
+        if options['sections']:
+            sections = tuple(section.strip() for section in options['sections'].split(','))
+            unknown = set(sections) - set(APPOINTMENT_SECTIONS)
+            if unknown:
+                raise CommandError(u"Nieznane sekcje: %s" % u", ".join(sorted(unknown)))
+        queryset = Appointment.objects.all()
+        if options['date_from']:
+            queryset = queryset.filter(date__gte=options['date_from'])
+        if options['date_to']:
+            queryset = queryset.filter(date__lte=options['date_to'])
+        count = export_appointments(options['output'], options['format'], queryset, sections, options['chunk_size'])
+        self.stdout.write(u"Wyeksportowano %d wizyt do %s." % (count, options['output']))
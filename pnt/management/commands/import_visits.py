@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from pnt.importer import VisitImporter
+
+
+class Command(BaseCommand):
+    help = u"Importuje wizyty z pliku JSON (jedna wizyta na linię, format opisany w pnt/importer.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--errors', help=u"Plik na odrzucone wiersze (JSON, jeden na linię).")
+        parser.add_argument('--resume', action='store_true',
+                            help=u"Wznów od linii zapisanej w pliku punktu kontrolnego (<path>.checkpoint).")
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['path'] + '.checkpoint'
+        start_line = 0
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint:
+                start_line = int(checkpoint.read().strip() or 0)
+            self.stdout.write(u"Wznawianie od linii %d." % (start_line + 1))
+        errors = open(options['errors'], 'a') if options['errors'] else None
+
+        def save_checkpoint(line):
+            with open(checkpoint_path, 'w') as checkpoint:
+                checkpoint.write(str(line))
+            self.stdout.write(u"Zatwierdzono do linii %d." % line)
+
+        def report(line, messages):
+            if errors is not None:
+                errors.write(json.dumps({'line': line, 'errors': messages}) + '\n')
+            else:
+                self.stderr.write(u"Linia %d: %s" % (line, json.dumps(messages, ensure_ascii=False)))
+
+        try:
+            with io.open(options['path'], encoding='utf-8') as lines:
+                saved, failed = VisitImporter(options['chunk_size']).run(lines, start_line, save_checkpoint, report)
+        finally:
+            if errors is not None:
+                errors.close()
+        self.stdout.write(u"Zaimportowano %d wizyt, odrzucono %d wierszy." % (saved, failed))
+        if saved:
+            self.stdout.write(u"Indeks bitmapowy w pliku i w działających procesach przebuduj komendą "
+                              u"rebuild_bitmap_index.")
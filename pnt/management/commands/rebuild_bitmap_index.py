@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pnt.bitmaps import APPOINTMENTS, PATIENTS, BACKEND, BitmapIndex, reset_index
+
+
+class Command(BaseCommand):
+    help = u"Przebudowuje indeks bitmapowy odpowiedzi kategorycznych i zapisuje go do pliku."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help=u"Plik indeksu (domyślnie ustawienie PNT_BITMAP_INDEX_PATH).")
+
+    def handle(self, *args, **options):
+        path = options['path'] or getattr(settings, 'PNT_BITMAP_INDEX_PATH', None)
+        if not path:
+            raise CommandError(u"Podaj --path albo ustaw PNT_BITMAP_INDEX_PATH.")
+        index = BitmapIndex().build()
+        index.save(path)
+        reset_index()
+        self.stdout.write(u"Zapisano %d bitmap (%s) dla %d wizyt i %d pacjentów do %s." % (
+            len(index.keys()), BACKEND, len(index.universe[APPOINTMENTS]), len(index.universe[PATIENTS]), path))
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pnt import search
+from pnt.models import Patient
+
+# kolumna źródłowa, kolumna wyszukiwania, normalizacja (jak w Patient.sync_search_fields())
+SEARCH_FIELDS = (('first_name', 'first_name_search', search.fold),
+                 ('last_name', 'last_name_search', search.fold),
+                 ('phone', 'phone_search', search.normalize_phone))
+
+
+class Command(BaseCommand):
+    help = u"Uzupełnia znormalizowane kolumny wyszukiwania pacjentów (imię, nazwisko, telefon)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        for field, search_field, normalize in SEARCH_FIELDS:
+            # imion i nazwisk jest znacznie mniej niż pacjentów - jedno update() na różną wartość
+            # zamiast na wiersz, update() zamiast save(), aby backfill nie tworzył wpisów historii
+            values = list(Patient.objects.order_by(field).values_list(field, flat=True).distinct())
+            updated = 0
+            for start in range(0, len(values), chunk_size):
+                with transaction.atomic():
+                    for value in values[start:start + chunk_size]:
+                        updated += Patient.objects.filter(**{field: value}).update(**{search_field: normalize(value)})
+            self.stdout.write(u"%s: zaktualizowano %d pacjentów (%d różnych wartości)." % (
+                search_field, updated, len(values)))
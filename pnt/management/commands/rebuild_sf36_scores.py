@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+
+from pnt.models import SF36Score
+
+
+class Command(BaseCommand):
+    help = u"Przelicza od nowa tabelę SF36Score dla wszystkich kwestionariuszy LifeQuality."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help=u"Liczba kwestionariuszy liczonych w jednej partii.")
+
+    def handle(self, *args, **options):
+        count = SF36Score.objects.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(u"Zapisano %d wyników SF-36." % count)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import json
+import multiprocessing
+import os
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+
+from pnt.indicators import stored_models, update_stored
+from pnt.models import SF36Score, ApnoeaScore
+
+
+class _Indicators(object):
+    """Kolumny wskaźników sekcji (indicators.py) z interfejsem StoredScoreManager."""
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def source_model(self):
+        return apps.get_model('pnt', self.model_name)
+
+    def refresh(self, ids):
+        return update_stored(self.source_model().objects.filter(pk__in=list(ids)))
+
+    def delete_orphans(self):
+        pass
+
+
+# rodzaj wyniku -> StoredScoreManager tabeli wyników lub kolumny wskaźników
+SCORES = {
+    'sf36': SF36Score.objects,
+    'apnoea': ApnoeaScore.objects,
+}
+SCORES.update(('indicators.%s' % model_name, _Indicators(model_name)) for model_name in stored_models())
+
+
+def _init_worker():
+    # połączenia odziedziczone po procesie nadrzędnym nie mogą być współdzielone
+    connections.close_all()
+
+
+def _recompute(task):
+    """Przelicza wyniki rodzaju kind dla wierszy źródła o id z [start, stop)."""
+    kind, start, stop = task
+    manager = SCORES[kind]
+    ids = manager.source_model().objects.filter(pk__gte=start, pk__lt=stop).values_list('pk', flat=True)
+    return kind, start, manager.refresh(ids)
+
+
+class Command(BaseCommand):
+    help = u"Przelicza równolegle zapisane wyniki (SF-36, Epworth, ryzyko bezdechu, wskaźniki) w przedziałach id."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help=u"Liczba procesów roboczych (1 - bez puli procesów).")
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help=u"Szerokość przedziału id liczonego w jednej partii.")
+        parser.add_argument('--only', action='append', choices=sorted(SCORES),
+                            help=u"Przelicz tylko podany rodzaj wyników (można powtórzyć).")
+        parser.add_argument('--state',
+                            help=u"Plik stanu (JSON) z ukończonymi partiami - pozwala wznowić przerwane przeliczanie.")
+
+    def load_state(self, path, chunk_size):
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path) as stream:
+            state = json.load(stream)
+        if state.get('chunk_size') != chunk_size:
+            raise CommandError(u"Plik stanu zapisano dla --chunk-size %s." % state.get('chunk_size'))
+        self.stdout.write(u"Wznawianie z pliku %s." % path)
+        return state['done']
+
+    def save_state(self, path, chunk_size, done):
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as stream:
+            json.dump({'chunk_size': chunk_size, 'done': done}, stream)
+        os.rename(tmp, path)
+
+    def tasks(self, kinds, chunk_size, done):
+        tasks = []
+        for kind in kinds:
+            bounds = SCORES[kind].source_model().objects.aggregate(Min('pk'), Max('pk'))
+            if bounds['pk__min'] is None:
+                continue
+            finished = set(done.get(kind, ()))
+            for start in range(bounds['pk__min'], bounds['pk__max'] + 1, chunk_size):
+                if start not in finished:
+                    tasks.append((kind, start, start + chunk_size))
+        return tasks
+
+    def handle(self, *args, **options):
+        kinds = options['only'] or sorted(SCORES)
+        chunk_size, state_path = options['chunk_size'], options['state']
+        done = self.load_state(state_path, chunk_size)
+        tasks = self.tasks(kinds, chunk_size, done)
+        self.stdout.write(u"Partii do przeliczenia: %d." % len(tasks))
+
+        if options['workers'] > 1 and len(tasks) > 1:
+            connections.close_all()
+            pool = multiprocessing.Pool(options['workers'], _init_worker)
+            results = pool.imap_unordered(_recompute, tasks)
+        else:
+            pool = None
+            results = (_recompute(task) for task in tasks)
+
+        counts = dict((kind, 0) for kind in kinds)
+        try:
+            for i, (kind, start, count) in enumerate(results):
+                counts[kind] += count
+                done.setdefault(kind, []).append(start)
+                if state_path:
+                    self.save_state(state_path, chunk_size, done)
+                self.stdout.write(u"[%d/%d] %s: id %d-%d, zapisano %d." % (
+                    i + 1, len(tasks), kind, start, start + chunk_size - 1, count))
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        for kind in kinds:
+            SCORES[kind].delete_orphans()
+            self.stdout.write(u"%s: zapisano %d wyników." % (kind, counts[kind]))
+        if state_path and os.path.exists(state_path):
+            os.remove(state_path)
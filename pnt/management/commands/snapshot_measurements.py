@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+
+from pnt.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = u"Zapisuje kolumnowy zrzut badań laboratoryjnych i echa serca do plików .npy (np.load(mmap_mode='r'))."
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help=u"Katalog zrzutu (tabele są podmieniane w całości).")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        for name, rows in sorted(write_snapshot(options['directory'], options['chunk_size']).items()):
+            self.stdout.write(u"%s: %d wierszy" % (name, rows))
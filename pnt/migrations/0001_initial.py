@@ -0,0 +1,933 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('records', '__first__'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ABI',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('left_side', models.FloatField(verbose_name=b'Strona lewa')),
+                ('right_side', models.FloatField(verbose_name=b'Strona prawa')),
+            ],
+            options={
+                'verbose_name': 'ABI',
+                'verbose_name_plural': 'ABI',
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityLimit',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('limit', models.CharField(choices=[(b'a', b'Bardzo ogranicza'), (b'b', b'Troch\xc4\x99 ogranicza'), (b'c', b'Nie ogranicza wcale')], max_length=1, verbose_name=b'Poziom ograniczenia')),
+                ('activitylimit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lifequality_by_activity', to='records.CategoricalValue', verbose_name=b'Czynno\xc5\x9b\xc4\x87')),
+            ],
+            options={
+                'verbose_name': 'Ograniczenia aktywno\u015bci dziennych',
+                'verbose_name_plural': 'Ograniczenia aktywno\u015bci dziennych',
+            },
+        ),
+        migrations.CreateModel(
+            name='Address',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=255, verbose_name=b'Adres')),
+                ('city', models.CharField(max_length=255, verbose_name=b'Miasto')),
+                ('zip_code', models.CharField(max_length=255, verbose_name=b'Kod pocztowy')),
+            ],
+            options={
+                'verbose_name': 'Adres',
+                'verbose_name_plural': 'Adresy',
+            },
+        ),
+        migrations.CreateModel(
+            name='Antropometrics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('loins_perimeter', models.FloatField(verbose_name=b'Obw\xc3\xb3d bioder [cm]')),
+                ('weist_perimeter', models.FloatField(verbose_name=b'Obw\xc3\xb3d talii [cm]')),
+                ('height', models.FloatField(verbose_name=b'Wzrost [w cm]')),
+            ],
+            options={
+                'verbose_name': 'Pomiar antropometryczny',
+                'verbose_name_plural': 'Pomiary antropometryczne',
+            },
+        ),
+        migrations.CreateModel(
+            name='Apnoea',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snooring', models.CharField(choices=[(b'1', b'Nigdy'), (b'2', b'Rzadko (mniej ni\xc5\xbc raz w tygodniu)'), (b'3', b'Okazjonalnie (1 - 3 x/tydzie\xc5\x84)'), (b'4', b'Cz\xc4\x99sto (cz\xc4\x99\xc5\x9bciej ni\xc5\xbc 3 x w tygodniu)')], max_length=1, verbose_name='Jak cz\u0119sto zauwa\u017ca lub m\xf3wi\u0105 o tym wsp\xf3\u0142mieszka\u0144cy, \u017ce chrapanie jest na tyle g\u0142o\u015bne, \u017ce przeszkadza im spa\u0107?')),
+                ('sleap_apnoea', models.CharField(choices=[(b'1', b'Nigdy'), (b'2', b'Rzadko (mniej ni\xc5\xbc raz w tygodniu)'), (b'3', b'Okazjonalnie (1 - 3 x/tydzie\xc5\x84)'), (b'4', b'Cz\xc4\x99sto (cz\xc4\x99\xc5\x9bciej ni\xc5\xbc 3 x w tygodniu)')], max_length=1, verbose_name='Jak cz\u0119sto m\xf3wiono \u017ce ma \u201eprzerwy w oddychaniu podczas snu?')),
+                ('overweight', models.CharField(choices=[(b'1', b'Wcale'), (b'2', b'niewielk\xc4\x85 (4,5 \xe2\x80\x93 9 kg) = w oryginale to 10-20 funt\xc3\xb3w(?)'), (b'3', b'umiarkowan\xc4\x85 (10-20 kg) = w oryginale to 20-40 funt\xc3\xb3w(?)'), (b'4', b'znaczn\xc4\x85 (powy\xc5\xbcej 20 kg) = w oryginale to > 40 funt\xc3\xb3w(?)')], max_length=1, verbose_name='Ile ma kilogram\xf3w (w oryginale funt\xf3w) nadwagi?')),
+            ],
+            options={
+                'verbose_name': 'Bezdech Senny',
+                'verbose_name_plural': 'Bezdech Senny',
+            },
+        ),
+        migrations.CreateModel(
+            name='ApnoeaIdentification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('apnoea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.Apnoea')),
+                ('apnoeaidentification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='apnoea_by_identification', to='records.CategoricalValue', verbose_name=b'Rozpoznanie')),
+            ],
+            options={
+                'verbose_name': 'Objaw sugeruj\u0105cy bezdech senny',
+                'verbose_name_plural': 'Objawy sugeruj\u0105ce bezdech senny',
+            },
+        ),
+        migrations.CreateModel(
+            name='ApnoeaRelatedDisease',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('apnoea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.Apnoea')),
+                ('apnoearelateddisease', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='apnoea_by_disease', to='records.CategoricalValue', verbose_name=b'Rozpoznanie')),
+            ],
+            options={
+                'verbose_name': 'Schorzenie sugeruj\u0105ce bezdech senny',
+                'verbose_name_plural': 'Schorzenia sugeruj\u0105ce bezdech senny',
+            },
+        ),
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name=b'Data')),
+                ('time', models.TimeField(blank=True, null=True, verbose_name=b'Godzina')),
+            ],
+            options={
+                'verbose_name': 'Wizyta',
+                'verbose_name_plural': 'Wizyty',
+            },
+        ),
+        migrations.CreateModel(
+            name='Biochemistry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wbc', models.FloatField(verbose_name=b'WBC [10e9/L]')),
+                ('rbc', models.FloatField(verbose_name=b'RBC [10e12/L]')),
+                ('hgb', models.FloatField(verbose_name=b'HGB [mmol/L]')),
+                ('hct', models.FloatField(verbose_name=b'HCT [L/L]')),
+                ('mvc', models.FloatField(verbose_name=b'MVC [fL]')),
+                ('plt', models.FloatField(verbose_name=b'PLT [10e9/L]')),
+                ('Na', models.FloatField(verbose_name=b'Na [mmol/L]')),
+                ('K', models.FloatField(verbose_name=b'K [mmol/L]')),
+                ('chol', models.FloatField(verbose_name=b'CHOL [mmol/L]')),
+                ('ldl', models.FloatField(verbose_name=b'LDL [mmol/L]')),
+                ('ahdl', models.FloatField(verbose_name=b'AHDL [mmol/L]')),
+                ('tgl', models.FloatField(verbose_name=b'TGL [mmol/L]')),
+                ('bun', models.FloatField(verbose_name=b'BUN [mmol/L]')),
+                ('ast', models.FloatField(verbose_name=b'AST [U/L]')),
+                ('alt', models.FloatField(verbose_name=b'ALT [U/L]')),
+                ('gluc', models.FloatField(verbose_name=b'GLUC [mmol/L]')),
+                ('urca', models.FloatField(verbose_name=b'URCA [mg/L]')),
+                ('rcrp', models.FloatField(verbose_name=b'RCRP [mg/L]')),
+                ('crea', models.FloatField(verbose_name=b'CREA [umol/L]')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+            ],
+            options={
+                'verbose_name': 'Badanie laboratoryjne',
+                'verbose_name_plural': 'Badania laboratoryjne',
+            },
+        ),
+        migrations.CreateModel(
+            name='BodyPressure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('systolic_left', models.FloatField(verbose_name=b'Ci\xc5\x9bnienie skurczowe strona lewa')),
+                ('systolic_right', models.FloatField(verbose_name=b'Ci\xc5\x9bnienie skurczowe strona prawa')),
+                ('diastolic_left', models.FloatField(verbose_name=b'Ci\xc5\x9bnienie rozkurczowe strona lewa')),
+                ('diastolic_right', models.FloatField(verbose_name=b'Ci\xc5\x9bnienie rozkurczowe strona prawa')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+            ],
+            options={
+                'verbose_name': 'Pomiar BP',
+                'verbose_name_plural': 'Pomiary BP',
+            },
+        ),
+        migrations.CreateModel(
+            name='CartoidUSG',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('imt_left', models.FloatField(verbose_name=b'IMT strona lewa [mm]')),
+                ('imt_right', models.FloatField(verbose_name=b'IMT strona prawa [mm]')),
+                ('plaques', models.BooleanField(verbose_name=b'Blaszki mia\xc5\xbcdzycowe [mm]')),
+                ('notes', models.TextField(verbose_name=b'Notatki')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+            ],
+            options={
+                'verbose_name': 'USG tetnic szyjnych',
+                'verbose_name_plural': 'USG tetnic szyjnych',
+            },
+        ),
+        migrations.CreateModel(
+            name='CaseHistory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('diagnosis_year', models.IntegerField(verbose_name=b'Rok diagnozy')),
+                ('already_hospitalized', models.BooleanField(verbose_name=b'Hospitalizowany w tutejszej klinice?')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+            ],
+            options={
+                'verbose_name': 'Historia choroby',
+                'verbose_name_plural': 'Historie choroby',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChemicalInternationalType',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name=b'Nazwa')),
+            ],
+            options={
+                'verbose_name': 'Mi\u0119dzynarodowa nazwa leku',
+                'verbose_name_plural': 'Mi\u0119dzynarodowe nazwy lek\xf3w',
+            },
+        ),
+        migrations.CreateModel(
+            name='Consultant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note', models.TextField(blank=True, verbose_name=b'Notatka')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+                ('consultant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue')),
+            ],
+            options={
+                'verbose_name': 'Leczenie u specjalisty',
+                'verbose_name_plural': 'Rodzaje leczenia u specjalisty',
+            },
+        ),
+        migrations.CreateModel(
+            name='Contraceptive',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name=b'Nazwa leku')),
+                ('how_long', models.IntegerField(verbose_name=b'Liczba miesi\xc4\x99cy stosowania')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+                ('contraceptive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sexlifes_by_contraceptive', to='records.CategoricalValue')),
+            ],
+            options={
+                'verbose_name': 'Lek antykoncpecyjny',
+                'verbose_name_plural': 'Leki antykoncpecyjne',
+            },
+        ),
+        migrations.CreateModel(
+            name='DerivativeEtiologyBackground',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[(b'a', b'Podejrzenie'), (b'b', b'Diagnoza')], max_length=1, verbose_name=b'Status rozpoznania')),
+                ('derivativeetiologybackground', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue')),
+            ],
+            options={
+                'verbose_name': 'T\u0142o wt\xf3rnej etiologii',
+                'verbose_name_plural': 'T\u0142a wt\xf3rnej etiologii',
+            },
+        ),
+        migrations.CreateModel(
+            name='Disease',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+                ('disease', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue', verbose_name=b'Choroba')),
+            ],
+            options={
+                'verbose_name': 'Rodzaj choroby w historii',
+                'verbose_name_plural': 'Rodzaje chor\xf3b w historii',
+            },
+        ),
+        migrations.CreateModel(
+            name='Drink',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sweet_dring_daily', models.IntegerField(verbose_name=b'Liczba szklanek s\xc5\x82odzonych napoj\xc3\xb3w gazowanych wypijanych dziennie')),
+                ('veg_fruit_dring_daily', models.IntegerField(verbose_name=b'Liczba szklanek sok\xc3\xb3w owocowo-warzywnych wypijanych dziennie')),
+                ('coffe_daily', models.IntegerField(verbose_name=b'Liczba szklanek kawy wypijanych dziennie')),
+                ('tee_daily', models.IntegerField(verbose_name=b'Liczba szklanek herbaty wypijanych dziennie')),
+                ('sugar_spoons', models.IntegerField(verbose_name=b'Liczba \xc5\x82y\xc5\xbceczek cukru do  herbaty/kawy')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+                ('tee_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drinks_by_tee_type', to='records.CategoricalValue', verbose_name=b'Najcz\xc4\x99\xc5\x9bciej wypijany rodzaj herbaty')),
+                ('water_volume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drinks_by_water_volume', to='records.CategoricalValue', verbose_name=b'Liczba szklanek wypijanych dziennie')),
+            ],
+            options={
+                'verbose_name': 'Napoje',
+                'verbose_name_plural': 'Napoje',
+            },
+        ),
+        migrations.CreateModel(
+            name='EKG',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hr', models.FloatField(verbose_name=b'HR [/min]')),
+                ('sl_factor', models.FloatField(verbose_name=b'Wska\xc5\xbanik Soko\xc5\x82owa-Lyona [mm]')),
+                ('cornell_factor', models.FloatField(verbose_name=b'Wska\xc5\xbanik Cornell [mm]')),
+                ('notes', models.TextField(verbose_name=b'Notatki')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+            ],
+            options={
+                'verbose_name': 'EKG',
+                'verbose_name_plural': 'EKG',
+            },
+        ),
+        migrations.CreateModel(
+            name='EmotionalProblem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('emotionalproblem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lifequality_by_emotionalproblem', to='records.CategoricalValue', verbose_name=b'Problem')),
+            ],
+            options={
+                'verbose_name': 'Problem z prac\u0105/aktywno\u015bci\u0105',
+                'verbose_name_plural': 'Problemy z prac\u0105/aktywno\u015bci\u0105',
+            },
+        ),
+        migrations.CreateModel(
+            name='EpworthScale',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sitting', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Siedz\xc4\x85c lub/i czytaj\xc4\x85c')),
+                ('tv_watch', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Ogl\xc4\x85daj\xc4\x85c telewizj\xc4\x99')),
+                ('public', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Siedz\xc4\x85c w miejscu publicznym, np.: w teatrze lub na zebraniu')),
+                ('in_car_passenger', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Podczas godzinnej, nieprzerwanej jazdy samochodem jako pasa\xc5\xbcer')),
+                ('afternoon_rest', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Po po\xc5\x82udniu, le\xc5\xbc\xc4\x85c celem odpoczynku')),
+                ('talk_sitting', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Podczas rozmowy, siedz\xc4\x85c')),
+                ('after_dinner', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Po obiedzie (bez alkoholu), siedz\xc4\x85c w spokojnym miejscu')),
+                ('car_driving', models.CharField(choices=[(b'1', b'Nigdy nie zasn\xc4\x99'), (b'2', b'Ma\xc5\x82e prawdopodobie\xc5\x84stwo'), (b'3', b'Prawdopodobnie tak'), (b'4', b'Prawie na pewno')], max_length=1, verbose_name=b'Prowadz\xc4\x85c samoch\xc3\xb3d, podczas kilkuminutowego oczekiwania w korku')),
+                ('apnoea', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Apnoea', verbose_name=b'Ocena bezdechu')),
+            ],
+            options={
+                'verbose_name': 'Skala Epworth',
+                'verbose_name_plural': 'Skala Epworth',
+            },
+        ),
+        migrations.CreateModel(
+            name='Etiology',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actual_etiology_value', models.CharField(choices=[(b'a', b'Pierwotna'), (b'b', b'Wt\xc3\xb3rna')], max_length=1, verbose_name=b'Aktualna etiologia nadci\xc5\x9bnienia')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+                ('derivative_etiology_backgrounds', models.ManyToManyField(related_name='etiology_by_derivatives', through='pnt.DerivativeEtiologyBackground', to='records.CategoricalValue', verbose_name=b'T\xc5\x82o etiologi wt\xc3\xb3rnej')),
+            ],
+            options={
+                'verbose_name': 'Etiologia nadci\u015bnienia t\u0119tnicznego',
+                'verbose_name_plural': 'Etiologia nadci\u015bnienia t\u0119tnicznego',
+            },
+        ),
+        migrations.CreateModel(
+            name='EtiologySymptom',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etiology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.Etiology')),
+                ('etiologysymptom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExaminationResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etiology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.Etiology')),
+                ('examinationresult', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue')),
+            ],
+            options={
+                'verbose_name': 'Wynik badania przedmiotowego',
+                'verbose_name_plural': 'Wyniki bada\u0144 przedmiotowych',
+            },
+        ),
+        migrations.CreateModel(
+            name='FamilyDisease',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member', models.CharField(choices=[(b'a', b'Ojciec'), (b'b', b'Matka'), (b'c', b'Brat'), (b'd', b'Siostra')], max_length=1, verbose_name=b'Cz\xc5\x82onek rodziny')),
+                ('age', models.IntegerField(blank=True, null=True, verbose_name=b'Wiek w kt\xc3\xb3rym zachorowa\xc5\x82')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+                ('familydisease', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue', verbose_name=b'Rodzaj choroby')),
+            ],
+            options={
+                'verbose_name': 'Choroba w rodzinie',
+                'verbose_name_plural': 'Choroby w rodzinie',
+            },
+        ),
+        migrations.CreateModel(
+            name='GeneralDisease',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note', models.TextField(blank=True, verbose_name=b'Notatka uzupe\xc5\x82niaj\xc4\x85ca')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+                ('generaldisease', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue', verbose_name=b'Choroba')),
+            ],
+            options={
+                'verbose_name': 'Choroba z\u0142o\u017cona w historii',
+                'verbose_name_plural': 'Choroby z\u0142o\u017cone  w historii',
+            },
+        ),
+        migrations.CreateModel(
+            name='HealthProblem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('healthproblem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lifequality_by_healthproblem', to='records.CategoricalValue', verbose_name=b'Problem')),
+            ],
+            options={
+                'verbose_name': 'Proble zwi\u0105zany ze zdrowiem',
+                'verbose_name_plural': 'Problemy zwi\u0105zane ze zdrowiem',
+            },
+        ),
+        migrations.CreateModel(
+            name='HealthSelfOpinion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state_power', models.CharField(choices=[(b'a', b'Szczeg\xc3\xb3lnie prawdziwe'), (b'b', b'Czasami prawdziwe'), (b'c', b'Nie wiem'), (b'd', b'Czasami fa\xc5\x82szywe'), (b'e', b'Szczeg\xc3\xb3lnie fa\xc5\x82szywe')], max_length=1, verbose_name=b'Prawdziwo\xc5\x9b\xc4\x87 stwierdzenia')),
+                ('healthselfopinion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lifequality_by_healthselfopinion', to='records.CategoricalValue', verbose_name=b'Samoocena stanu zdrowia')),
+            ],
+            options={
+                'verbose_name': 'Samoocena stanu zdrowia',
+                'verbose_name_plural': 'Samoocena stanu zdrowia',
+            },
+        ),
+        migrations.CreateModel(
+            name='HeartEcho',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('la_d', models.FloatField(verbose_name=b'LA D [cm]')),
+                ('lvidd', models.FloatField(verbose_name=b'LVIDd [cm]')),
+                ('rvdd', models.FloatField(verbose_name=b'RVDd [cm]')),
+                ('lvpwd', models.FloatField(verbose_name=b'LVPWd [cm]')),
+                ('ivsd', models.FloatField(verbose_name=b'IVSd [cm]')),
+                ('asc_ao', models.FloatField(verbose_name=b'Asc.Ao [cm]')),
+                ('ao_diam_stub', models.FloatField(verbose_name=b'Ao diam STub[cm]')),
+                ('aoroot', models.FloatField(verbose_name=b'AoRoot [cm]')),
+                ('lvd_massase', models.FloatField(verbose_name=b'LVd MassASE [g]')),
+                ('lvd_mi_ase', models.FloatField(verbose_name=b'LVd MI Ase [g/m^2]')),
+                ('lvd_masspenn', models.FloatField(verbose_name=b'LVd MassPENN [g]')),
+                ('lvd_mi_penn', models.FloatField(verbose_name=b'LVd MI Penn [g/m^2]')),
+                ('mitral_valve', models.TextField(verbose_name=b'Zastawka mitralna')),
+                ('aortal_valve', models.TextField(verbose_name=b'Zastawka aortalna')),
+                ('tricuspid_valve', models.TextField(verbose_name=b'Zastawka tr\xc3\xb3jdzielna')),
+                ('ef', models.FloatField(verbose_name=b'EF [%]')),
+                ('contractility', models.TextField(verbose_name=b'Kurczliwo\xc5\x9b\xc4\x87')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+                ('ia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='heart_echo_by_ia', to='records.CategoricalValue', verbose_name=b'IA')),
+                ('im', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='heart_echo_by_im', to='records.CategoricalValue', verbose_name=b'IM')),
+                ('it', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='heart_echo_by_it', to='records.CategoricalValue', verbose_name=b'IT')),
+            ],
+            options={
+                'verbose_name': 'Echo serca',
+                'verbose_name_plural': 'Echa serca',
+            },
+        ),
+        migrations.CreateModel(
+            name='HipotensionChemical',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name=b'Nazwa')),
+                ('international_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.ChemicalInternationalType', verbose_name=b'Nazwa mi\xc4\x99dzynarodowa')),
+            ],
+            options={
+                'ordering': ('name', 'international_name__name'),
+                'verbose_name': 'Rodzaj leku hipotensyjnego',
+                'verbose_name_plural': 'Rodzaje lek\xf3w hipotensyjnych',
+            },
+        ),
+        migrations.CreateModel(
+            name='HipotensionChemicalTaken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('morning_dose', models.CharField(max_length=4, verbose_name=b'Dawka poranna')),
+                ('midday_dose', models.CharField(max_length=4, verbose_name=b'Dawka po\xc5\x82udniowa')),
+                ('evening_dose', models.CharField(max_length=4, verbose_name=b'Dawka wieczorna')),
+                ('taken_less_then_week', models.BooleanField(verbose_name=b'Przyjmuje kr\xc3\xb3cej ni\xc5\xbc tydzie\xc5\x84')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+                ('hipotension_chemical', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.HipotensionChemical', verbose_name=b'Rodzaj leku')),
+            ],
+            options={
+                'verbose_name': 'Lek hipotensyjny',
+                'verbose_name_plural': 'Leki hipotensyjne',
+            },
+        ),
+        migrations.CreateModel(
+            name='HistoricalPatient',
+            fields=[
+                ('first_name', models.CharField(max_length=255, verbose_name=b'Imi\xc4\x99')),
+                ('last_name', models.CharField(max_length=255, verbose_name=b'Nazwisko')),
+                ('pesel', models.CharField(db_index=True, max_length=11, verbose_name=b'Pesel')),
+                ('phone', models.CharField(max_length=255, verbose_name=b'Telefon')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name=b'E-mail')),
+                ('occupation_name', models.CharField(blank=True, max_length=255, verbose_name=b'Nazwa zawodu')),
+                ('id', models.IntegerField(db_index=True, verbose_name='ID')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('history_type', models.CharField(choices=[(b'+', b'Created'), (b'~', b'Changed'), (b'-', b'Deleted')], max_length=1)),
+                ('education', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='records.CategoricalValue', verbose_name=b'Wykszta\xc5\x82cenie')),
+                ('gender', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='records.CategoricalValue', verbose_name=b'P\xc5\x82e\xc4\x87')),
+                ('occupation', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='records.CategoricalValue', verbose_name=b'Status aktywno\xc5\x9bci zawodowej')),
+            ],
+            options={
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': 'history_date',
+            },
+        ),
+        migrations.CreateModel(
+            name='HypertensionChemicalRelation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etiology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.Etiology')),
+                ('hypertensionchemicalrelation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue')),
+            ],
+            options={
+                'verbose_name': 'Zwi\u0105zek leku/chemii z NT',
+                'verbose_name_plural': 'Zwi\u0105zki lek\xf3w/chemii z NT',
+            },
+        ),
+        migrations.CreateModel(
+            name='LatestBP',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sbp', models.FloatField(verbose_name=b'Ci\xc5\x9bnienie skurczowe')),
+                ('dbp', models.FloatField(verbose_name=b'Ci\xc5\x9bnienie rozkurczowe')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+            ],
+            options={
+                'verbose_name': 'Ostatnie zapisy BP',
+                'verbose_name_plural': 'Ostatnie zapisy BP',
+            },
+        ),
+        migrations.CreateModel(
+            name='LifeQuality',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('health_state', models.CharField(choices=[(b'a', b'Doskona\xc5\x82y'), (b'b', b'Bardzo doby'), (b'c', b'Dobry'), (b'd', b'Zadowalaj\xc4\x85cy'), (b'e', b'Niezadowalaj\xc4\x85cy')], max_length=1, verbose_name=b'Stan drowia')),
+                ('health_change', models.CharField(choices=[(b'a', b'Du\xc5\xbco lepiej ni\xc5\xbc rok temu'), (b'b', b'Troch\xc4\x99 lepiej ni\xc5\xbc rok temu'), (b'c', b'Bardzo podobnie jak rok temu'), (b'd', b'Troch\xc4\x99 gorzej ni\xc5\xbc rok temu'), (b'e', b'Du\xc5\xbco gorzej ni\xc5\xbc rok temu')], max_length=1, verbose_name=b'Stan zdrowia w por\xc3\xb3wnaniu z analogicznym okresem w ubieg\xc5\x82ym roku')),
+                ('problem_impact', models.CharField(choices=[(b'a', b'Nie, wcale'), (b'b', b'Rzadko'), (b'c', b'Czasami'), (b'd', b'Nawet bardzo'), (b'e', b'Bardzo du\xc5\xbcy')], max_length=1, verbose_name=b'Jak cz\xc4\x99sto problemy zdrowotne/emocjonalne wp\xc5\x82ywa\xc5\x82y na aktywno\xc5\x9bci i kontakty w ci\xc4\x85gu ostatniego miesi\xc4\x85ca')),
+                ('pain_freq', models.CharField(choices=[(b'a', b'Du\xc5\xbco lepiej ni\xc5\xbc rok temu'), (b'b', b'Troch\xc4\x99 lepiej ni\xc5\xbc rok temu'), (b'c', b'Bardzo podobnie jak rok temu'), (b'd', b'Troch\xc4\x99 gorzej ni\xc5\xbc rok temu'), (b'e', b'Du\xc5\xbco gorzej ni\xc5\xbc rok temu')], max_length=1, verbose_name=b'Liczba razy gdy oczywa\xc5\x82 b\xc3\xb3l w ci\xc4\x85gu ostatniego misi\xc4\x85ca')),
+                ('pain_impact', models.CharField(choices=[(b'a', b'Wcale'), (b'b', b'Troch\xc4\x99'), (b'c', b'\xc5\x9arednio'), (b'd', b'Nawet bardzo'), (b'e', b'Bardzo')], max_length=1, verbose_name=b'Jak cz\xc4\x99sto w ostatnim miesi\xc4\x85cu b\xc3\xb3l zak\xc5\x82\xc3\xb3ca\xc5\x82 normaln\xc4\x85 prac\xc4\x99 (zawodow\xc4\x85/domow\xc4\x85)?')),
+                ('condition_impact', models.CharField(choices=[(b'a', b'Ca\xc5\x82y czas'), (b'b', b'Wi\xc4\x99kszo\xc5\x9b\xc4\x87 czasu'), (b'c', b'Cz\xc4\x99\xc5\x9b\xc4\x87 czasu'), (b'd', b'Ma\xc5\x82o czasu'), (b'e', b'Wcale')], max_length=1, verbose_name=b'Jak cz\xc4\x99sto w ostatnim miesi\xc4\x85cu zdrowie lub emocje wp\xc5\x82ywa\xc5\x82y na kontakty towarzystkie?')),
+                ('activitylimits', models.ManyToManyField(related_name='al', through='pnt.ActivityLimit', to='records.CategoricalValue', verbose_name=b'Ograniczenia aktywno\xc5\x9bci dziennych')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+                ('emotionalproblems', models.ManyToManyField(related_name='ep', through='pnt.EmotionalProblem', to='records.CategoricalValue', verbose_name=b'Problem z prac\xc4\x85/aktywno\xc5\x9bci\xc4\x85 ze wzgl\xc4\x99du na emocje')),
+                ('healthproblems', models.ManyToManyField(related_name='hp', through='pnt.HealthProblem', to='records.CategoricalValue', verbose_name=b'Problem z prac\xc4\x85/aktywno\xc5\x9bci\xc4\x85 ze wzgl\xc4\x99du na stan zdrowia')),
+                ('healthselfopinions', models.ManyToManyField(related_name='hso', through='pnt.HealthSelfOpinion', to='records.CategoricalValue', verbose_name=b'Samoocena stanu zdrowia')),
+            ],
+            options={
+                'verbose_name': 'Jako\u015b\u0107 \u017cycia',
+                'verbose_name_plural': 'Jako\u015b\u0107 \u017cycia',
+            },
+        ),
+        migrations.CreateModel(
+            name='LifeStyle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cigarets_start_age', models.IntegerField(null=True, verbose_name=b'Wiek rozpocz\xc4\x99cia palenia')),
+                ('cigarets_quit_age', models.IntegerField(null=True, verbose_name=b'Wiek rzucenia palenia')),
+                ('cigarets_number', models.IntegerField(null=True, verbose_name=b'Liczba pap. dziennie')),
+                ('work_passive_smoker', models.BooleanField(verbose_name=b'Bierny palacz w pracy?')),
+                ('home_passive_smoker', models.BooleanField(verbose_name=b'Bierny palacz w domu?')),
+                ('alc_start_age', models.IntegerField(verbose_name=b'Wiek rozp. spo\xc5\xbcycia alkoholu?')),
+                ('alc_quit_age', models.IntegerField(verbose_name=b'Wiek zako\xc5\x84czenia spo\xc5\xbcycia alk.')),
+                ('drugs_start_age', models.IntegerField(verbose_name=b'Wieku rozp. przyjm. narkotyk\xc3\xb3w?')),
+                ('drugs_quit_age', models.IntegerField(verbose_name=b'Wiek zako\xc5\x84cznia przyjm. narkot.')),
+                ('drugs_taken', models.CharField(max_length=255, verbose_name=b'Przyjmowane narkotyki')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+            ],
+            options={
+                'verbose_name': 'Styl \u017cycia',
+                'verbose_name_plural': 'Styl \u017cycia',
+            },
+        ),
+        migrations.CreateModel(
+            name='Meal',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ready_meal_count', models.IntegerField(verbose_name=b'Jak cz\xc4\x99sto kupuje gotowe posi\xc5\x82ki?')),
+                ('outdoor_meal_count', models.IntegerField(verbose_name=b'Jak cz\xc4\x99sto jada w restauracjach typu fast food?')),
+                ('dairy_type', models.CharField(max_length=255, verbose_name=b'Typ nabia\xc5\x82u spo\xc5\xbcywany najcz\xc4\x99\xc5\x9bciej')),
+                ('mainly_preservative_meal', models.BooleanField(verbose_name=b'Spo\xc5\xbcywa g\xc5\x82\xc3\xb3wnie produkty konserwowe')),
+                ('extra_salt', models.BooleanField(verbose_name=b'Dosala potrawy')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+                ('bread_type_most_frequent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_by_bread_type_most_frequent', to='records.CategoricalValue', verbose_name=b'Typ pieczywa najcz\xc4\x99\xc5\x9bciej spo\xc5\xbcywanego')),
+                ('butter_type_most_frequent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_by_butter_type_most_frequent', to='records.CategoricalValue', verbose_name=b'Rodzaj t\xc5\x82uszczu u\xc5\xbcywanego  zazwyczaj do smarowania pieczywa')),
+                ('meal_type_most_frequent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_by_meal_type_most_frequent', to='records.CategoricalValue', verbose_name=b'Typ potrawy najcz\xc4\x99\xc5\x9bciej spo\xc5\xbcywanej')),
+            ],
+            options={
+                'verbose_name': 'Posi\u0142ki',
+                'verbose_name_plural': 'Posi\u0142ki',
+            },
+        ),
+        migrations.CreateModel(
+            name='MealType',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('times_per_week', models.IntegerField(verbose_name=b'Ile razy w tygodniu?')),
+                ('meal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.Meal')),
+                ('mealtype', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mealtype_by_meal', to='records.CategoricalValue', verbose_name=b'Rodzaj po\xc5\xbcywienia')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MoodSymptom',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('freq', models.CharField(choices=[(b'a', b'Ca\xc5\x82y czas'), (b'b', b'Wi\xc4\x99kszo\xc5\x9b\xc4\x87 czasu'), (b'c', b'Du\xc5\xbco czasu'), (b'd', b'Jaki\xc5\x9b czas'), (b'e', b'Ma\xc5\x82o czasu'), (b'f', b'Wcale')], max_length=1, verbose_name=b'Ile razy wyst\xc4\x85pi\xc5\x82 objaw w ci\xc4\x85gu miesi\xc4\x85ca')),
+                ('lifequality', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.LifeQuality')),
+                ('moodsymptom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lifequality_by_symptom', to='records.CategoricalValue', verbose_name=b'Symptom')),
+            ],
+            options={
+                'verbose_name': 'Wyst\u0119p. objaw\xf3w samopoczucia',
+                'verbose_name_plural': 'Wyst\u0119p. objaw\xf3w samopoczucia',
+            },
+        ),
+        migrations.CreateModel(
+            name='OtherChemical',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('other_chemical', models.CharField(max_length=255, verbose_name=b'Nazwa leku')),
+                ('morning_dose', models.CharField(max_length=4, verbose_name=b'Dawka poranna')),
+                ('midday_dose', models.CharField(max_length=4, verbose_name=b'Dawka popo\xc5\x82udniowa')),
+                ('evening_dose', models.CharField(max_length=4, verbose_name=b'Dawka wieczorna')),
+                ('casehistory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='other_chemicals', to='pnt.CaseHistory')),
+            ],
+            options={
+                'verbose_name': 'Lek pozosta\u0142yk',
+                'verbose_name_plural': 'Leki pozosta\u0142e',
+            },
+        ),
+        migrations.CreateModel(
+            name='Patient',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=255, verbose_name=b'Imi\xc4\x99')),
+                ('last_name', models.CharField(max_length=255, verbose_name=b'Nazwisko')),
+                ('pesel', models.CharField(max_length=11, unique=True, verbose_name=b'Pesel')),
+                ('phone', models.CharField(max_length=255, verbose_name=b'Telefon')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name=b'E-mail')),
+                ('occupation_name', models.CharField(blank=True, max_length=255, verbose_name=b'Nazwa zawodu')),
+                ('education', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patients_by_education', to='records.CategoricalValue', verbose_name=b'Wykszta\xc5\x82cenie')),
+                ('gender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patients_by_gender', to='records.CategoricalValue', verbose_name=b'P\xc5\x82e\xc4\x87')),
+                ('occupation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patients_by_occupation', to='records.CategoricalValue', verbose_name=b'Status aktywno\xc5\x9bci zawodowej')),
+            ],
+            options={
+                'verbose_name': 'Pacjent',
+                'verbose_name_plural': 'Pacjenci',
+            },
+        ),
+        migrations.CreateModel(
+            name='PharmaGroup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name=b'Nazwa')),
+            ],
+            options={
+                'verbose_name': 'Grupa farmakoterapeutyczna',
+                'verbose_name_plural': 'Grupy farmakoterapeutyczne',
+            },
+        ),
+        migrations.CreateModel(
+            name='PhysicalActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_in_car', models.IntegerField(verbose_name=b'Liczba minut dziennie w  samochodzie?')),
+                ('daily_in_bike', models.IntegerField(verbose_name=b'Liczba minut dziennie rowerem')),
+                ('daily_on_foot', models.IntegerField(verbose_name=b'Liczba minut dziennie pieszo')),
+                ('last_year_sport_months', models.IntegerField(verbose_name=b'Liczba miesi\xc4\x99cy w ci\xc4\x85gu ostatniego roku regularnego sportu')),
+                ('last_year_sport_weeks', models.IntegerField(verbose_name=b'Liczba razy w tygodniu gdy uprawia sport?')),
+                ('minutes_on_sport', models.IntegerField(verbose_name=b'Liczba minut za ka\xc5\xbcdym razem po\xc5\x9bwi\xc4\x99canych na uprawianie sportu?')),
+                ('prefered_sport', models.CharField(max_length=255, verbose_name=b'Sport uprawiany najbardziej regularnie w ci\xc4\x85gu ostatniego roku')),
+                ('sport_activities', models.CharField(max_length=255, verbose_name=b'Aktualnie wykonywany wysi\xc5\x82ek fizyczny poza godzinami pracy')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+                ('work_mode', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='records.CategoricalValue', verbose_name=b'Tryb pracy')),
+            ],
+            options={
+                'verbose_name': 'Aktywno\u015b\u0107 sportowa',
+                'verbose_name_plural': 'Aktywno\u015bci sportowe',
+            },
+        ),
+        migrations.CreateModel(
+            name='SideIssue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('has_allergy', models.BooleanField(verbose_name=b'Czy wyst\xc4\x99puj\xc4\x85 alergie na leki ?')),
+                ('alergen_chemical', models.TextField(blank=True, verbose_name=b'Je\xc5\xbceli wyst\xc4\x99puj\xc4\x85 alergie na leki, poda\xc4\x87 jakie i dla jakich lek\xc3\xb3w')),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta')),
+            ],
+            options={
+                'verbose_name': 'Objaw uboczny',
+                'verbose_name_plural': 'Objawy uboczne',
+            },
+        ),
+        migrations.CreateModel(
+            name='SideIssueFactor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sideissue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.SideIssue')),
+                ('sideissuefactor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sideissues_by_factor', to='records.CategoricalValue', verbose_name=b'Faktor')),
+            ],
+            options={
+                'verbose_name': 'Czynnik efekt\xf3w ubocznych',
+                'verbose_name_plural': 'Czynniki efekt\xf3w ubocznych',
+            },
+        ),
+        migrations.CreateModel(
+            name='Stimulant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('usage_frequency', models.CharField(choices=[(b'a', b'codziennie'), (b'b', b'co tydzie\xc5\x84'), (b'c', b'co miesi\xc4\x85c'), (b'd', b'co rok')], max_length=1, verbose_name=b'Cz\xc4\x99stotliwo\xc5\x9b\xc4\x87 spo\xc5\xbcycia')),
+                ('avg_volume', models.FloatField(verbose_name=b'Ilo\xc5\x9b\xc4\x87 ml przeci\xc4\x99tnie wypijanych za ka\xc5\xbcdym razem')),
+                ('lifestyle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.LifeStyle')),
+                ('stimulant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stimulant_by_stimulant', to='records.CategoricalValue')),
+            ],
+            options={
+                'verbose_name': 'Spo\u017cycie u\u017cywek',
+                'verbose_name_plural': 'Spo\u017cycie u\u017cywek',
+            },
+        ),
+        migrations.CreateModel(
+            name='WomenSexLife',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pregnancy_count', models.IntegerField(verbose_name=b'Liczba ci\xc4\x85\xc5\xbc')),
+                ('births_count', models.IntegerField(verbose_name=b'Liczba urodze\xc5\x84 \xc5\xbcywych')),
+                ('miscarriage_count', models.IntegerField(verbose_name=b'Liczba poronie\xc5\x84')),
+                ('still_birth_count', models.IntegerField(verbose_name=b'Liczba urodze\xc5\x84 martwych')),
+                ('casehistory', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.CaseHistory')),
+                ('menopause', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='womensexlifes_by_contraceptive', to='records.CategoricalValue', verbose_name=b'Menopauza')),
+            ],
+            options={
+                'verbose_name': 'Wywiad ginekologiczno-po\u0142o\u017cniczy',
+                'verbose_name_plural': 'Wywiad ginekologiczno-po\u0142o\u017cniczy',
+            },
+        ),
+        migrations.AddField(
+            model_name='sideissue',
+            name='factors',
+            field=models.ManyToManyField(through='pnt.SideIssueFactor', to='records.CategoricalValue', verbose_name=b'Dzia\xc5\x82ania niepo\xc5\xbc\xc4\x85dane'),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='meal_types',
+            field=models.ManyToManyField(through='pnt.MealType', to='records.CategoricalValue', verbose_name=b'Rodzaj po\xc5\xbcywienia'),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='meat_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_by_meat_type', to='records.CategoricalValue', verbose_name=b'Typ mi\xc4\x99sa spo\xc5\xbcywany najcz\xc4\x99\xc5\x9bciej'),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='oil_type_most_frequent',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_by_oil_type_most_frequent', to='records.CategoricalValue', verbose_name=b'Typ t\xc5\x82uszczu u\xc5\xbcywany do przyrz\xc4\x85dzania potraw'),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='outdoor_meal_frequency',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_by_outdoor_usage_frequency', to='records.CategoricalValue', verbose_name=b'Na dzie\xc5\x84/tydzie\xc5\x84/miesi\xc4\x85c'),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='ready_meal_frequency',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_by_meal_usage_frequency', to='records.CategoricalValue', verbose_name=b'Na dzie\xc5\x84/tydzie\xc5\x84/miesi\xc4\x85c'),
+        ),
+        migrations.AddField(
+            model_name='lifestyle',
+            name='stimulants',
+            field=models.ManyToManyField(related_name='lifestyle_by_stimulants', through='pnt.Stimulant', to='records.CategoricalValue', verbose_name=b'Spo\xc5\xbcycie u\xc5\xbcywek'),
+        ),
+        migrations.AddField(
+            model_name='lifequality',
+            name='moodsymptoms',
+            field=models.ManyToManyField(related_name='ms', through='pnt.MoodSymptom', to='records.CategoricalValue', verbose_name=b'Cz\xc4\x99sto\xc5\x9b\xc4\x87 wyst\xc4\x99powania objaw\xc3\xb3w stanu samopoczucia'),
+        ),
+        migrations.AddField(
+            model_name='hipotensionchemical',
+            name='pharma_group',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.PharmaGroup', verbose_name=b'Grupa farmakoterapeutyczna'),
+        ),
+        migrations.AddField(
+            model_name='healthselfopinion',
+            name='lifequality',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.LifeQuality'),
+        ),
+        migrations.AddField(
+            model_name='healthproblem',
+            name='lifequality',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.LifeQuality'),
+        ),
+        migrations.AddField(
+            model_name='etiology',
+            name='examination_results',
+            field=models.ManyToManyField(related_name='etiology_by_examination', through='pnt.ExaminationResult', to='records.CategoricalValue', verbose_name=b'W badaniu przedmiotowym obecne'),
+        ),
+        migrations.AddField(
+            model_name='etiology',
+            name='hypertension_chemicals',
+            field=models.ManyToManyField(related_name='etiology_by_chemicals', through='pnt.HypertensionChemicalRelation', to='records.CategoricalValue', verbose_name=b'NT zwi\xc4\x85zane z lekami/\xc5\x9brodkami chemicznymi'),
+        ),
+        migrations.AddField(
+            model_name='etiology',
+            name='nt_etiology_symptoms',
+            field=models.ManyToManyField(related_name='etiology_by_symptom', through='pnt.EtiologySymptom', to='records.CategoricalValue', verbose_name=b'Obecne objawy sugeruj\xc4\x85ce etiologi\xc4\x99 wt\xc3\xb3rn\xc4\x85 NT'),
+        ),
+        migrations.AddField(
+            model_name='emotionalproblem',
+            name='lifequality',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.LifeQuality'),
+        ),
+        migrations.AddField(
+            model_name='derivativeetiologybackground',
+            name='etiology',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.Etiology'),
+        ),
+        migrations.AddField(
+            model_name='casehistory',
+            name='contraceptives',
+            field=models.ManyToManyField(related_name='lifestyle_by_contraceptive', through='pnt.Contraceptive', to='records.CategoricalValue', verbose_name=b'Leki antykoncepcyjne'),
+        ),
+        migrations.AddField(
+            model_name='casehistory',
+            name='diseases',
+            field=models.ManyToManyField(related_name='casehistory_by_disease', through='pnt.Disease', to='records.CategoricalValue', verbose_name=b'Choroby wsp\xc3\xb3\xc5\x82istniej\xc4\x85ce'),
+        ),
+        migrations.AddField(
+            model_name='casehistory',
+            name='general_disepases',
+            field=models.ManyToManyField(related_name='casehistory_by_general_disease', through='pnt.GeneralDisease', to='records.CategoricalValue', verbose_name=b'Choroby wsp\xc3\xb3\xc5\x82istniej\xc4\x85ce z opisem'),
+        ),
+        migrations.AddField(
+            model_name='casehistory',
+            name='treatements',
+            field=models.ManyToManyField(related_name='casehistory_by_treatements', through='pnt.Consultant', to='records.CategoricalValue', verbose_name=b'Leczenie u specjalisty'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='patient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='pnt.Patient', verbose_name=b'Pacjent'),
+        ),
+        migrations.AddField(
+            model_name='apnoea',
+            name='appointment',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta'),
+        ),
+        migrations.AddField(
+            model_name='apnoea',
+            name='identifications',
+            field=models.ManyToManyField(related_name='b', through='pnt.ApnoeaIdentification', to='records.CategoricalValue', verbose_name=b'Objawy sugeruj\xc4\x85ce bezdech senny'),
+        ),
+        migrations.AddField(
+            model_name='apnoea',
+            name='relateddiseases',
+            field=models.ManyToManyField(related_name='a', through='pnt.ApnoeaRelatedDisease', to='records.CategoricalValue', verbose_name=b'Schorzenia sugeruj\xc4\x85ce bezdech senny'),
+        ),
+        migrations.AddField(
+            model_name='antropometrics',
+            name='appointment',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta'),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='patient',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Patient'),
+        ),
+        migrations.AddField(
+            model_name='activitylimit',
+            name='lifequality',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pnt.LifeQuality'),
+        ),
+        migrations.AddField(
+            model_name='abi',
+            name='appointment',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='pnt.Appointment', verbose_name=b'Wizyta'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='stimulant',
+            unique_together=set([('lifestyle', 'stimulant')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='sideissuefactor',
+            unique_together=set([('sideissue', 'sideissuefactor')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='otherchemical',
+            unique_together=set([('casehistory', 'other_chemical')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='moodsymptom',
+            unique_together=set([('lifequality', 'moodsymptom')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='hypertensionchemicalrelation',
+            unique_together=set([('etiology', 'hypertensionchemicalrelation')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='hipotensionchemicaltaken',
+            unique_together=set([('casehistory', 'hipotension_chemical')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='hipotensionchemical',
+            unique_together=set([('name', 'pharma_group')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='healthselfopinion',
+            unique_together=set([('lifequality', 'healthselfopinion')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='healthproblem',
+            unique_together=set([('lifequality', 'healthproblem')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='generaldisease',
+            unique_together=set([('casehistory', 'generaldisease')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='familydisease',
+            unique_together=set([('casehistory', 'familydisease', 'member')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='examinationresult',
+            unique_together=set([('etiology', 'examinationresult')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='etiologysymptom',
+            unique_together=set([('etiology', 'etiologysymptom')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='emotionalproblem',
+            unique_together=set([('lifequality', 'emotionalproblem')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='disease',
+            unique_together=set([('casehistory', 'disease')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='derivativeetiologybackground',
+            unique_together=set([('etiology', 'derivativeetiologybackground')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='contraceptive',
+            unique_together=set([('casehistory', 'contraceptive')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='consultant',
+            unique_together=set([('casehistory', 'consultant')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='apnoearelateddisease',
+            unique_together=set([('apnoea', 'apnoearelateddisease')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='apnoeaidentification',
+            unique_together=set([('apnoea', 'apnoeaidentification')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='activitylimit',
+            unique_together=set([('lifequality', 'activitylimit')]),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SF36Score',
+            fields=[
+                ('lifequality', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sf36score', serialize=False, to='pnt.LifeQuality', verbose_name=b'Jako\xc5\x9b\xc4\x87 \xc5\xbcycia')),
+                ('pf', models.IntegerField(db_index=True, verbose_name=b'PF')),
+                ('rp', models.IntegerField(db_index=True, verbose_name=b'RP')),
+                ('bp', models.IntegerField(db_index=True, verbose_name=b'BP')),
+                ('gh', models.IntegerField(db_index=True, verbose_name=b'GH')),
+                ('vt', models.IntegerField(db_index=True, verbose_name=b'VT')),
+                ('sf', models.IntegerField(db_index=True, verbose_name=b'SF')),
+                ('re', models.IntegerField(db_index=True, verbose_name=b'RE')),
+                ('mh', models.IntegerField(db_index=True, verbose_name=b'MH')),
+                ('ht', models.IntegerField(db_index=True, verbose_name=b'HT')),
+                ('total', models.IntegerField(db_index=True, verbose_name=b'Suma SF-36')),
+            ],
+            options={
+                'verbose_name': 'Wynik SF-36',
+                'verbose_name_plural': 'Wyniki SF-36',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0003_patient_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalpatient',
+            name='birth_date',
+            field=models.DateField(db_index=True, editable=False, null=True, verbose_name=b'Data urodzenia'),
+        ),
+        migrations.AddField(
+            model_name='historicalpatient',
+            name='sex_digit',
+            field=models.PositiveSmallIntegerField(db_index=True, editable=False, null=True, verbose_name=b'Cyfra p\xc5\x82ci z PESEL'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='birth_date',
+            field=models.DateField(db_index=True, editable=False, null=True, verbose_name=b'Data urodzenia'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='sex_digit',
+            field=models.PositiveSmallIntegerField(db_index=True, editable=False, null=True, verbose_name=b'Cyfra p\xc5\x82ci z PESEL'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0004_patient_pesel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hipotensionchemicaltaken',
+            name='daily_dose',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'Dawka dobowa'),
+        ),
+        migrations.AddField(
+            model_name='hipotensionchemicaltaken',
+            name='evening_dose_value',
+            field=models.FloatField(editable=False, null=True, verbose_name=b'Dawka wieczorna (liczbowo)'),
+        ),
+        migrations.AddField(
+            model_name='hipotensionchemicaltaken',
+            name='midday_dose_value',
+            field=models.FloatField(editable=False, null=True, verbose_name=b'Dawka po\xc5\x82udniowa (liczbowo)'),
+        ),
+        migrations.AddField(
+            model_name='hipotensionchemicaltaken',
+            name='morning_dose_value',
+            field=models.FloatField(editable=False, null=True, verbose_name=b'Dawka poranna (liczbowo)'),
+        ),
+        migrations.AddField(
+            model_name='otherchemical',
+            name='daily_dose',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'Dawka dobowa'),
+        ),
+        migrations.AddField(
+            model_name='otherchemical',
+            name='evening_dose_value',
+            field=models.FloatField(editable=False, null=True, verbose_name=b'Dawka wieczorna (liczbowo)'),
+        ),
+        migrations.AddField(
+            model_name='otherchemical',
+            name='midday_dose_value',
+            field=models.FloatField(editable=False, null=True, verbose_name=b'Dawka po\xc5\x82udniowa (liczbowo)'),
+        ),
+        migrations.AddField(
+            model_name='otherchemical',
+            name='morning_dose_value',
+            field=models.FloatField(editable=False, null=True, verbose_name=b'Dawka poranna (liczbowo)'),
+        ),
+    ]
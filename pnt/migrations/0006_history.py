@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0005_dose_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricalCaseHistory',
+            fields=[
+                ('diagnosis_year', models.IntegerField(verbose_name=b'Rok diagnozy')),
+                ('already_hospitalized', models.BooleanField(verbose_name=b'Hospitalizowany w tutejszej klinice?')),
+                ('id', models.IntegerField(db_index=True, verbose_name='ID')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('history_type', models.CharField(choices=[(b'+', b'Created'), (b'~', b'Changed'), (b'-', b'Deleted')], max_length=1)),
+            ],
+            options={
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': 'history_date',
+            },
+        ),
+        migrations.CreateModel(
+            name='HistoricalHipotensionChemicalTaken',
+            fields=[
+                ('morning_dose_value', models.FloatField(editable=False, null=True, verbose_name=b'Dawka poranna (liczbowo)')),
+                ('midday_dose_value', models.FloatField(editable=False, null=True, verbose_name=b'Dawka po\xc5\x82udniowa (liczbowo)')),
+                ('evening_dose_value', models.FloatField(editable=False, null=True, verbose_name=b'Dawka wieczorna (liczbowo)')),
+                ('daily_dose', models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'Dawka dobowa')),
+                ('morning_dose', models.CharField(max_length=4, verbose_name=b'Dawka poranna')),
+                ('midday_dose', models.CharField(max_length=4, verbose_name=b'Dawka po\xc5\x82udniowa')),
+                ('evening_dose', models.CharField(max_length=4, verbose_name=b'Dawka wieczorna')),
+                ('taken_less_then_week', models.BooleanField(verbose_name=b'Przyjmuje kr\xc3\xb3cej ni\xc5\xbc tydzie\xc5\x84')),
+                ('id', models.IntegerField(db_index=True, verbose_name='ID')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('history_type', models.CharField(choices=[(b'+', b'Created'), (b'~', b'Changed'), (b'-', b'Deleted')], max_length=1)),
+            ],
+            options={
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': 'history_date',
+            },
+        ),
+        migrations.AddField(
+            model_name='historicalhipotensionchemicaltaken',
+            name='casehistory',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='pnt.CaseHistory', verbose_name='casehistory'),
+        ),
+        migrations.AddField(
+            model_name='historicalhipotensionchemicaltaken',
+            name='hipotension_chemical',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='pnt.HipotensionChemical', verbose_name=b'Rodzaj leku'),
+        ),
+        migrations.AddField(
+            model_name='historicalcasehistory',
+            name='appointment',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='pnt.Appointment', verbose_name=b'Wizyta'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# indeks (id, history_date) pod history.as_of() i snapshot_as_of(); tabele
+# historii tworzy HistoricalRecords, więc indeks nie może być w Meta.indexes
+HISTORY_MODELS = ('HistoricalPatient', 'HistoricalCaseHistory', 'HistoricalHipotensionChemicalTaken')
+
+
+def _indexes(apps, schema_editor):
+    quote = schema_editor.connection.ops.quote_name
+    for model_name in HISTORY_MODELS:
+        opts = apps.get_model('pnt', model_name)._meta
+        columns = [opts.get_field(name).column for name in ('id', 'history_date')]
+        yield opts.db_table, '%s_as_of' % opts.db_table, ', '.join(quote(column) for column in columns)
+
+
+def create_as_of_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    for table, index, columns in _indexes(apps, schema_editor):
+        with connection.cursor() as cursor:
+            # bazy, w których indeks założył wcześniej handler post_migrate
+            if index in connection.introspection.get_constraints(cursor, table):
+                continue
+        schema_editor.execute('CREATE INDEX %s ON %s (%s)' % (quote(index), quote(table), columns))
+
+
+def drop_as_of_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    for table, index, columns in _indexes(apps, schema_editor):
+        with connection.cursor() as cursor:
+            if index not in connection.introspection.get_constraints(cursor, table):
+                continue
+        schema_editor.execute(schema_editor.sql_delete_index % {
+            'table': schema_editor.quote_name(table), 'name': schema_editor.quote_name(index)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0006_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_as_of_indexes, drop_as_of_indexes),
+    ]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0007_history_as_of'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hipotensionchemicaltaken',
+            index=models.Index(fields=[b'hipotension_chemical', b'casehistory'], name='pnt_hipoten_hipoten_7dfc08_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='disease',
+            index=models.Index(fields=[b'disease', b'casehistory'], name='pnt_disease_disease_6283fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familydisease',
+            index=models.Index(fields=[b'familydisease', b'member', b'casehistory'], name='pnt_familyd_familyd_629ec0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sideissuefactor',
+            index=models.Index(fields=[b'sideissuefactor', b'sideissue'], name='pnt_sideiss_sideiss_0033d3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generaldisease',
+            index=models.Index(fields=[b'generaldisease', b'casehistory'], name='pnt_general_general_f5af82_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stimulant',
+            index=models.Index(fields=[b'stimulant', b'usage_frequency', b'lifestyle'], name='pnt_stimula_stimula_a4ce10_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0008_through_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApnoeaScore',
+            fields=[
+                ('apnoea', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='apnoeascore', serialize=False, to='pnt.Apnoea', verbose_name=b'Bezdech senny')),
+                ('epworth_points', models.IntegerField(db_index=True, null=True, verbose_name=b'Punkty Epworth')),
+                ('epworth_band', models.IntegerField(db_index=True, null=True, verbose_name=b'Przedzia\xc5\x82 Epworth')),
+                ('apnoea_points', models.IntegerField(db_index=True, null=True, verbose_name=b'Punkty bezdechu')),
+                ('has_suggestions', models.BooleanField(verbose_name=b'Objawy lub schorzenia sugeruj\xc4\x85ce bezdech')),
+                ('risk_limit', models.IntegerField(verbose_name=b'Pr\xc3\xb3g ryzyka')),
+                ('at_risk', models.BooleanField(db_index=True, verbose_name=b'Ryzyko bezdechu')),
+            ],
+            options={
+                'verbose_name': 'Ocena bezdechu',
+                'verbose_name_plural': 'Oceny bezdechu',
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 01:09
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pnt', '0009_apnoeascore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abi',
+            name='abi_min',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'ABI (mniejsza warto\xc5\x9b\xc4\x87)'),
+        ),
+        migrations.AddField(
+            model_name='antropometrics',
+            name='waist_hip_ratio',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'WHR'),
+        ),
+        migrations.AddField(
+            model_name='biochemistry',
+            name='ldl_hdl_ratio',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'LDL/HDL'),
+        ),
+        migrations.AddField(
+            model_name='bodypressure',
+            name='inter_arm_difference',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'R\xc3\xb3\xc5\xbcnica ci\xc5\x9bnie\xc5\x84 skurczowych mi\xc4\x99dzy ramionami [mmHg]'),
+        ),
+        migrations.AddField(
+            model_name='bodypressure',
+            name='mean_arterial_pressure',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'MAP [mmHg]'),
+        ),
+        migrations.AddField(
+            model_name='cartoidusg',
+            name='imt_max',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name=b'IMT (wi\xc4\x99ksza warto\xc5\x9b\xc4\x87) [mm]'),
+        ),
+    ]
@@ -1,12 +1,59 @@
 # -*- coding: utf-8 -*-
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Case, When, Value, F, Q, Exists, OuterRef, Avg, Count, Sum
+from django.db.models.functions import Cast
+from django.db.models.signals import post_save, post_delete
 from synergy.contrib.history.models import HistoricalRecords
 import datetime
+import operator
+import threading
 from django.core.exceptions import ObjectDoesNotExist
+import categories
+import indicators
+import search
+from pesel import decode_birth_date, decode_sex_digit
+from dose import dose_values
+from instrumentation import instrumented
+from pagination import KeysetPaginator
+import rules
+from rules import EPWORTH_FIELDS, EPWORTH_LIMITS, APNOEA_FIELDS, APNOEA_RISK_LIMITS
 
 def _default_unicode(obj):
     return u"%s #%d" % (obj._meta.verbose_name, obj.id)
     
+class PatientQuerySet(models.QuerySet):
+    def search(self, term):
+        """
+        Wyszukiwanie po prefiksach: słowa z liter dopasowywane są do nazwiska lub
+        imienia (bez wielkości liter i diakrytyków), słowa z cyfr do numeru
+        PESEL lub telefonu. Wszystkie słowa muszą pasować. Fraza złożona z samych
+        cyfr i separatorów ("+48 600 100 200") to jeden numer, nie kilka słów.
+        """
+        queryset = self
+        for token in [term] if search.is_numeric_term(term) else term.split():
+            if search.is_numeric_term(token):
+                number = search.digits(token)
+                queryset = queryset.filter(Q(pesel__startswith=number) |
+                                           Q(phone_search__startswith=search.normalize_phone(token)))
+            else:
+                name = search.fold(token)
+                queryset = queryset.filter(Q(last_name_search__startswith=name) | Q(first_name_search__startswith=name))
+        return queryset
+
+    def aged(self, min_age=None, max_age=None, on=None):
+        """
+        Pacjenci w wieku z przedziału [min_age, max_age] liczonym jak Patient.get_age()
+        (różnica lat), jako zakres po indeksowanym birth_date.
+        """
+        year = (on or datetime.date.today()).year
+        queryset = self
+        if min_age is not None:
+            queryset = queryset.filter(birth_date__lte=datetime.date(year - min_age, 12, 31))
+        if max_age is not None:
+            queryset = queryset.filter(birth_date__gte=datetime.date(year - max_age, 1, 1))
+        return queryset
+
+
 class Patient(models.Model):
     first_name = models.CharField(max_length=255, verbose_name="Imię")
     last_name = models.CharField(max_length=255, verbose_name="Nazwisko")
@@ -21,19 +68,51 @@ class Patient(models.Model):
     education = models.ForeignKey('records.CategoricalValue', related_name="patients_by_education", verbose_name="Wykształcenie", limit_choices_to={'group__name': 'education'})
     occupation = models.ForeignKey('records.CategoricalValue', related_name="patients_by_occupation", verbose_name="Status aktywności zawodowej", limit_choices_to={'group__name': 'occupation'})
     occupation_name = models.CharField(max_length=255, verbose_name="Nazwa zawodu", blank=True)
+
+    # znormalizowane kopie do wyszukiwania (patrz search.py), uzupełniane w save()
+    first_name_search = models.CharField(max_length=255, editable=False, blank=True, db_index=True)
+    last_name_search = models.CharField(max_length=255, editable=False, blank=True, db_index=True)
+    phone_search = models.CharField(max_length=255, editable=False, blank=True, db_index=True)
+
+    # odczytane z numeru PESEL w save()
+    birth_date = models.DateField(verbose_name="Data urodzenia", null=True, editable=False, db_index=True)
+    sex_digit = models.PositiveSmallIntegerField(verbose_name="Cyfra płci z PESEL", null=True, editable=False, db_index=True)
+
     history = HistoricalRecords()
 
+    objects = PatientQuerySet.as_manager()
+
     def __unicode__(self):
         return u"%s %s (%s)" % (self.first_name, self.last_name, self.pesel)
 
+    # pola wyliczane w sync_derived_fields() - uzupełniane także przez history.bulk_*_with_history()
+    derived_fields = ('first_name_search', 'last_name_search', 'phone_search', 'birth_date', 'sex_digit')
+
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        super(Patient, self).save(*args, **kwargs)
+
+    def sync_derived_fields(self):
+        self.sync_search_fields()
+        self.sync_pesel_fields()
+
+    def sync_search_fields(self):
+        self.first_name_search = search.fold(self.first_name)
+        self.last_name_search = search.fold(self.last_name)
+        self.phone_search = search.normalize_phone(self.phone)
+
+    def sync_pesel_fields(self):
+        self.birth_date = decode_birth_date(self.pesel)
+        self.sex_digit = decode_sex_digit(self.pesel)
+
     def get_birth_date(self):
-        try:
-            return datetime.date(int('19%s' % self.pesel[:2]), int(self.pesel[2:4]), int(self.pesel[4:6]))
-        except:
-            return datetime.date(1000, 1, 1)
+        return decode_birth_date(self.pesel)
     
     def get_age(self):
-        return datetime.date.today().year - self.get_birth_date().year
+        birth_date = self.get_birth_date()
+        if birth_date is None:
+            return None
+        return datetime.date.today().year - birth_date.year
 
     class Meta:
         verbose_name = "Pacjent"
@@ -52,18 +131,77 @@ class Address(models.Model):
         verbose_name = "Adres"
         verbose_name_plural = "Adresy"
 
+# sekcje wizyty - odwrotne relacje OneToOne z Appointment
+APPOINTMENT_SECTIONS = ('casehistory', 'physicalactivity', 'lifequality', 'lifestyle', 'meal', 'drink', 'apnoea', 'etiology', 'sideissue', 'antropometrics','bodypressure','heartecho','biochemistry','abi','cartoidusg','ekg')
+
+# modele wyliczane z innych danych - nie są zapisywane razem z wizytą (import, dane testowe)
+DERIVED_MODELS = ('sf36score', 'apnoeascore')
+
+def child_relations(model):
+    """Relacje odwrotne modeli PNT zapisywanych razem z model (nazwa modelu -> relacja)."""
+    children = {}
+    for related in model._meta.related_objects:
+        child = related.related_model._meta
+        if (child.app_label == 'pnt' and not related.many_to_many and child.model_name not in DERIVED_MODELS
+                and not child.model_name.startswith('historical')):
+            children[child.model_name] = related
+    return children
+
+# klucz stronicowania Appointment.objects.timeline()
+TIMELINE_KEYS = ('-date', '-time', '-id')
+
+class AppointmentQuerySet(models.QuerySet):
+    def with_sections(self):
+        """
+        Dociąga pacjenta i wszystkie sekcje wizyty jednym zapytaniem (LEFT JOIN),
+        dzięki czemu get_data() nie wykonuje już żadnych zapytań.
+        """
+        return self.select_related('patient', *APPOINTMENT_SECTIONS)
+
+    def load_bundles(self, ids=None):
+        """
+        Zwraca słownik {id wizyty: get_data()} dla wszystkich wizyt z querysetu
+        (opcjonalnie zawężonych do ids) przy stałej liczbie zapytań.
+        """
+        queryset = self.with_sections()
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        return dict((appointment.pk, appointment.get_data()) for appointment in queryset)
+
+    def with_indicators(self, *names, **kwargs):
+        """
+        Dodaje wskaźniki z indicators.py (wszystkie albo names) jako adnotacje,
+        np. .with_indicators().filter(mean_arterial_pressure__gt=110);
+        computed=True liczy je wzorem zamiast czytać zapisane kolumny.
+        """
+        return self.annotate(**dict(indicators.annotations(names, kwargs.get('computed', False))))
+
+    def timeline(self, patient=None, per_page=50, after=None, before=None):
+        """
+        Strona wizyt od najnowszych (pacjenta albo całej poradni) stronicowana
+        kluczem (data, godzina, id) - patrz pagination.KeysetPaginator; głębokie
+        strony korzystają z indeksów (patient, date, time, id) i (date, time, id)
+        tak samo jak pierwsza.
+        """
+        queryset = self if patient is None else self.filter(patient=patient)
+        return KeysetPaginator(queryset, TIMELINE_KEYS, per_page).page(after, before)
+
+
 class Appointment(models.Model):
     patient = models.ForeignKey('Patient', related_name="appointments", verbose_name="Pacjent")
     date = models.DateField(verbose_name="Data")
     time = models.TimeField(verbose_name="Godzina", null=True, blank=True)
 
+    objects = AppointmentQuerySet.as_manager()
+
+    @instrumented
     def __unicode__(self):
         return u"Wizyta z dnia: %s, %s" % (self.date, self.patient)
 
+    @instrumented
     def get_data(self):
-        models = ('casehistory', 'physicalactivity', 'lifequality', 'lifestyle', 'meal', 'drink', 'apnoea', 'etiology', 'sideissue', 'antropometrics','bodypressure','heartecho','biochemistry','abi','cartoidusg','ekg')
         data = {}
-        for model in models:
+        for model in APPOINTMENT_SECTIONS:
             try:
                 data[model] = getattr(self, model)
             except ObjectDoesNotExist:
@@ -71,6 +209,8 @@ class Appointment(models.Model):
         return data
 
     class Meta:
+        indexes = [models.Index(fields=['patient', 'date', 'time', 'id']),
+                   models.Index(fields=['date', 'time', 'id'])]
         verbose_name = "Wizyta"
         verbose_name_plural = "Wizyty"
 
@@ -80,6 +220,8 @@ class Disease(models.Model):
 
     class Meta:
         unique_together = (('casehistory', 'disease'),)
+        # odwrotny kierunek: wartość -> historia choroby (kryteria cohorts.py)
+        indexes = [models.Index(fields=['disease', 'casehistory'])]
         verbose_name = "Rodzaj choroby w historii"
         verbose_name_plural = "Rodzaje chorób w historii"
 
@@ -90,6 +232,7 @@ class GeneralDisease(models.Model):
 
     class Meta:
         unique_together = (('casehistory', 'generaldisease'),)
+        indexes = [models.Index(fields=['generaldisease', 'casehistory'])]
         verbose_name = "Choroba złożona w historii"
         verbose_name_plural = "Choroby złożone  w historii"
 
@@ -139,7 +282,9 @@ class CaseHistory(models.Model):
 
     treatements = models.ManyToManyField('records.CategoricalValue', through='Consultant', related_name="casehistory_by_treatements", verbose_name="Leczenie u specjalisty")
     contraceptives = models.ManyToManyField('records.CategoricalValue', through='Contraceptive', verbose_name="Leki antykoncepcyjne", related_name="lifestyle_by_contraceptive")
+    history = HistoricalRecords()
 
+    @instrumented
     def __unicode__(self):
         return u"Rok diagnozy: %s (%s)" % (self.diagnosis_year, self.appointment.patient)
 
@@ -186,20 +331,75 @@ class HipotensionChemical(models.Model):
         verbose_name_plural = "Rodzaje leków hipotensyjnych"
         ordering = ('name', 'international_name__name')
     
-class HipotensionChemicalTaken(models.Model):
+class DoseModel(models.Model):
+    """
+    Dawki z pól tekstowych morning_dose/midday_dose/evening_dose odczytane
+    jako liczby (patrz dose.py), uzupełniane w save().
+    """
+    morning_dose_value = models.FloatField(verbose_name="Dawka poranna (liczbowo)", null=True, editable=False)
+    midday_dose_value = models.FloatField(verbose_name="Dawka południowa (liczbowo)", null=True, editable=False)
+    evening_dose_value = models.FloatField(verbose_name="Dawka wieczorna (liczbowo)", null=True, editable=False)
+    # suma dawek, None gdy którejś nie da się odczytać
+    daily_dose = models.FloatField(verbose_name="Dawka dobowa", null=True, editable=False, db_index=True)
+
+    derived_fields = ('morning_dose_value', 'midday_dose_value', 'evening_dose_value', 'daily_dose')
+
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        super(DoseModel, self).save(*args, **kwargs)
+
+    def sync_derived_fields(self):
+        (self.morning_dose_value, self.midday_dose_value,
+         self.evening_dose_value, self.daily_dose) = dose_values(self.morning_dose, self.midday_dose, self.evening_dose)
+
+    class Meta:
+        abstract = True
+
+
+def dose_aggregates():
+    """Agregaty dawek dla zapytań GROUP BY na lekach przyjmowanych."""
+    return {
+        'prescriptions': Count('pk'),
+        'patients': Count('casehistory__appointment__patient', distinct=True),
+        'parsed_doses': Count('daily_dose'),
+        'mean_daily_dose': Avg('daily_dose'),
+        'total_daily_dose': Sum('daily_dose'),
+    }
+
+
+class HipotensionChemicalTakenQuerySet(models.QuerySet):
+    """Zestawienia wyliczane wewnątrz routers.use_replica() czytane są z repliki."""
+    def by_pharma_group(self):
+        """Jeden wiersz (słownik) na grupę farmakoterapeutyczną z agregatami dose_aggregates()."""
+        groups = self.values(pharma_group_id=F('hipotension_chemical__pharma_group'),
+                             pharma_group=F('hipotension_chemical__pharma_group__name'))
+        return groups.annotate(**dose_aggregates()).order_by('pharma_group')
+
+    def by_international_name(self):
+        """Jeden wiersz (słownik) na nazwę międzynarodową z agregatami dose_aggregates()."""
+        groups = self.values(international_name_id=F('hipotension_chemical__international_name'),
+                             international_name=F('hipotension_chemical__international_name__name'))
+        return groups.annotate(**dose_aggregates()).order_by('international_name')
+
+
+class HipotensionChemicalTaken(DoseModel):
     casehistory = models.ForeignKey('CaseHistory')
     hipotension_chemical = models.ForeignKey('HipotensionChemical', verbose_name="Rodzaj leku")
     morning_dose = models.CharField(max_length=4, verbose_name="Dawka poranna")
     midday_dose = models.CharField(max_length=4, verbose_name="Dawka południowa")
     evening_dose = models.CharField(max_length=4, verbose_name="Dawka wieczorna")
     taken_less_then_week = models.BooleanField(verbose_name="Przyjmuje krócej niż tydzień")
+    history = HistoricalRecords()
+
+    objects = HipotensionChemicalTakenQuerySet.as_manager()
 
     class Meta:
         unique_together = (('casehistory', 'hipotension_chemical',),)
+        indexes = [models.Index(fields=['hipotension_chemical', 'casehistory'])]
         verbose_name = "Lek hipotensyjny"
         verbose_name_plural = "Leki hipotensyjne"
 
-class OtherChemical(models.Model):
+class OtherChemical(DoseModel):
     casehistory = models.ForeignKey('CaseHistory', related_name="other_chemicals")
     other_chemical = models.CharField(max_length=255, verbose_name="Nazwa leku")
     morning_dose = models.CharField(max_length=4, verbose_name="Dawka poranna")
@@ -220,6 +420,7 @@ class FamilyDisease(models.Model):
     
     class Meta:
         unique_together = (('casehistory', 'familydisease', 'member'),)
+        indexes = [models.Index(fields=['familydisease', 'member', 'casehistory'])]
         verbose_name = "Choroba w rodzinie"
         verbose_name_plural = "Choroby w rodzinie"
 
@@ -259,6 +460,7 @@ class Stimulant(models.Model):
     
     class Meta:
         unique_together = (('lifestyle', 'stimulant',))
+        indexes = [models.Index(fields=['stimulant', 'usage_frequency', 'lifestyle'])]
         verbose_name = "Spożycie używek"
         verbose_name_plural = "Spożycie używek"
 
@@ -340,6 +542,41 @@ class PhysicalActivity(models.Model):
         verbose_name = u"Aktywność sportowa"
         verbose_name_plural = u"Aktywności sportowe"
 
+def apnoea_risk_annotations(path='', prefix=''):
+    """
+    Lista (nazwa, wyrażenie) odpowiadająca metodom Apnoea.get_epworth_points(),
+    get_epworth_scale(), get_apnoea_points(), has_apnoea_suggestions(),
+    get_apnoea_risk_limit() i at_apnoea_risk(). path wskazuje Apnoea względem
+    modelu querysetu (np. 'apnoea__' dla Appointment), prefix poprzedza nazwy adnotacji.
+    Adnotacje trzeba dodawać w podanej kolejności.
+    """
+    def integer(field):
+        return Cast(F(path + field), models.IntegerField())
+    points = prefix + 'epworth_points'
+    band = prefix + 'epworth_band'
+    apnoea_points = prefix + 'apnoea_points'
+    related = prefix + 'has_apnoea_related_diseases'
+    identifications = prefix + 'has_apnoea_identifications'
+    suggestions = prefix + 'apnoea_suggestions'
+    limit = prefix + 'apnoea_risk_limit'
+
+    band_cases = [When(**{points: 0, 'then': Value(None)})]
+    band_cases += [When(**{points + '__lte': limit_value, 'then': Value(i + 1)}) for i, limit_value in enumerate(EPWORTH_LIMITS)]
+    return [
+        (points, reduce(operator.add, [integer('epworthscale__' + field) for field in EPWORTH_FIELDS])),
+        (band, Case(*band_cases, default=Value(None), output_field=models.IntegerField())),
+        (apnoea_points, reduce(operator.add, [integer(field) for field in APNOEA_FIELDS]) + F(band)),
+        (related, Exists(ApnoeaRelatedDisease.objects.filter(apnoea=OuterRef(path + 'pk')))),
+        (identifications, Exists(ApnoeaIdentification.objects.filter(apnoea=OuterRef(path + 'pk')))),
+        (suggestions, Case(When(Q(**{related: True}) | Q(**{identifications: True}), then=Value(True)),
+                           default=Value(False), output_field=models.BooleanField())),
+        (limit, Case(When(**{suggestions: True, 'then': Value(APNOEA_RISK_LIMITS[True])}),
+                     default=Value(APNOEA_RISK_LIMITS[False]), output_field=models.IntegerField())),
+        (prefix + 'apnoea_at_risk', Case(When(**{apnoea_points + '__gte': F(limit), 'then': Value(True)}),
+                                         default=Value(False), output_field=models.BooleanField())),
+    ]
+
+
 class EpworthScale(models.Model):
     apnoea = models.OneToOneField('Apnoea', verbose_name="Ocena bezdechu")
 
@@ -356,15 +593,30 @@ class EpworthScale(models.Model):
     car_driving = models.CharField(max_length=1, choices=CHOICES, verbose_name="Prowadząc samochód, podczas kilkuminutowego oczekiwania w korku")
     
     def get_points(self):
-        return sum(map(int, (getattr(self, attr) for attr in ('sitting', 'tv_watch', 'public', 'in_car_passenger', 'afternoon_rest', 'talk_sitting', 'after_dinner', 'car_driving'))))
+        return rules.epworth_points(getattr(self, attr) for attr in EPWORTH_FIELDS)
 
     def at_risk(self):
-        return self.get_points() >= 10
+        return rules.epworth_at_risk(self.get_points())
 
     class Meta:
         verbose_name = u"Skala Epworth"
         verbose_name_plural = u"Skala Epworth"
 
+class ApnoeaQuerySet(models.QuerySet):
+    def annotate_risk(self):
+        """
+        Dodaje epworth_points, epworth_band, apnoea_points, apnoea_suggestions,
+        apnoea_risk_limit i apnoea_at_risk liczone w bazie (zamiast ~5 zapytań na wiersz).
+        """
+        queryset = self
+        for name, expression in apnoea_risk_annotations():
+            queryset = queryset.annotate(**{name: expression})
+        return queryset
+
+    def at_risk(self):
+        return self.annotate_risk().filter(apnoea_at_risk=True)
+
+
 class Apnoea(models.Model):
     appointment = models.OneToOneField('Appointment', verbose_name="Wizyta")
 
@@ -382,7 +634,9 @@ class Apnoea(models.Model):
     relateddiseases = models.ManyToManyField('records.CategoricalValue', through='ApnoeaRelatedDisease', related_name="a", verbose_name="Schorzenia sugerujące bezdech senny")
     identifications = models.ManyToManyField('records.CategoricalValue', through='ApnoeaIdentification', related_name="b", verbose_name="Objawy sugerujące bezdech senny")
 
+    objects = ApnoeaQuerySet.as_manager()
 
+    @instrumented
     def get_epworth_points(self):
         try:
             return self.epworthscale.get_points()
@@ -397,27 +651,21 @@ class Apnoea(models.Model):
         
 
     def get_epworth_scale(self):
-        epworth_points = self.get_epworth_points()
-        if epworth_points:
-            for i, limit in enumerate((8, 13, 18, 19)):
-                if epworth_points <= limit:
-                    return i +1
-        return None
+        return rules.epworth_band(self.get_epworth_points())
             
 
+    @instrumented
     def get_apnoea_points(self):
-        epworth_scale = self.get_epworth_scale()
-        if epworth_scale:
-            return sum([int(getattr(self, state)) for state in ('snooring', 'sleap_apnoea', 'overweight')]) + epworth_scale
-        return None
+        return rules.apnoea_points([getattr(self, state) for state in APNOEA_FIELDS], self.get_epworth_scale())
 
     def get_apnoea_risk_limit(self):
-        limits = {True: 12, False: 16}
-        return limits[self.has_apnoea_suggestions()]
+        return rules.apnoea_risk_limit(self.has_apnoea_suggestions())
 
+    @instrumented
     def at_apnoea_risk(self):
-        return self.get_apnoea_points() >= self.get_apnoea_risk_limit()
+        return rules.at_apnoea_risk(self.get_apnoea_points(), self.get_apnoea_risk_limit())
 
+    @instrumented
     def has_apnoea_suggestions(self):
         return self.relateddiseases.exists() or self.identifications.exists()
         
@@ -447,6 +695,123 @@ class ApnoeaIdentification(models.Model):
         verbose_name = u"Objaw sugerujący bezdech senny"
         verbose_name_plural = u"Objawy sugerujące bezdech senny"
 
+
+_pending_refresh = threading.local()
+
+
+class StoredScoreManager(models.Manager):
+    """
+    Tabela wyników przeliczanych z modelu źródłowego (klucz główny to OneToOne
+    do źródła); podklasy definiują refresh(ids) dla wybranych wierszy źródła.
+    """
+    def source_model(self):
+        return self.model._meta.pk.related_model
+
+    @property
+    def write_db(self):
+        """Baza, z której czytane są źródła i do której zapisywane są wyniki (nigdy replika)."""
+        return self._db or router.db_for_write(self.model)
+
+    def _replace(self, source_ids, objs):
+        """
+        Zastępuje wyniki wierszy źródła nowymi (delete() + bulk_create(), bez sygnałów)
+        i unieważnia podsumowania ich wizyt.
+        """
+        from summary import invalidate
+        with transaction.atomic(using=self.write_db):
+            self.using(self.write_db).filter(**{self.model._meta.pk.name + '__in': source_ids}).delete()
+            self.using(self.write_db).bulk_create(objs)
+        appointment_ids = list(self.source_model().objects.using(self.write_db).filter(pk__in=source_ids)
+                               .values_list('appointment', flat=True))
+        invalidate(appointment_ids)
+        transaction.on_commit(lambda: invalidate(appointment_ids), using=self.write_db)
+
+    def _pending(self, using):
+        if not hasattr(_pending_refresh, 'ids'):
+            _pending_refresh.ids = {}
+        return _pending_refresh.ids.setdefault((self.model, using), set())
+
+    def refresh_on_commit(self, source_id, using=None):
+        """
+        Przelicza wynik wiersza źródła po zatwierdzeniu transakcji (od razu poza
+        transakcją). Wiersze zmienione w jednej transakcji - np. kwestionariusz
+        z tabelami pośrednimi zapisany z panelu - przeliczane są jednym refresh().
+        """
+        using = using or self.write_db
+        self._pending(using).add(source_id)
+        transaction.on_commit(lambda: self._flush(using), using=using)
+
+    def _flush(self, using):
+        pending = self._pending(using)
+        if pending:
+            ids = list(pending)
+            pending.clear()
+            self.db_manager(using).refresh(ids)
+
+    def delete_orphans(self):
+        source = self.source_model().objects.using(self.write_db)
+        return self.using(self.write_db).exclude(**{self.model._meta.pk.name + '__in': source}).delete()
+
+    def rebuild(self, chunk_size=2000):
+        count = 0
+        ids = list(self.source_model().objects.using(self.write_db).order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(ids), chunk_size):
+            count += self.refresh(ids[start:start + chunk_size])
+        self.delete_orphans()
+        return count
+
+
+class ApnoeaScoreManager(StoredScoreManager):
+    def refresh(self, apnoea_ids):
+        """Przelicza zapisaną ocenę bezdechu (Apnoea.objects.annotate_risk()) dla podanych wierszy Apnoea."""
+        apnoea_ids = list(apnoea_ids)
+        rows = Apnoea.objects.using(self.write_db).filter(pk__in=apnoea_ids).annotate_risk().values_list(
+            'pk', 'epworth_points', 'epworth_band', 'apnoea_points', 'apnoea_suggestions', 'apnoea_risk_limit',
+            'apnoea_at_risk')
+        objs = [ApnoeaScore(apnoea_id=pk, epworth_points=points, epworth_band=band, apnoea_points=apnoea_points,
+                            has_suggestions=suggestions, risk_limit=limit, at_risk=at_risk)
+                for pk, points, band, apnoea_points, suggestions, limit, at_risk in rows]
+        self._replace(apnoea_ids, objs)
+        return len(objs)
+
+
+class ApnoeaScore(models.Model):
+    """
+    Zmaterializowana ocena bezdechu (punkty i przedział Epworth, punkty i ryzyko
+    bezdechu), utrzymywana sygnałami z Apnoea, EpworthScale i tabel pośrednich.
+    """
+    apnoea = models.OneToOneField('Apnoea', primary_key=True, related_name="apnoeascore", verbose_name="Bezdech senny")
+    epworth_points = models.IntegerField(verbose_name="Punkty Epworth", null=True, db_index=True)
+    epworth_band = models.IntegerField(verbose_name="Przedział Epworth", null=True, db_index=True)
+    apnoea_points = models.IntegerField(verbose_name="Punkty bezdechu", null=True, db_index=True)
+    has_suggestions = models.BooleanField(verbose_name="Objawy lub schorzenia sugerujące bezdech")
+    risk_limit = models.IntegerField(verbose_name="Próg ryzyka")
+    at_risk = models.BooleanField(verbose_name="Ryzyko bezdechu", db_index=True)
+
+    objects = ApnoeaScoreManager()
+
+    def __unicode__(self):
+        return _default_unicode(self)
+
+    class Meta:
+        verbose_name = u"Ocena bezdechu"
+        verbose_name_plural = u"Oceny bezdechu"
+
+
+APNOEA_SCORE_SOURCES = (EpworthScale, ApnoeaRelatedDisease, ApnoeaIdentification)
+
+def _refresh_apnoea_on_save(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        ApnoeaScore.objects.refresh_on_commit(instance.pk if isinstance(instance, Apnoea) else instance.apnoea_id, using)
+
+def _refresh_apnoea_on_delete(sender, instance, using=None, **kwargs):
+    ApnoeaScore.objects.refresh_on_commit(instance.apnoea_id, using)
+
+post_save.connect(_refresh_apnoea_on_save, sender=Apnoea, dispatch_uid="pnt_apnoeascore_apnoea_save")
+for _model in APNOEA_SCORE_SOURCES:
+    post_save.connect(_refresh_apnoea_on_save, sender=_model, dispatch_uid="pnt_apnoeascore_%s_save" % _model._meta.model_name)
+    post_delete.connect(_refresh_apnoea_on_delete, sender=_model, dispatch_uid="pnt_apnoeascore_%s_delete" % _model._meta.model_name)
+
         
 class SideIssue(models.Model):
     appointment = models.OneToOneField('Appointment', verbose_name="Wizyta")
@@ -467,6 +832,7 @@ class SideIssueFactor(models.Model):
 
     class Meta:
         unique_together = (('sideissue', 'sideissuefactor'),)
+        indexes = [models.Index(fields=['sideissuefactor', 'sideissue'])]
         verbose_name = u"Czynnik efektów ubocznych"
         verbose_name_plural = u"Czynniki efektów ubocznych"
         
@@ -513,124 +879,52 @@ class LifeQuality(models.Model):
         verbose_name = u"Jakość życia"
         verbose_name_plural = u"Jakość życia"
 
-    #assumption: 1 - a, 2 - b, .... 
     def _key_translator(self, number):
-        return chr(number-1 +ord('a') )
+        return rules.key_translator(number)
 
-        
     def get_q1_points(self):
-        health_state = {'a':0, 'b':1, 'c':2, 'd':3, 'e':4}
-        health_state_pts = health_state[self.health_state]
-        return {'sum':health_state_pts}
-        
-    
+        return rules.choice_points(rules.HEALTH_STATE, self.health_state)
+
     def get_q2_points(self):
-        health_change = {'a':0, 'b':1, 'c':2, 'd':3, 'e':4}
-        health_change_pts = health_change[self.health_change]
-        return {'sum':health_change_pts}
-    
+        return rules.choice_points(rules.HEALTH_CHANGE, self.health_change)
+
     def get_q3_points(self):
-        points={'a':0, 'b':0, 'c':0, 'd':0, 'e':0, 'f':0, 'g':0, 'h':0, 'i':0, 'j':0}
-        activity_limits = {'a':5, 'b':3, 'c':0}
-        for i in self.activitylimit_set.all():
-            key = self._key_translator(i.activitylimit.weight)
-            points[key] = activity_limits[i.limit]
-            
-        points['sum'] = sum(points.values())
-        return points
-        
+        return rules.activity_limit_points((categories.weight(i.activitylimit_id), i.limit)
+                                           for i in self.activitylimit_set.all())
+
     def get_q4_points(self):
-        points = {'a':0, 'b':0, 'c':0, 'd':0}
-        for i in self.healthproblem_set.all():
-            key = self._key_translator(i.healthproblem.weight)
-            points[key]=5
-        points['sum'] = sum(points.values())
-        return points
-        
+        return rules.problem_points([categories.weight(i.healthproblem_id) for i in self.healthproblem_set.all()], 'abcd')
+
     def get_q5_points(self):
-        points = {'a':0, 'b':0, 'c':0}
-        for i in self.emotionalproblem_set.all():
-            key = self._key_translator(i.emotionalproblem.weight)
-            points[key]=5
-        points['sum'] = sum(points.values())
-        return points
-    
+        return rules.problem_points([categories.weight(i.emotionalproblem_id) for i in self.emotionalproblem_set.all()],
+                                    'abc')
+
     def get_q6_points(self):
-        problem_impact = {'a':0, 'b':1, 'c':2, 'd':3, 'e':4}
-        problem_impact_pts = problem_impact[self.problem_impact ]
-        return {'sum':problem_impact_pts}
-        
+        return rules.choice_points(rules.PROBLEM_IMPACT, self.problem_impact)
+
     def get_q7_points(self):
-        pain_freq = {'a':0, 'b':1, 'c':2, 'd':3, 'e':4, 'f':5}
-        pain_freq_pts = pain_freq[self.pain_freq]
-        return {'sum':pain_freq_pts}
-    
+        return rules.choice_points(rules.PAIN_FREQ, self.pain_freq)
+
     def get_q8_points(self):
-        pain_impact = {'a':0, 'b':1, 'c':2, 'd':3, 'e':4}
-        pain_impact_pts = pain_impact[self.pain_impact]
-        return {'sum':pain_impact_pts}
-    
+        return rules.choice_points(rules.PAIN_IMPACT, self.pain_impact)
+
     def get_q9_points(self):
-        points={'a':0, 'b':0, 'c':0, 'd':0, 'e':0, 'f':0, 'g':0, 'h':0, 'i':0}
-        mood_symptoms = { 1: {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5},
-                          2: {'a': 5, 'b': 4, 'c': 3, 'd': 2, 'e': 1, 'f': 0},
-                          3: {'a': 5, 'b': 4, 'c': 3, 'd': 2, 'e': 1, 'f': 0},
-                          4: {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5},
-                          5: {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5},
-                          6: {'a': 5, 'b': 4, 'c': 3, 'd': 2, 'e': 1, 'f': 0},
-                          7: {'a': 5, 'b': 4, 'c': 3, 'd': 2, 'e': 1, 'f': 0},
-                          8: {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5},
-                          9: {'a': 5, 'b': 4, 'c': 3, 'd': 2, 'e': 1, 'f': 0}}
-           
-        for  i in self.moodsymptom_set.all():
-            weight = i.moodsymptom.weight
-            key = self._key_translator(weight)
-            val = i.freq
-            points[key] = mood_symptoms[weight][val]
-            
-        points['sum'] = sum(points.values())
-        return points
-           
-    
+        return rules.mood_symptom_points((categories.weight(i.moodsymptom_id), i.freq)
+                                         for i in self.moodsymptom_set.all())
+
     def get_q10_points(self):
-        condition_impact = {'a':4, 'b':3, 'c':2, 'd':1, 'e':0}
-        condition_impact_pts = condition_impact [self.condition_impact]
-        return {'sum':condition_impact_pts}
-        
+        return rules.choice_points(rules.CONDITION_IMPACT, self.condition_impact)
+
     def get_q11_points(self):
-        points={'a':0, 'b':0, 'c':0, 'd':0}
-        health_opinion = { 1: {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4},
-                           2: {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4},
-                           3: {'a': 4, 'b': 3, 'c': 2, 'd': 1, 'e': 0},
-                           4: {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4}}
-           
-        for  i in self.healthselfopinion_set.all():
-            weight = i.healthselfopinion.weight
-            key = self._key_translator(weight)
-            val = i.state_power
-            points[key] = health_opinion[weight][val]
-            
-        points['sum'] = sum(points.values())
-        return points
-        
-      
+        return rules.health_opinion_points((categories.weight(i.healthselfopinion_id), i.state_power)
+                                           for i in self.healthselfopinion_set.all())
+
+    @instrumented
     def get_sf36_groups(self):
-        points = {}
-        
-        points['PF'] = self.get_q3_points()['sum']
-        points['RP'] = self.get_q4_points()['sum']
-        points['BP'] = self.get_q7_points()['sum'] + self.get_q8_points()['sum']
-        points['GH'] = self.get_q1_points()['sum'] + self.get_q11_points()['sum']
-        q9 = self.get_q9_points()
-        points['VT'] = q9['a'] + q9['e'] + q9['g'] + q9['i']
-        points['SF'] = self.get_q6_points()['sum'] + self.get_q10_points()['sum']
-        points['RE'] = self.get_q5_points()['sum']
-        points['MH'] = q9['b'] + q9['c'] + q9['d'] + q9['f'] + q9['h']
-        points['HT'] = self.get_q2_points()['sum']
-        
-        return points
+        return rules.sf36_groups(dict((n, getattr(self, 'get_q%d_points' % n)()) for n in range(1, 12)))
         
         
+    @instrumented
     def get_sf36_points_sum(self):
         try:
             return sum(self.get_sf36_groups().values())
@@ -697,6 +991,73 @@ class HealthSelfOpinion(models.Model):
         verbose_name_plural = u"Samoocena stanu zdrowia"
 
 
+class SF36ScoreManager(StoredScoreManager):
+    def refresh(self, lifequality_ids):
+        """
+        Przelicza zapisane punkty SF-36 dla podanych kwestionariuszy. Kwestionariusze,
+        których nie da się policzyć (lub już nie istnieją) tracą swój wiersz.
+        """
+        from scoring import score_sf36
+        lifequality_ids = list(lifequality_ids)
+        scores = score_sf36(LifeQuality.objects.using(self.write_db).filter(pk__in=lifequality_ids))
+        objs = []
+        for i, lifequality_id in enumerate(scores.ids):
+            if not scores.valid[i]:
+                continue
+            values = dict((group.lower(), int(scores.groups[group][i])) for group in rules.SF36_GROUPS)
+            objs.append(SF36Score(lifequality_id=int(lifequality_id), total=sum(values.values()), **values))
+        self._replace(lifequality_ids, objs)
+        return len(objs)
+
+
+class SF36Score(models.Model):
+    """
+    Zmaterializowane punkty SF-36 (LifeQuality.get_sf36_groups()), utrzymywane
+    sygnałami z LifeQuality i tabel pośrednich, tak aby raporty mogły
+    filtrować i sortować po grupach w bazie.
+    """
+    lifequality = models.OneToOneField('LifeQuality', primary_key=True, related_name="sf36score", verbose_name="Jakość życia")
+    pf = models.IntegerField(verbose_name="PF", db_index=True)
+    rp = models.IntegerField(verbose_name="RP", db_index=True)
+    bp = models.IntegerField(verbose_name="BP", db_index=True)
+    gh = models.IntegerField(verbose_name="GH", db_index=True)
+    vt = models.IntegerField(verbose_name="VT", db_index=True)
+    sf = models.IntegerField(verbose_name="SF", db_index=True)
+    re = models.IntegerField(verbose_name="RE", db_index=True)
+    mh = models.IntegerField(verbose_name="MH", db_index=True)
+    ht = models.IntegerField(verbose_name="HT", db_index=True)
+    total = models.IntegerField(verbose_name="Suma SF-36", db_index=True)
+
+    objects = SF36ScoreManager()
+
+    def __unicode__(self):
+        return _default_unicode(self)
+
+    class Meta:
+        verbose_name = u"Wynik SF-36"
+        verbose_name_plural = u"Wyniki SF-36"
+
+
+SF36_SOURCES = (ActivityLimit, HealthProblem, EmotionalProblem, MoodSymptom, HealthSelfOpinion)
+
+def _sf36_lifequality_id(instance):
+    return instance.pk if isinstance(instance, LifeQuality) else instance.lifequality_id
+
+def _refresh_sf36_on_save(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        SF36Score.objects.refresh_on_commit(_sf36_lifequality_id(instance), using)
+
+def _refresh_sf36_on_delete(sender, instance, using=None, **kwargs):
+    # po zatwierdzeniu transakcji - przy kaskadowym usuwaniu LifeQuality
+    # wiersz kwestionariusza jeszcze istnieje w trakcie post_delete
+    SF36Score.objects.refresh_on_commit(_sf36_lifequality_id(instance), using)
+
+post_save.connect(_refresh_sf36_on_save, sender=LifeQuality, dispatch_uid="pnt_sf36_lifequality_save")
+for _model in SF36_SOURCES:
+    post_save.connect(_refresh_sf36_on_save, sender=_model, dispatch_uid="pnt_sf36_%s_save" % _model._meta.model_name)
+    post_delete.connect(_refresh_sf36_on_delete, sender=_model, dispatch_uid="pnt_sf36_%s_delete" % _model._meta.model_name)
+
+
 
 class EtiologySymptom(models.Model):
     etiology = models.ForeignKey('Etiology')
@@ -764,6 +1125,7 @@ class Etiology(models.Model):
     hypertension_chemicals = models.ManyToManyField('records.CategoricalValue', through='HypertensionChemicalRelation', related_name="etiology_by_chemicals", verbose_name="NT związane z lekami/środkami chemicznymi")
 
 
+    @instrumented
     def __unicode__(self):
         return u"Etiologia NT z dnia %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -773,12 +1135,32 @@ class Etiology(models.Model):
         verbose_name_plural = u"Etiologia nadciśnienia tętnicznego"
 
         
-class Antropometrics(models.Model):
+class IndicatorModel(models.Model):
+    """
+    Sekcja wizyty z kolumnami wskaźników (indicators.py, stored=True)
+    uzupełnianymi w save(); derived_fields podaje nazwy tych kolumn.
+    """
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        super(IndicatorModel, self).save(*args, **kwargs)
+
+    def sync_derived_fields(self):
+        indicators.sync(self)
+
+    class Meta:
+        abstract = True
+
+
+class Antropometrics(IndicatorModel):
     appointment = models.OneToOneField('Appointment', verbose_name="Wizyta")
     loins_perimeter = models.FloatField(verbose_name="Obwód bioder [cm]")
     weist_perimeter = models.FloatField(verbose_name="Obwód talii [cm]")
     height = models.FloatField(verbose_name="Wzrost [w cm]")
+    waist_hip_ratio = models.FloatField(verbose_name="WHR", null=True, editable=False, db_index=True)
+
+    derived_fields = ('waist_hip_ratio',)
     
+    @instrumented
     def __unicode__(self):
         return u"Pomiar antropometryczny z dnia %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -786,13 +1168,18 @@ class Antropometrics(models.Model):
         verbose_name = u"Pomiar antropometryczny"
         verbose_name_plural = u"Pomiary antropometryczne"
 
-class BodyPressure(models.Model):
+class BodyPressure(IndicatorModel):
     appointment = models.OneToOneField('Appointment', verbose_name="Wizyta")
     systolic_left = models.FloatField(verbose_name="Ciśnienie skurczowe strona lewa")
     systolic_right = models.FloatField(verbose_name="Ciśnienie skurczowe strona prawa")
     diastolic_left = models.FloatField(verbose_name="Ciśnienie rozkurczowe strona lewa")
     diastolic_right = models.FloatField(verbose_name="Ciśnienie rozkurczowe strona prawa")
+    mean_arterial_pressure = models.FloatField(verbose_name="MAP [mmHg]", null=True, editable=False, db_index=True)
+    inter_arm_difference = models.FloatField(verbose_name="Różnica ciśnień skurczowych między ramionami [mmHg]", null=True, editable=False, db_index=True)
+
+    derived_fields = ('mean_arterial_pressure', 'inter_arm_difference')
     
+    @instrumented
     def __unicode__(self):
         return u"Pomiar BP z dnia - %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -824,6 +1211,7 @@ class HeartEcho(models.Model):
     ia = models.ForeignKey('records.CategoricalValue', related_name="heart_echo_by_ia", verbose_name="IA", limit_choices_to={'group__name': 'ia'})
     it = models.ForeignKey('records.CategoricalValue', related_name="heart_echo_by_it", verbose_name="IT", limit_choices_to={'group__name': 'it'})
 
+    @instrumented
     def __unicode__(self):
         return u"Echo serca z dnia - %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -832,7 +1220,7 @@ class HeartEcho(models.Model):
         verbose_name_plural = u"Echa serca"
 
     
-class Biochemistry(models.Model):
+class Biochemistry(IndicatorModel):
     appointment = models.OneToOneField('Appointment', verbose_name="Wizyta")
     wbc = models.FloatField(verbose_name="WBC [10e9/L]")
     rbc = models.FloatField(verbose_name="RBC [10e12/L]")
@@ -853,8 +1241,12 @@ class Biochemistry(models.Model):
     urca = models.FloatField(verbose_name="URCA [mg/L]")
     rcrp = models.FloatField(verbose_name="RCRP [mg/L]")
     crea = models.FloatField(verbose_name="CREA [umol/L]")
+    ldl_hdl_ratio = models.FloatField(verbose_name="LDL/HDL", null=True, editable=False, db_index=True)
+
+    derived_fields = ('ldl_hdl_ratio',)
     
     
+    @instrumented
     def __unicode__(self):
         return u"Badania laboratoryjne z dnia %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -863,11 +1255,15 @@ class Biochemistry(models.Model):
         verbose_name_plural = u"Badania laboratoryjne"
     
 
-class ABI(models.Model):
+class ABI(IndicatorModel):
     appointment = models.OneToOneField('Appointment', verbose_name="Wizyta")
     left_side = models.FloatField(verbose_name="Strona lewa")
     right_side = models.FloatField(verbose_name="Strona prawa")
+    abi_min = models.FloatField(verbose_name="ABI (mniejsza wartość)", null=True, editable=False, db_index=True)
+
+    derived_fields = ('abi_min',)
     
+    @instrumented
     def __unicode__(self):
         return u"Pomiar ABI z dnia %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -875,13 +1271,17 @@ class ABI(models.Model):
         verbose_name = u"ABI"
         verbose_name_plural = u"ABI"
 
-class CartoidUSG(models.Model):
+class CartoidUSG(IndicatorModel):
     appointment = models.OneToOneField('Appointment', verbose_name="Wizyta")
     imt_left = models.FloatField(verbose_name="IMT strona lewa [mm]")
     imt_right = models.FloatField(verbose_name="IMT strona prawa [mm]")
     plaques = models.BooleanField(verbose_name="Blaszki miażdzycowe [mm]")
     notes = models.TextField(verbose_name="Notatki")
+    imt_max = models.FloatField(verbose_name="IMT (większa wartość) [mm]", null=True, editable=False, db_index=True)
+
+    derived_fields = ('imt_max',)
     
+    @instrumented
     def __unicode__(self):
         return u"USG tętnic szyjnych z dnia %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -896,6 +1296,7 @@ class EKG(models.Model):
     cornell_factor = models.FloatField(verbose_name="Wskaźnik Cornell [mm]")
     notes = models.TextField(verbose_name="Notatki")
     
+    @instrumented
     def __unicode__(self):
         return u"Pomiar EKG z dnia %s, %s" % (self.appointment.date, self.appointment.patient)
 
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+
+def estimated_count(model, using='default'):
+    """
+    Szacunkowa liczba wierszy tabeli ze statystyk planera (tylko PostgreSQL),
+    None gdy baza jej nie udostępnia.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator dla list zmian dużych tabel: dla niefiltrowanego querysetu
+    liczba stron wynika z estimated_count() zamiast dokładnego COUNT(*).
+    """
+    threshold = 100000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimated_count(self.object_list.model, using=self.object_list.db)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate
+        return Paginator.count.func(self)
+
+
+# --- stronicowanie kluczem ---
+
+class KeysetPage(object):
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator(object):
+    """
+    Stronicowanie po kluczu sortowania (WHERE klucz > ostatni z poprzedniej
+    strony) zamiast OFFSET - koszt dowolnej strony jak pierwszej, o ile
+    sortowanie pokrywa indeks. keys to pola modelu ('-' - malejąco), ostatnie
+    musi być unikalne (np. 'pk'). NULL traktowany jest jak wartość największa
+    (domyślnie w PostgreSQL), również w bazach sortujących go inaczej.
+    """
+    def __init__(self, queryset, keys, per_page=50):
+        self.queryset = queryset
+        self.per_page = per_page
+        meta = queryset.model._meta
+        self.keys = []
+        for key in keys:
+            descending = key.startswith('-')
+            field = meta.pk if key.lstrip('-') == 'pk' else meta.get_field(key.lstrip('-'))
+            self.keys.append((field, descending))
+
+    # --- kursor ---
+
+    def encode(self, obj):
+        values = [getattr(obj, field.attname) for field, _ in self.keys]
+        return urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder))
+
+    def decode(self, cursor):
+        try:
+            values = json.loads(urlsafe_b64decode(str(cursor)))
+            if len(values) != len(self.keys):
+                raise ValueError(cursor)
+            return [None if value is None else field.to_python(value) for (field, _), value in zip(self.keys, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise InvalidPage(u"Nieprawidłowy kursor strony.")
+
+    # --- zapytanie ---
+
+    def _order_by(self, reverse):
+        order = []
+        for field, descending in self.keys:
+            expression = F(field.attname)
+            if descending != reverse:
+                order.append(expression.desc(nulls_first=True) if field.null else expression.desc())
+            else:
+                order.append(expression.asc(nulls_last=True) if field.null else expression.asc())
+        return order
+
+    def _after(self, values, reverse):
+        """Warunek "wiersz za kursorem" w kolejności kluczy (odwróconej przy reverse)."""
+        condition, equal = Q(pk__in=[]), Q()
+        for (field, descending), value in zip(self.keys, values):
+            name = field.attname
+            if descending != reverse:
+                beyond = Q(**{name + '__isnull': False}) if value is None else Q(**{name + '__lt': value})
+            elif value is None:
+                beyond = None
+            else:
+                beyond = Q(**{name + '__gt': value})
+                if field.null:
+                    beyond |= Q(**{name + '__isnull': True})
+            if beyond is not None:
+                condition |= equal & beyond
+            equal &= Q(**{name + '__isnull': True}) if value is None else Q(**{name: value})
+        field, descending = self.keys[0]
+        if not field.null:
+            # zakres na pierwszym kluczu - indeks zawęża skan także bez rozwijania OR
+            condition &= Q(**{field.attname + ('__lte' if descending != reverse else '__gte'): values[0]})
+        return condition
+
+    def page(self, after=None, before=None):
+        """Strona za kursorem after, przed kursorem before albo pierwsza."""
+        reverse = before is not None
+        cursor = before if reverse else after
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if cursor is not None:
+            queryset = queryset.filter(self._after(self.decode(cursor), reverse))
+        objects = list(queryset[:self.per_page + 1])
+        more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if reverse:
+            objects.reverse()
+        if not objects:
+            return KeysetPage([], None, None)
+        has_next, has_previous = (True, more) if reverse else (more, cursor is not None)
+        return KeysetPage(objects, self.encode(objects[-1]) if has_next else None,
+                          self.encode(objects[0]) if has_previous else None)
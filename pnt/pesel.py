@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Dekodowanie numeru PESEL: data urodzenia (stulecie zakodowane w miesiącu)
+i cyfra płci (10. cyfra - nieparzysta dla mężczyzn, parzysta dla kobiet).
+"""
+import datetime
+
+# przesunięcie miesiąca -> stulecie
+MONTH_OFFSETS = ((80, 1800), (0, 1900), (20, 2000), (40, 2100), (60, 2200))
+
+
+def decode_birth_date(pesel):
+    """Data urodzenia zakodowana w PESEL-u albo None dla niepoprawnego numeru."""
+    if not pesel or len(pesel) != 11 or not pesel.isdigit():
+        return None
+    year, month, day = int(pesel[:2]), int(pesel[2:4]), int(pesel[4:6])
+    for offset, century in MONTH_OFFSETS:
+        if offset < month <= offset + 12:
+            try:
+                return datetime.date(century + year, month - offset, day)
+            except ValueError:
+                return None
+    return None
+
+
+def decode_sex_digit(pesel):
+    if not pesel or len(pesel) != 11 or not pesel.isdigit():
+        return None
+    return int(pesel[9])
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Kierowanie odczytów analitycznych (kohorty, punktacja SF-36, eksporty,
+zestawienia leków) do repliki bazy, aby nie konkurowały z wprowadzaniem wizyt.
+
+Konfiguracja:
+
+    DATABASES['replica'] = {...}              # lokalnie np. drugi plik SQLite
+    DATABASE_ROUTERS = ['pnt.routers.ReplicaRouter']
+    PNT_REPLICA_DB = 'replica'
+
+Bez PNT_REPLICA_DB wszystko działa na bazie głównej. Zapisy zawsze idą do
+bazy głównej, a replika używana jest tylko wewnątrz use_replica() (i funkcji
+z dekoratorem on_replica) dla odczytów bez obiektu źródłowego - relacje obiektu
+czytane są z jego bazy. O bazie decyduje miejsce wykonania zapytania, nie
+utworzenia querysetu: querysety (np. kohorty z cohorts.py, używane też jako
+podzapytania) trzeba wyliczyć wewnątrz use_replica(), a całe zapytanie,
+z podzapytaniami, trafia wtedy do jednej bazy.
+
+force_primary() wyłącza replikę w swoim bloku. Po zapisie w wątku replika jest
+wyłączona, aby odczyty po zapisie nie trafiały na opóźnioną kopię: w żądaniu
+do jego końca (np. po zapisie formularza w panelu administracyjnym), poza
+żądaniami (komendy, zadania) - do wywołania finish(), np. po zakończeniu
+zadania, którego wyniki może już czytać replika.
+Zapis zgłaszają sygnały post_save/post_delete, a operacje wsadowe bez sygnałów
+(import, historia) wywołują written() (PntConfig.ready()).
+
+W testach replika może wskazywać bazę główną (DATABASES['replica']['TEST'] =
+{'MIRROR': 'default'}) albo osobny plik SQLite - ReplicaQueryTest sprawdza
+wtedy, do której bazy trafiają zapytania eksportu i kohort.
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+
+_local = threading.local()
+
+
+def _state():
+    if not hasattr(_local, 'replica'):
+        _local.replica = 0
+        _local.primary = 0
+        _local.wrote = False
+    return _local
+
+
+def replica_db():
+    """Alias repliki, jeśli można z niej teraz czytać, inaczej None."""
+    alias = getattr(settings, 'PNT_REPLICA_DB', None)
+    state = _state()
+    if alias is None or state.primary or state.wrote:
+        return None
+    return alias
+
+
+def written(**kwargs):
+    """Zapis do bazy głównej w wątku (sygnały post_save/post_delete, operacje wsadowe)."""
+    _state().wrote = True
+
+
+def reset(**kwargs):
+    """Zapomina o zapisach w wątku na początku żądania (sygnał request_started)."""
+    _state().wrote = False
+
+
+def finish(**kwargs):
+    """Koniec żądania (sygnał request_finished) lub zadania poza żądaniem."""
+    _state().wrote = False
+
+
+@contextmanager
+def use_replica():
+    state = _state()
+    state.replica += 1
+    try:
+        yield
+    finally:
+        state.replica -= 1
+
+
+@contextmanager
+def force_primary():
+    state = _state()
+    state.primary += 1
+    try:
+        yield
+    finally:
+        state.primary -= 1
+
+
+def on_replica(function):
+    """Dekorator funkcji tylko czytających, wykonywanych w use_replica()."""
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return function(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter(object):
+    def db_for_read(self, model, **hints):
+        if not _state().replica:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return replica_db()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replika to kopia bazy głównej - obiekty z obu baz mogą być powiązane
+        return True
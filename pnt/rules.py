@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Reguły punktacji skali Epworth, ryzyka bezdechu i kwestionariusza SF-36 jako
+czyste funkcje wartości pól - wspólne dla metod modeli (EpworthScale, Apnoea,
+LifeQuality) i lekkich rekordów ze scorecards.py.
+
+Odpowiedzi to jednoznakowe kody wyborów ('1'..'4' lub 'a'..'f'), wiersze
+tabel pośrednich - pary (waga CategoricalValue, odpowiedź).
+"""
+
+EPWORTH_FIELDS = ('sitting', 'tv_watch', 'public', 'in_car_passenger', 'afternoon_rest', 'talk_sitting', 'after_dinner', 'car_driving')
+# górne granice kolejnych przedziałów skali Epworth
+EPWORTH_LIMITS = (8, 13, 18, 19)
+EPWORTH_RISK = 10
+APNOEA_FIELDS = ('snooring', 'sleap_apnoea', 'overweight')
+# próg punktów bezdechu w zależności od obecności objawów/schorzeń sugerujących bezdech
+APNOEA_RISK_LIMITS = {True: 12, False: 16}
+
+
+# --- Epworth i bezdech ---
+
+def epworth_points(answers):
+    return sum(map(int, answers))
+
+
+def epworth_at_risk(points):
+    return points >= EPWORTH_RISK
+
+
+def epworth_band(points):
+    """Numer przedziału skali Epworth, None dla braku punktów (lub 0)."""
+    if points:
+        for i, limit in enumerate(EPWORTH_LIMITS):
+            if points <= limit:
+                return i + 1
+    return None
+
+
+def apnoea_points(answers, band):
+    if band:
+        return sum([int(answer) for answer in answers]) + band
+    return None
+
+
+def apnoea_risk_limit(has_suggestions):
+    return APNOEA_RISK_LIMITS[has_suggestions]
+
+
+def at_apnoea_risk(points, limit):
+    return points >= limit
+
+
+# --- SF-36 ---
+
+ASC = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5}
+DESC = {'a': 5, 'b': 4, 'c': 3, 'd': 2, 'e': 1, 'f': 0}
+
+HEALTH_STATE = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4}                  # q1
+HEALTH_CHANGE = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4}                 # q2
+ACTIVITY_LIMITS = {'a': 5, 'b': 3, 'c': 0}                               # q3
+PROBLEM_IMPACT = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4}                # q6
+PAIN_FREQ = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5}             # q7
+PAIN_IMPACT = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4}                   # q8
+MOOD_SYMPTOMS = {1: ASC, 2: DESC, 3: DESC, 4: ASC, 5: ASC, 6: DESC, 7: DESC, 8: ASC, 9: DESC}  # q9
+CONDITION_IMPACT = {'a': 4, 'b': 3, 'c': 2, 'd': 1, 'e': 0}              # q10
+HEALTH_OPINION = {1: HEALTH_STATE, 2: HEALTH_STATE, 3: CONDITION_IMPACT, 4: HEALTH_STATE}   # q11
+
+SF36_GROUPS = ('PF', 'RP', 'BP', 'GH', 'VT', 'SF', 'RE', 'MH', 'HT')
+# podpunkty q9 liczone do VT, pozostałe do MH
+MOOD_VT = 'aegi'
+
+
+#assumption: 1 - a, 2 - b, ....
+def key_translator(number):
+    return chr(number - 1 + ord('a'))
+
+
+def choice_points(table, answer):
+    """Punkty pytania jednokrotnego wyboru (q1, q2, q6, q7, q8, q10)."""
+    return {'sum': table[answer]}
+
+
+def _keyed_points(keys, items):
+    points = dict.fromkeys(keys, 0)
+    for key, value in items:
+        points[key] = value
+    points['sum'] = sum(points.values())
+    return points
+
+
+def activity_limit_points(rows):
+    """q3 z wierszy (waga, ograniczenie)."""
+    return _keyed_points('abcdefghij', ((key_translator(weight), ACTIVITY_LIMITS[limit]) for weight, limit in rows))
+
+
+def problem_points(weights, keys):
+    """q4 (keys 'abcd') lub q5 (keys 'abc') z wag zaznaczonych problemów, po 5 punktów."""
+    return _keyed_points(keys, ((key_translator(weight), 5) for weight in weights))
+
+
+def mood_symptom_points(rows):
+    """q9 z wierszy (waga, częstość)."""
+    return _keyed_points('abcdefghi', ((key_translator(weight), MOOD_SYMPTOMS[weight][freq]) for weight, freq in rows))
+
+
+def health_opinion_points(rows):
+    """q11 z wierszy (waga, odpowiedź)."""
+    return _keyed_points('abcd', ((key_translator(weight), HEALTH_OPINION[weight][answer]) for weight, answer in rows))
+
+
+def sf36_groups(q):
+    """Grupy SF-36 ze słownika {numer pytania: punkty jak z get_qN_points()}."""
+    q9 = q[9]
+    return {
+        'PF': q[3]['sum'],
+        'RP': q[4]['sum'],
+        'BP': q[7]['sum'] + q[8]['sum'],
+        'GH': q[1]['sum'] + q[11]['sum'],
+        'VT': sum(q9[key] for key in MOOD_VT),
+        'SF': q[6]['sum'] + q[10]['sum'],
+        'RE': q[5]['sum'],
+        'MH': sum(q9[key] for key in 'abcdefghi' if key not in MOOD_VT),
+        'HT': q[2]['sum'],
+    }
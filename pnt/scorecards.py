@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Lekkie rekordy (__slots__) do wsadowej punktacji Epworth, bezdechu i SF-36.
+
+Rekordy budowane są wprost z wierszy values_list() - bez instancji modeli,
+ich stanu i deskryptorów relacji - i liczą punkty tymi samymi funkcjami
+z rules.py co metody EpworthScale, Apnoea i LifeQuality:
+
+    for record in apnoea_records(Apnoea.objects.filter(...)):
+        record.pk, record.apnoea_points(), record.at_apnoea_risk()
+
+apnoea_records() to jedno zapytanie, lifequality_records() - sześć, niezależnie
+od liczby kwestionariuszy. Wagi CategoricalValue pochodzą z rejestru categories.
+"""
+from django.db.models import Exists, OuterRef
+
+import categories
+import rules
+from models import (Apnoea, ApnoeaRelatedDisease, ApnoeaIdentification, LifeQuality, ActivityLimit, HealthProblem,
+                    EmotionalProblem, MoodSymptom, HealthSelfOpinion)
+from routers import on_replica
+
+
+class Record(object):
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join(repr(getattr(self, name)) for name in self.__slots__))
+
+
+class EpworthRecord(Record):
+    """Odpowiedzi skali Epworth (kody '1'..'4') w kolejności rules.EPWORTH_FIELDS."""
+    __slots__ = ('answers',)
+
+    def points(self):
+        return rules.epworth_points(self.answers)
+
+    def at_risk(self):
+        return rules.epworth_at_risk(self.points())
+
+
+class ApnoeaRecord(Record):
+    """Jak Apnoea: epworth to EpworthRecord albo None, gdy skali nie wypełniono."""
+    __slots__ = ('pk', 'answers', 'epworth', 'has_suggestions')
+
+    def epworth_points(self):
+        return self.epworth.points() if self.epworth is not None else None
+
+    def epworth_scale(self):
+        return rules.epworth_band(self.epworth_points())
+
+    def apnoea_points(self):
+        return rules.apnoea_points(self.answers, self.epworth_scale())
+
+    def apnoea_risk_limit(self):
+        return rules.apnoea_risk_limit(self.has_suggestions)
+
+    def at_apnoea_risk(self):
+        return rules.at_apnoea_risk(self.apnoea_points(), self.apnoea_risk_limit())
+
+
+class LifeQualityRecord(Record):
+    """
+    Jak LifeQuality: answers to odpowiedzi (health_state, health_change,
+    problem_impact, pain_freq, pain_impact, condition_impact), pozostałe pola -
+    wiersze tabel pośrednich: (waga, odpowiedź) lub same wagi dla q4 i q5.
+    """
+    __slots__ = ('pk', 'answers', 'activity_limits', 'health_problems', 'emotional_problems', 'mood_symptoms',
+                 'health_opinions')
+
+    def q_points(self):
+        health_state, health_change, problem_impact, pain_freq, pain_impact, condition_impact = self.answers
+        return {
+            1: rules.choice_points(rules.HEALTH_STATE, health_state),
+            2: rules.choice_points(rules.HEALTH_CHANGE, health_change),
+            3: rules.activity_limit_points(self.activity_limits),
+            4: rules.problem_points(self.health_problems, 'abcd'),
+            5: rules.problem_points(self.emotional_problems, 'abc'),
+            6: rules.choice_points(rules.PROBLEM_IMPACT, problem_impact),
+            7: rules.choice_points(rules.PAIN_FREQ, pain_freq),
+            8: rules.choice_points(rules.PAIN_IMPACT, pain_impact),
+            9: rules.mood_symptom_points(self.mood_symptoms),
+            10: rules.choice_points(rules.CONDITION_IMPACT, condition_impact),
+            11: rules.health_opinion_points(self.health_opinions),
+        }
+
+    def sf36_groups(self):
+        return rules.sf36_groups(self.q_points())
+
+    def sf36_points_sum(self):
+        """Suma punktów albo wyjątek (jak LifeQuality.get_sf36_points_sum())."""
+        try:
+            return sum(self.sf36_groups().values())
+        except Exception, error:
+            return error
+
+
+@on_replica
+def apnoea_records(queryset=None):
+    """Rekordy ApnoeaRecord dla querysetu Apnoea (jedno zapytanie)."""
+    if queryset is None:
+        queryset = Apnoea.objects.all()
+    queryset = queryset.annotate(
+        _related=Exists(ApnoeaRelatedDisease.objects.filter(apnoea=OuterRef('pk'))),
+        _identified=Exists(ApnoeaIdentification.objects.filter(apnoea=OuterRef('pk'))))
+    fields = ['pk'] + list(rules.APNOEA_FIELDS) + ['epworthscale__' + field for field in rules.EPWORTH_FIELDS]
+    n = len(rules.APNOEA_FIELDS)
+    records = []
+    for row in queryset.values_list(*(fields + ['_related', '_identified'])).iterator():
+        epworth = row[1 + n:-2]
+        records.append(ApnoeaRecord(row[0], row[1:1 + n], EpworthRecord(epworth) if epworth[0] is not None else None,
+                                    row[-2] or row[-1]))
+    return records
+
+
+LIFEQUALITY_FIELDS = ('health_state', 'health_change', 'problem_impact', 'pain_freq', 'pain_impact', 'condition_impact')
+
+# pole rekordu -> (model tabeli pośredniej, pole wartości, pole odpowiedzi)
+THROUGH_ROWS = (
+    ('activity_limits', ActivityLimit, 'activitylimit', 'limit'),
+    ('health_problems', HealthProblem, 'healthproblem', None),
+    ('emotional_problems', EmotionalProblem, 'emotionalproblem', None),
+    ('mood_symptoms', MoodSymptom, 'moodsymptom', 'freq'),
+    ('health_opinions', HealthSelfOpinion, 'healthselfopinion', 'state_power'),
+)
+
+
+@on_replica
+def lifequality_records(queryset=None):
+    """Rekordy LifeQualityRecord dla querysetu LifeQuality (sześć zapytań)."""
+    if queryset is None:
+        queryset = LifeQuality.objects.all()
+    records = {}
+    for row in queryset.values_list('pk', *LIFEQUALITY_FIELDS).iterator():
+        records[row[0]] = LifeQualityRecord(row[0], row[1:], [], [], [], [], [])
+    ids = queryset.values('pk')
+    for name, model, value_field, answer_field in THROUGH_ROWS:
+        fields = ['lifequality_id', value_field + '_id'] + ([answer_field] if answer_field else [])
+        # kolejność zapisu jak w lifequality.<model>_set.all() - przy powtórzonej wadze liczy się ostatni wiersz
+        rows = model.objects.using(queryset.db).filter(lifequality__in=ids).order_by('pk').values_list(*fields)
+        for row in rows.iterator():
+            weight = categories.weight(row[1])
+            getattr(records[row[0]], name).append((weight, row[2]) if answer_field else weight)
+    return [records[pk] for pk in sorted(records)]
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Wsadowe liczenie punktów SF-36 dla wielu kwestionariuszy LifeQuality naraz.
+
+Zamiast wywoływać LifeQuality.get_sf36_groups() dla każdego rekordu
+(kilkanaście zapytań na kwestionariusz) pobieramy pola kwestionariusza
+i pięć tabel pośrednich pięcioma zapytaniami, a punkty liczymy na
+tablicach NumPy. Tabele punktów pochodzą z rules.py, więc wyniki są
+identyczne z metodami get_qN_points().
+"""
+import numpy as np
+
+import rules
+from models import LifeQuality, ActivityLimit, HealthProblem, EmotionalProblem, MoodSymptom, HealthSelfOpinion
+from routers import on_replica
+from rules import SF36_GROUPS
+
+
+def _by_code(table):
+    """Tabela rules {'a': punkty, 'b': ...} jako krotka punktów w kolejności kodów."""
+    return tuple(table[rules.key_translator(i + 1)] for i in range(len(table)))
+
+
+# pole kwestionariusza -> punkty za odpowiedzi 'a', 'b', ... (jak w get_qN_points)
+DIRECT_QUESTIONS = (
+    ('health_state', _by_code(rules.HEALTH_STATE)),           # q1
+    ('health_change', _by_code(rules.HEALTH_CHANGE)),         # q2
+    ('problem_impact', _by_code(rules.PROBLEM_IMPACT)),       # q6
+    ('pain_freq', _by_code(rules.PAIN_FREQ)),                 # q7
+    ('pain_impact', _by_code(rules.PAIN_IMPACT)),             # q8
+    ('condition_impact', _by_code(rules.CONDITION_IMPACT)),   # q10
+)
+
+ACTIVITY_LIMITS = _by_code(rules.ACTIVITY_LIMITS)
+MOOD_SYMPTOMS = dict((weight, _by_code(table)) for weight, table in rules.MOOD_SYMPTOMS.items())
+# wagi podpunktów q9 liczonych do VT
+MOOD_VT = tuple(ord(key) - ord('a') + 1 for key in rules.MOOD_VT)
+HEALTH_OPINION = dict((weight, _by_code(table)) for weight, table in rules.HEALTH_OPINION.items())
+
+# kod odpowiedzi spoza 'a'..'z' (puste, None, ...)
+_INVALID_CODE = 26
+# wagi dla których LifeQuality._key_translator() nie rzuca wyjątku
+_KEY_WEIGHTS = (1 - ord('a'), 256 - ord('a'))
+
+
+class SF36Scores(object):
+    """
+    Wynik score_sf36(): ids - posortowane id kwestionariuszy, groups - słownik
+    grupa -> tablica punktów, valid - maska kwestionariuszy, dla których
+    get_sf36_groups() nie rzuciłoby wyjątku (dla pozostałych punkty są 0).
+    """
+    def __init__(self, ids, groups, valid):
+        self.ids = ids
+        self.groups = groups
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.ids)
+
+    def total(self):
+        return sum(self.groups[group] for group in SF36_GROUPS)
+
+    def as_dict(self):
+        result = {}
+        for i in np.flatnonzero(self.valid):
+            result[int(self.ids[i])] = dict((group, int(self.groups[group][i])) for group in SF36_GROUPS)
+        return result
+
+
+def _codes(values):
+    return np.array([ord(value) - ord('a') if value and len(value) == 1 and 'a' <= value <= 'z' else _INVALID_CODE
+                     for value in values], dtype=np.int64)
+
+
+def _table(points):
+    table = np.full(_INVALID_CODE + 1, np.nan)
+    table[:len(points)] = points
+    return table
+
+
+def _lookup(points, values):
+    return _table(points)[_codes(values)]
+
+
+def _through_rows(model, value_field, answer_field, queryset, ids):
+    fields = ['lifequality_id', '%s__weight' % value_field]
+    if answer_field:
+        fields.append(answer_field)
+    # ta sama baza co kwestionariusze (replika dla analiz, główna przy odświeżaniu SF36Score)
+    rows = model.objects.using(queryset.db).order_by('pk')
+    if queryset.query.can_filter():
+        rows = list(rows.filter(lifequality__in=queryset.values('pk')).values_list(*fields))
+    else:
+        id_list = ids.tolist()
+        rows = [row for start in range(0, len(id_list), 500)
+                for row in rows.filter(lifequality__in=id_list[start:start + 500]).values_list(*fields)]
+        rows.sort(key=lambda row: row[0])
+    columns = zip(*rows) if rows else [()] * len(fields)
+    position = np.searchsorted(ids, np.array(columns[0], dtype=np.int64))
+    weights = np.array([w if w is not None else np.nan for w in columns[1]], dtype=float)
+    answers = columns[2] if answer_field else None
+    return position, weights, answers
+
+
+def _last_per_key(position, weights, points):
+    """
+    Jak słownik points[key] w get_qN_points(): dla powtórzonej pary
+    (kwestionariusz, waga) liczy się ostatni wiersz.
+    """
+    if not len(position):
+        return position, weights, points
+    span = weights.max() - weights.min() + 1
+    keys = position * span + (weights - weights.min())
+    _, first = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - first
+    return position[last], weights[last], points[last]
+
+
+def _sum_points(position, weights, points, n):
+    position, weights, points = _last_per_key(position, weights, points)
+    return np.bincount(position, weights=points, minlength=n).astype(np.int64)
+
+
+def _mark_invalid(valid, position, bad):
+    valid[position[bad]] = False
+
+
+def _keyed_weights(weights):
+    return ~np.isnan(weights) & (weights >= _KEY_WEIGHTS[0]) & (weights <= _KEY_WEIGHTS[1])
+
+
+def _weight_table_points(table, weights, answers):
+    """Punkty z tabeli {waga: punkty za 'a', 'b', ...}; NaN dla nieznanej wagi/odpowiedzi."""
+    codes = _codes(answers)
+    points = np.full(len(weights), np.nan)
+    for weight, row in table.items():
+        mask = weights == weight
+        points[mask] = _table(row)[codes[mask]]
+    return points
+
+
+@on_replica
+def score_sf36(queryset=None):
+    """
+    Liczy grupy SF-36 (PF, RP, BP, GH, VT, SF, RE, MH, HT) dla wszystkich
+    kwestionariuszy z querysetu LifeQuality przy stałej liczbie zapytań.
+    """
+    if queryset is None:
+        queryset = LifeQuality.objects.all()
+    fields = [field for field, _ in DIRECT_QUESTIONS]
+    rows = sorted(queryset.values_list('pk', *fields))
+    n = len(rows)
+    columns = zip(*rows) if rows else [()] * (len(fields) + 1)
+    ids = np.array(columns[0], dtype=np.int64)
+
+    direct = {}
+    for (field, points), values in zip(DIRECT_QUESTIONS, columns[1:]):
+        direct[field] = _lookup(points, values)
+    valid = ~np.any([np.isnan(points) for points in direct.values()], axis=0)
+    q = dict((field, np.nan_to_num(points).astype(np.int64)) for field, points in direct.items())
+
+    # q3 - ograniczenia aktywności
+    position, weights, answers = _through_rows(ActivityLimit, 'activitylimit', 'limit', queryset, ids)
+    points = _lookup(ACTIVITY_LIMITS, answers)
+    bad = np.isnan(points) | ~_keyed_weights(weights)
+    _mark_invalid(valid, position, bad)
+    pf = _sum_points(position[~bad], weights[~bad], points[~bad], n)
+
+    # q4, q5 - problemy zdrowotne i emocjonalne, 5 punktów za każdą wagę
+    problems = []
+    for model, value_field in ((HealthProblem, 'healthproblem'), (EmotionalProblem, 'emotionalproblem')):
+        position, weights, _ = _through_rows(model, value_field, None, queryset, ids)
+        bad = ~_keyed_weights(weights)
+        _mark_invalid(valid, position, bad)
+        problems.append(_sum_points(position[~bad], weights[~bad], np.full((~bad).sum(), 5.0), n))
+    rp, re = problems
+
+    # q9 - objawy samopoczucia, rozdzielone na VT i MH
+    position, weights, answers = _through_rows(MoodSymptom, 'moodsymptom', 'freq', queryset, ids)
+    points = _weight_table_points(MOOD_SYMPTOMS, weights, answers)
+    bad = np.isnan(points)
+    _mark_invalid(valid, position, bad)
+    position, weights, points = _last_per_key(position[~bad], weights[~bad], points[~bad])
+    vitality = np.in1d(weights, MOOD_VT)
+    vt = np.bincount(position[vitality], weights=points[vitality], minlength=n).astype(np.int64)
+    mh = np.bincount(position[~vitality], weights=points[~vitality], minlength=n).astype(np.int64)
+
+    # q11 - samoocena stanu zdrowia
+    position, weights, answers = _through_rows(HealthSelfOpinion, 'healthselfopinion', 'state_power', queryset, ids)
+    points = _weight_table_points(HEALTH_OPINION, weights, answers)
+    bad = np.isnan(points)
+    _mark_invalid(valid, position, bad)
+    q11 = _sum_points(position[~bad], weights[~bad], points[~bad], n)
+
+    groups = {
+        'PF': pf,
+        'RP': rp,
+        'BP': q['pain_freq'] + q['pain_impact'],
+        'GH': q['health_state'] + q11,
+        'VT': vt,
+        'SF': q['problem_impact'] + q['condition_impact'],
+        'RE': re,
+        'MH': mh,
+        'HT': q['health_change'],
+    }
+    for group in SF36_GROUPS:
+        groups[group] = np.where(valid, groups[group], 0)
+    return SF36Scores(ids, groups, valid)
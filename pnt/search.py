@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Normalizacja tekstu do wyszukiwania pacjentów: nazwiska i imiona zapisywane są
+w kolumnach *_search bez wielkich liter i znaków diakrytycznych (Łódź -> lodz),
+a telefon jako same cyfry, dzięki czemu wyszukiwanie to indeksowane zapytania
+z prefiksem (LIKE 'abc%').
+"""
+import re
+import unicodedata
+
+from django.utils.encoding import force_text
+
+# litery, których NFKD nie rozkłada na literę bazową i znak diakrytyczny
+_UNDECOMPOSED = {ord(u'ł'): u'l', ord(u'đ'): u'd', ord(u'ø'): u'o', ord(u'ß'): u'ss'}
+
+_NON_DIGITS = re.compile(r'\D+')
+_COUNTRY_PREFIXES = ('0048', '48')
+_PHONE_LENGTH = 9
+
+
+def fold(text):
+    text = force_text(text or u"").lower().translate(_UNDECOMPOSED)
+    text = unicodedata.normalize('NFKD', text)
+    return u"".join(char for char in text if not unicodedata.combining(char)).strip()
+
+
+def digits(text):
+    return _NON_DIGITS.sub(u"", force_text(text or u""))
+
+
+def normalize_phone(text):
+    """Cyfry numeru bez polskiego prefiksu kraju (+48 600 100 200 -> 600100200)."""
+    number = digits(text)
+    for prefix in _COUNTRY_PREFIXES:
+        if number.startswith(prefix) and len(number) - len(prefix) == _PHONE_LENGTH:
+            return number[len(prefix):]
+    return number
+
+
+def is_numeric_term(term):
+    return bool(digits(term)) and not re.search(r'[^\d\s+()/-]', term)
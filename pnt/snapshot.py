@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Kolumnowy zrzut pomiarów liczbowych (Biochemistry, HeartEcho) do plików .npy
+czytanych przez np.load(mmap_mode='r').
+
+Każda tabela to katalog z plikiem meta.json i jednym plikiem na kolumnę:
+indeks (id, appointment_id, patient_id, date) oraz wszystkie pola FloatField.
+Wiersze posortowane są po dacie wizyty, więc filtr zakresu dat to wycinek
+(widok bez kopiowania) wyznaczony przez np.searchsorted.
+"""
+import datetime
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from django.db.models import Q
+
+from models import Biochemistry, HeartEcho
+
+
+SNAPSHOT_MODELS = (('biochemistry', Biochemistry), ('heartecho', HeartEcho))
+
+INDEX_COLUMNS = (('id', 'pk', 'int64'),
+                 ('appointment_id', 'appointment_id', 'int64'),
+                 ('patient_id', 'appointment__patient_id', 'int64'),
+                 ('date', 'appointment__date', 'datetime64[D]'))
+
+
+def float_fields(model):
+    return [field.name for field in model._meta.concrete_fields if field.get_internal_type() == 'FloatField']
+
+
+def _iter_chunks(model, lookups, chunk_size):
+    queryset = model.objects.order_by('appointment__date', 'pk')
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(Q(appointment__date__gt=last[1]) | Q(appointment__date=last[1], pk__gt=last[0]))
+        rows = list(chunk.values_list('pk', 'appointment__date', *lookups)[:chunk_size])
+        if not rows:
+            return
+        last = rows[-1][:2]
+        yield [row[2:] for row in rows]
+
+
+def _create_column(path, dtype, rows):
+    if not rows:
+        # pustego pliku nie da się zmapować
+        np.save(path, np.zeros(0, dtype=dtype))
+        return np.zeros(0, dtype=dtype)
+    return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(rows,))
+
+
+def write_table(path, model, chunk_size=5000):
+    """Zapisuje tabelę modelu do katalogu path (podmieniając go w całości), zwraca liczbę wierszy."""
+    fields = float_fields(model)
+    columns = [(name, lookup, dtype) for name, lookup, dtype in INDEX_COLUMNS] + [(name, name, 'float64') for name in fields]
+    rows = model.objects.count()
+    parent = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(parent):
+        os.makedirs(parent)
+    tmp = tempfile.mkdtemp(dir=parent)
+    arrays = [_create_column(os.path.join(tmp, '%s.npy' % name), dtype, rows) for name, _, dtype in columns]
+    written = 0
+    for chunk in _iter_chunks(model, [lookup for _, lookup, _ in columns], chunk_size):
+        chunk = chunk[:rows - written]
+        values = zip(*chunk)
+        for array, (name, _, dtype), column in zip(arrays, columns, values):
+            if dtype == 'float64':
+                column = [np.nan if value is None else value for value in column]
+            array[written:written + len(chunk)] = np.array(column, dtype=dtype)
+        written += len(chunk)
+        if written == rows:
+            break
+    for array in arrays:
+        if isinstance(array, np.memmap):
+            array.flush()
+    del arrays
+    with open(os.path.join(tmp, 'meta.json'), 'w') as meta:
+        json.dump({'model': model._meta.label, 'rows': written, 'columns': [name for name, _, _ in columns],
+                   'created': datetime.datetime.now().isoformat()}, meta)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.rename(tmp, path)
+    return written
+
+
+def write_snapshot(directory, chunk_size=5000):
+    return dict((name, write_table(os.path.join(directory, name), model, chunk_size)) for name, model in SNAPSHOT_MODELS)
+
+
+def _as_datetime64(value):
+    return np.datetime64(value.isoformat() if isinstance(value, datetime.date) else value, 'D')
+
+
+class SnapshotTable(object):
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as meta:
+            self.meta = json.load(meta)
+        self.rows = self.meta['rows']
+        self.columns = self.meta['columns']
+        self._arrays = {}
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        if name not in self._arrays:
+            if name not in self.columns:
+                raise KeyError(name)
+            mmap_mode = 'r' if self.rows else None
+            self._arrays[name] = np.load(os.path.join(self.path, '%s.npy' % name), mmap_mode=mmap_mode)[:self.rows]
+        return self._arrays[name]
+
+    def date_slice(self, date_from=None, date_to=None):
+        dates = self.column('date')
+        start = np.searchsorted(dates, _as_datetime64(date_from), 'left') if date_from else 0
+        stop = np.searchsorted(dates, _as_datetime64(date_to), 'right') if date_to else self.rows
+        return slice(start, stop)
+
+    def select(self, columns=None, date_from=None, date_to=None, appointment_ids=None, patient_ids=None):
+        """
+        Słownik kolumna -> tablica dla wierszy z zakresu dat (włącznie) i zbiorów id.
+        Sam zakres dat zwraca widoki mapowanych plików; filtr po id kopiuje wybrane wiersze.
+        """
+        rows = self.date_slice(date_from, date_to)
+        mask = None
+        for name, ids in (('appointment_id', appointment_ids), ('patient_id', patient_ids)):
+            if ids is not None:
+                selected = np.in1d(self.column(name)[rows], np.asarray(list(ids), dtype='int64'))
+                mask = selected if mask is None else mask & selected
+        result = {}
+        for name in columns or self.columns:
+            values = self.column(name)[rows]
+            result[name] = values if mask is None else values[mask]
+        return result
+
+
+class Snapshot(object):
+    def __init__(self, directory):
+        self.directory = directory
+
+    def table(self, name):
+        return SnapshotTable(os.path.join(self.directory, name))
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Podsumowanie kliniczne wizyty (SF-36, Epworth, ryzyko bezdechu, ciśnienie,
+wybrane wyniki laboratoryjne, liczba leków) z pamięcią podręczną per wizyta.
+
+Brakujące podsumowania liczone są wsadowo (kilka zapytań dla dowolnej liczby
+wizyt), a powtórne odczyty to jedno get_many() z pamięci podręcznej. Domyślnie
+jest to LRU w pamięci procesu (PNT_SUMMARY_CACHE_SIZE wpisów); ustawienie
+PNT_SUMMARY_CACHE = '<alias>' przełącza na cache Django o tej nazwie
+(np. FileBasedCache współdzielony przez procesy). Wpisy wygasają po
+PNT_SUMMARY_CACHE_TIMEOUT sekundach (domyślnie godzina) - tyle najdłużej inne
+procesy z własnym LRU mogą widzieć podsumowanie sprzed zmiany.
+
+Wpis wizyty usuwany jest przy zapisie/usunięciu wizyty lub dowolnego obiektu
+należącego do niej (sekcje, tabele pośrednie, ich obiekty podrzędne) -
+sygnały podłącza PntConfig.ready() - oraz po przeliczeniu zapisanych wyników
+(StoredScoreManager, także recompute_scores). Inne zapisy z pominięciem
+sygnałów (update(), bulk_*) muszą wywołać invalidate() same.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count
+
+from models import (Appointment, SF36Score, Apnoea, BodyPressure, Biochemistry, HipotensionChemicalTaken, OtherChemical,
+                    child_relations)
+
+
+# zmiana zawartości podsumowania wymaga zmiany wersji (klucze starych wpisów przestają pasować)
+SUMMARY_VERSION = 1
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TIMEOUT = 3600
+
+BP_FIELDS = ('systolic_left', 'systolic_right', 'diastolic_left', 'diastolic_right')
+LAB_FIELDS = ('chol', 'ldl', 'ahdl', 'tgl', 'gluc', 'crea', 'K', 'Na')
+APNOEA_FIELDS = ('epworth_points', 'epworth_band', 'apnoea_points', 'apnoea_at_risk')
+
+
+class LRUCache(object):
+    """
+    Cache w pamięci procesu z usuwaniem najdawniej używanych wpisów; interfejs
+    jak cache Django (timeout w sekundach, None - bez wygasania).
+    """
+    def __init__(self, size=DEFAULT_CACHE_SIZE):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        result = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    expires, value = self._data.pop(key)
+                    if expires is None or expires > now:
+                        self._data[key] = (expires, value)
+                        result[key] = value
+        return result
+
+    def set_many(self, mapping, timeout=None):
+        expires = time.time() + timeout if timeout is not None else None
+        with self._lock:
+            for key, value in mapping.items():
+                self._data.pop(key, None)
+                self._data[key] = (expires, value)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        alias = getattr(settings, 'PNT_SUMMARY_CACHE', None)
+        _cache = caches[alias] if alias else LRUCache(getattr(settings, 'PNT_SUMMARY_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+    return _cache
+
+
+def _key(appointment_id):
+    return 'pnt-summary:%d:%d' % (SUMMARY_VERSION, appointment_id)
+
+
+def build_summaries(appointment_ids):
+    """Podsumowania wizyt policzone z bazy (słownik id -> podsumowanie), siedem zapytań."""
+    summaries = {}
+    for pk, date in Appointment.objects.filter(pk__in=appointment_ids).values_list('pk', 'date'):
+        summary = {'appointment_id': pk, 'date': date, 'sf36_total': None, 'medications': 0, 'bp': None, 'lab': None}
+        summary.update((name, None) for name in APNOEA_FIELDS)
+        summaries[pk] = summary
+    ids = list(summaries)
+    if not ids:
+        return summaries
+    for pk, total in SF36Score.objects.filter(lifequality__appointment__in=ids).values_list('lifequality__appointment',
+                                                                                             'total'):
+        summaries[pk]['sf36_total'] = total
+    for row in Apnoea.objects.filter(appointment__in=ids).annotate_risk().values('appointment', *APNOEA_FIELDS):
+        summaries[row.pop('appointment')].update(row)
+    for key, model, fields in (('bp', BodyPressure, BP_FIELDS), ('lab', Biochemistry, LAB_FIELDS)):
+        for row in model.objects.filter(appointment__in=ids).values('appointment', *fields):
+            summaries[row.pop('appointment')][key] = row
+    for model in (HipotensionChemicalTaken, OtherChemical):
+        counts = model.objects.filter(casehistory__appointment__in=ids).values_list('casehistory__appointment')
+        for pk, count in counts.annotate(Count('pk')):
+            summaries[pk]['medications'] += count
+    return summaries
+
+
+def appointment_summaries(appointment_ids):
+    """Podsumowania wizyt (id -> podsumowanie) z pamięci podręcznej, brakujące liczone wsadowo i zapamiętywane."""
+    cache = get_cache()
+    keys = dict((_key(pk), pk) for pk in appointment_ids)
+    result = dict((keys[key], summary) for key, summary in cache.get_many(list(keys)).items())
+    missing = [pk for pk in keys.values() if pk not in result]
+    if missing:
+        built = build_summaries(missing)
+        cache.set_many(dict((_key(pk), summary) for pk, summary in built.items()),
+                       timeout=getattr(settings, 'PNT_SUMMARY_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT))
+        result.update(built)
+    return result
+
+
+def appointment_summary(appointment_id):
+    return appointment_summaries([appointment_id]).get(appointment_id)
+
+
+def invalidate(appointment_ids):
+    keys = [_key(pk) for pk in appointment_ids if pk is not None]
+    if keys:
+        get_cache().delete_many(keys)
+
+
+# --- wizyta, do której należy obiekt ---
+
+_paths = None
+
+
+def appointment_paths():
+    """Model -> lista pól od modelu do Appointment, dla wszystkich modeli zapisywanych z wizytą."""
+    global _paths
+    if _paths is not None:
+        return _paths
+    paths = {Appointment: []}
+    level = [Appointment]
+    while level:
+        next_level = []
+        for parent in level:
+            for related in child_relations(parent).values():
+                child = related.related_model
+                if child not in paths:
+                    paths[child] = [related.field.name] + paths[parent]
+                    next_level.append(child)
+        level = next_level
+    _paths = paths
+    return paths
+
+
+def appointment_id_for(instance):
+    """Id wizyty, do której należy obiekt (None dla modeli spoza wizyty lub usuniętego rodzica)."""
+    path = appointment_paths().get(type(instance))
+    if path is None:
+        return None
+    if not path:
+        return instance.pk
+    parent_id = getattr(instance, instance._meta.get_field(path[0]).attname)
+    if len(path) == 1 or parent_id is None:
+        return parent_id
+    parent = instance._meta.get_field(path[0]).related_model
+    return parent._default_manager.filter(pk=parent_id).values_list('__'.join(path[1:]), flat=True).first()
+
+
+def invalidate_instance(sender, instance, raw=False, **kwargs):
+    appointment_id = appointment_id_for(instance)
+    if appointment_id is not None:
+        invalidate([appointment_id])
+        # SF36Score po usunięciu wiersza odświeżany jest dopiero po zatwierdzeniu transakcji
+        transaction.on_commit(lambda: invalidate([appointment_id]))
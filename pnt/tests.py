@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 """
 This file demonstrates writing tests using the unittest module. These will pass
 when you run "manage.py test".
@@ -5,7 +6,66 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import math
+import os
+import shutil
+import tempfile
+from collections import deque
+from unittest import skipUnless
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin import site
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import RequestFactory, TestCase, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from admin import AppointmentAdmin, HipotensionChemicalAdmin, PNTModelAdmin, VisitSectionAdmin
+from benchmark import FixtureGenerator, run_benchmarks
+import bitmaps
+from bitmaps import BitmapIndex, IntBitmap, Term, PATIENTS
+import categories
+from categories import CategoricalChoiceField, field_group
+from cohorts import Cohort, disease, pharma_group
+from dose import parse_dose, dose_values
+import history
+from export import _csv_value, export_appointments, export_columns, iter_rows
+from importer import VisitImporter
+from indicators import INDICATORS
+import instrumentation
+from models import (Appointment, LifeQuality, Patient, Disease, HipotensionChemicalTaken, Apnoea, ApnoeaScore,
+                    BodyPressure, EpworthScale, SF36Score, SF36ScoreManager, Meal, MoodSymptom, ApnoeaRelatedDisease,
+                    ApnoeaIdentification, Biochemistry, LatestBP, HipotensionChemical)
+from pesel import decode_birth_date, decode_sex_digit
+import routers
+from rules import EPWORTH_FIELDS, SF36_GROUPS
+from scorecards import apnoea_records, lifequality_records
+from search import fold, normalize_phone, is_numeric_term
+import summary
+from summary import LRUCache, appointment_summary
+
+
+class FixtureTestCase(TestCase):
+    """Pacjenci i wizyty z FixtureGenerator(seed) tworzone raz dla klasy testów."""
+    seed = 0
+    patients = 2
+    appointments_per_patient = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        FixtureGenerator(seed=cls.seed).generate(cls.patients, cls.appointments_per_patient)
 
 
 class SimpleTest(TestCase):
@@ -14,3 +74,834 @@ class SimpleTest(TestCase):
         Tests that 1 + 1 always equals 2.
         """
         self.assertEqual(1 + 1, 2)
+
+
+class SearchNormalizationTest(SimpleTestCase):
+    def test_fold_strips_case_and_polish_diacritics(self):
+        self.assertEqual(fold(u"Łukasz Źdźbło-Ślęczek"), u"lukasz zdzblo-sleczek")
+        self.assertEqual(fold(u"  ĄĆĘŃÓŚŻ "), u"acenosz")
+
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone(u"+48 600-100-200"), u"600100200")
+        self.assertEqual(normalize_phone(u"0048600100200"), u"600100200")
+        self.assertEqual(normalize_phone(u"(22) 123 45 67"), u"221234567")
+
+    def test_numeric_terms(self):
+        self.assertTrue(is_numeric_term(u"850101"))
+        self.assertTrue(is_numeric_term(u"+48600"))
+        self.assertFalse(is_numeric_term(u"kowal"))
+
+
+class PatientSearchTest(FixtureTestCase):
+    seed = 9
+
+    def setUp(self):
+        self.patient = Patient.objects.first()
+        self.patient.first_name, self.patient.last_name = u"Łucja", u"Źródlana-Nowak"
+        self.patient.phone = u"+48 600-100-200"
+        self.patient.save()
+
+    def assertFound(self, term, found=True):
+        self.assertEqual(self.patient.pk in Patient.objects.search(term).values_list('pk', flat=True), found, term)
+
+    def test_names_ignore_case_and_diacritics(self):
+        self.assertFound(u"zrodlana")
+        self.assertFound(u"ŹRÓD")
+        self.assertFound(u"lucja zrodl")
+        self.assertFound(u"lucja kowal", found=False)
+
+    def test_spaced_phone_is_one_term(self):
+        self.assertFound(u"600 100 200")
+        self.assertFound(u"+48 600 100 200")
+        self.assertFound(u"(600) 100-2")
+        self.assertFound(u"600 200", found=False)
+
+    def test_pesel_prefix_with_name(self):
+        self.assertFound(u"%s lucja" % self.patient.pesel[:6])
+
+
+class PeselTest(SimpleTestCase):
+    def test_birth_date_for_all_centuries(self):
+        self.assertEqual(decode_birth_date('85010112345'), datetime.date(1985, 1, 1))
+        self.assertEqual(decode_birth_date('02271412345'), datetime.date(2002, 7, 14))
+        self.assertEqual(decode_birth_date('99923112345'), datetime.date(1899, 12, 31))
+        self.assertEqual(decode_birth_date('10410112345'), datetime.date(2110, 1, 1))
+        self.assertEqual(decode_birth_date('10610112345'), datetime.date(2210, 1, 1))
+
+    def test_invalid_pesel(self):
+        self.assertEqual(decode_birth_date('85023012345'), None)
+        self.assertEqual(decode_birth_date('851301'), None)
+        self.assertEqual(decode_birth_date('8501011234x'), None)
+
+    def test_sex_digit(self):
+        self.assertEqual(decode_sex_digit('85010112345'), 4)
+        self.assertEqual(decode_sex_digit(''), None)
+
+
+class DoseTest(SimpleTestCase):
+    def test_parse_dose(self):
+        self.assertEqual(parse_dose(u"1"), 1.0)
+        self.assertEqual(parse_dose(u"0,5"), 0.5)
+        self.assertEqual(parse_dose(u"1/2"), 0.5)
+        self.assertEqual(parse_dose(u"1½"), 1.5)
+        self.assertEqual(parse_dose(u"1 1/4"), 1.25)
+        self.assertEqual(parse_dose(u""), 0.0)
+        self.assertEqual(parse_dose(u"-"), 0.0)
+
+    def test_unreadable_dose(self):
+        self.assertEqual(parse_dose(u"raz"), None)
+        self.assertEqual(parse_dose(u"1/0"), None)
+        self.assertEqual(dose_values(u"1", u"x", u""), (1.0, None, 0.0, None))
+        self.assertEqual(dose_values(u"1", u"½", u"1"), (1.0, 0.5, 1.0, 2.5))
+
+
+class CategoriesTest(FixtureTestCase):
+    seed = 10
+    patients = 1
+    appointments_per_patient = 1
+
+    def test_field_group(self):
+        self.assertEqual(field_group(Patient._meta.get_field('gender')), 'gender')
+        self.assertIsNone(field_group(Meal._meta.get_field('meat_type')))
+
+    def test_admin_formfields(self):
+        model_admin = PNTModelAdmin(Meal, site)
+        restricted = model_admin.formfield_for_foreignkey(Meal._meta.get_field('ready_meal_frequency'))
+        self.assertIsInstance(restricted, CategoricalChoiceField)
+        # pole bez grupy - domyślny queryset Django ze wszystkimi wartościami
+        unrestricted = model_admin.formfield_for_foreignkey(Meal._meta.get_field('meat_type'))
+        self.assertNotIsInstance(unrestricted, CategoricalChoiceField)
+        self.assertEqual(unrestricted.queryset.count(), apps.get_model('records', 'CategoricalValue').objects.count())
+
+    def test_value_id_without_group(self):
+        meal = Meal.objects.select_related('meat_type').first()
+        field = Meal._meta.get_field('meat_type')
+        self.assertEqual(categories.value_id(field, unicode(meal.meat_type)), meal.meat_type_id)
+
+    def test_unknown_id_reloads_once(self):
+        model = apps.get_model('records', 'CategoricalValue')
+        categories.weight(model.objects.values_list('pk', flat=True).first())
+        unknown = model.objects.order_by('-pk').values_list('pk', flat=True).first() + 1000
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                with self.assertRaises(KeyError):
+                    categories.weight(unknown)
+
+    def test_reload_after_ttl(self):
+        pk = Meal.objects.values_list('meat_type', flat=True).first()
+        weight = categories.weight(pk)
+        # zmiana w innym procesie - bez sygnału w tym
+        apps.get_model('records', 'CategoricalValue').objects.filter(pk=pk).update(weight=weight + 1)
+        self.assertEqual(categories.weight(pk), weight)
+        with override_settings(PNT_CATEGORIES_TTL=0):
+            self.assertEqual(categories.weight(pk), weight + 1)
+        categories.registry.invalidate()
+
+
+class BenchmarkTest(FixtureTestCase):
+    seed = 1
+    patients = 2
+    appointments_per_patient = 2
+
+    def test_fixtures_fill_every_section(self):
+        self.assertEqual(Appointment.objects.count(), 4)
+        for data in Appointment.objects.load_bundles().values():
+            self.assertTrue(all(section is not None for section in data.values()))
+        for lifequality in LifeQuality.objects.select_related('sf36score'):
+            self.assertEqual(lifequality.get_sf36_points_sum(), lifequality.sf36score.total)
+
+    def test_bundles_query_count_does_not_grow(self):
+        ids = list(Appointment.objects.values_list('pk', flat=True))
+        for subset in (ids[:1], ids):
+            with self.assertNumQueries(1):
+                self.assertEqual(len(Appointment.objects.load_bundles(subset)), len(subset))
+            with self.assertNumQueries(1):
+                for appointment in Appointment.objects.filter(pk__in=subset).with_sections():
+                    appointment.get_data()
+
+    def test_results_are_serializable(self):
+        result = run_benchmarks(repeat=1, only=['appointment.', 'apnoea.'])
+        self.assertEqual(len(result['results']), 6)
+        json.dumps(result)
+
+
+class InstrumentationTest(TestCase):
+    def setUp(self):
+        instrumentation.reset()
+
+    @override_settings(PNT_INSTRUMENTATION=True)
+    def test_records_calls_and_queries(self):
+        for _ in range(2):
+            with instrumentation.record('patients'):
+                Patient.objects.count()
+        row = instrumentation.report()['totals'][0]
+        self.assertEqual((row['name'], row['calls'], row['queries']), ('patients', 2, 2))
+
+    @override_settings(PNT_INSTRUMENTATION=True)
+    def test_counts_past_queries_log_limit(self):
+        connection = connections['default']
+        queries_log, connection.queries_log = connection.queries_log, deque(maxlen=1)
+        try:
+            with instrumentation.record('patients'):
+                for _ in range(3):
+                    Patient.objects.count()
+        finally:
+            connection.queries_log = queries_log
+        self.assertEqual(instrumentation.report()['totals'][0]['queries'], 3)
+
+    def test_disabled_by_default(self):
+        with instrumentation.record('patients'):
+            Patient.objects.count()
+        self.assertEqual(instrumentation.report()['totals'], [])
+
+
+class SummaryCacheTest(FixtureTestCase):
+    seed = 2
+    patients = 1
+    appointments_per_patient = 1
+
+    def setUp(self):
+        summary.get_cache().clear()
+        self.appointment = Appointment.objects.get()
+
+    def test_lru_eviction(self):
+        cache = LRUCache(size=2)
+        cache.set_many({'a': 1, 'b': 2})
+        cache.get_many(['a'])
+        cache.set_many({'c': 3})
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+
+    def test_lru_timeout(self):
+        cache = LRUCache()
+        cache.set_many({'a': 1}, timeout=0)
+        cache.set_many({'b': 2}, timeout=60)
+        self.assertEqual(cache.get_many(['a', 'b']), {'b': 2})
+
+    def test_refreshed_scores_invalidate(self):
+        lifequality_id = self.appointment.lifequality.pk
+        SF36Score.objects.filter(pk=lifequality_id).update(total=-1)
+        summary.invalidate([self.appointment.pk])
+        appointment_summary(self.appointment.pk)
+        SF36Score.objects.refresh([lifequality_id])
+        self.assertEqual(appointment_summary(self.appointment.pk),
+                         summary.build_summaries([self.appointment.pk])[self.appointment.pk])
+
+    def test_repeat_lookup_and_invalidation(self):
+        appointment_summary(self.appointment.pk)
+        with self.assertNumQueries(0):
+            appointment_summary(self.appointment.pk)
+        pressure = self.appointment.bodypressure
+        pressure.systolic_left = 201
+        pressure.save()
+        self.assertEqual(appointment_summary(self.appointment.pk)['bp']['systolic_left'], 201)
+
+    def test_through_row_resolves_appointment(self):
+        appointment_summary(self.appointment.pk)
+        self.appointment.casehistory.hipotensionchemicaltaken_set.all().delete()
+        self.appointment.casehistory.other_chemicals.all().delete()
+        self.assertEqual(appointment_summary(self.appointment.pk)['medications'], 0)
+
+
+class CohortTest(FixtureTestCase):
+    seed = 3
+    patients = 6
+    appointments_per_patient = 2
+
+    def test_matches_python_filtering(self):
+        row = Disease.objects.select_related('casehistory__appointment').first()
+        taken = HipotensionChemicalTaken.objects.select_related('hipotension_chemical').first()
+        with_disease = set(Disease.objects.filter(disease=row.disease_id)
+                           .values_list('casehistory__appointment__patient', flat=True))
+        with_group = set(HipotensionChemicalTaken.objects
+                         .filter(hipotension_chemical__pharma_group=taken.hipotension_chemical.pharma_group_id)
+                         .values_list('casehistory__appointment__patient', flat=True))
+        cohort = Cohort(disease(row.disease_id) & ~pharma_group(taken.hipotension_chemical.pharma_group_id))
+        with self.assertNumQueries(1):
+            patients = set(cohort.patients().values_list('pk', flat=True))
+        self.assertEqual(patients, with_disease - with_group)
+        self.assertIn(row.casehistory.appointment_id,
+                      Cohort(disease(row.disease_id)).appointments().values_list('pk', flat=True))
+
+
+class BitmapIndexTest(FixtureTestCase):
+    seed = 4
+    patients = 5
+    appointments_per_patient = 2
+
+    def setUp(self):
+        self.index = BitmapIndex().build()
+
+    def test_int_bitmap(self):
+        bitmap = IntBitmap([3, 700, 5])
+        bitmap.add(9)
+        bitmap.discard(5)
+        self.assertEqual(list(bitmap), [3, 9, 700])
+        self.assertEqual(list(bitmap - IntBitmap([9]) | IntBitmap([1])), [1, 3, 700])
+
+    def test_counts_match_cohorts(self):
+        taken = Disease.objects.first()
+        query = ~Term(Disease, 'disease', taken.disease_id)
+        expected = Cohort(~disease(taken.disease_id)).patients().values_list('pk', flat=True)
+        self.assertEqual(self.index.ids(query, PATIENTS), sorted(expected))
+
+    def test_refresh_after_delete(self):
+        row = Disease.objects.select_related('casehistory').first()
+        term = Term(Disease, 'disease', row.disease_id)
+        self.assertIn(row.casehistory.appointment_id, self.index.ids(term))
+        row.delete()
+        self.index.refresh(Disease, row.casehistory.appointment_id)
+        self.assertNotIn(row.casehistory.appointment_id, self.index.ids(term))
+
+    def test_results_are_copies(self):
+        term = Term(Disease, 'disease', Disease.objects.first().disease_id)
+        ids = self.index.ids(term)
+        result = self.index.evaluate(term)
+        result.discard(ids[0])
+        self.index.bitmap(term.key).discard(ids[-1])
+        self.assertEqual(self.index.ids(term), ids)
+
+    def test_moved_appointment_refreshes_both_patients(self):
+        bitmaps.reset_index()
+        self.addCleanup(bitmaps.reset_index)
+        index = bitmaps.get_index()
+        row = Disease.objects.select_related('casehistory__appointment').first()
+        appointment = row.casehistory.appointment
+        appointment.patient = Patient.objects.exclude(pk=appointment.patient_id).first()
+        appointment.save()
+        term = Term(Disease, 'disease', row.disease_id)
+        expected = Cohort(disease(row.disease_id)).patients().values_list('pk', flat=True)
+        self.assertIn(appointment.patient_id, index.ids(term, PATIENTS))
+        self.assertEqual(index.ids(term, PATIENTS), sorted(expected))
+
+    def test_load_checks_watermark(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'bitmaps.pickle')
+        self.index.save(path)
+        loaded = BitmapIndex.load(path)
+        self.assertEqual(loaded.keys(), self.index.keys())
+        Disease.objects.filter(pk=Disease.objects.first().pk).delete()
+        self.assertIsNone(BitmapIndex.load(path))
+
+
+class RecomputeScoresTest(FixtureTestCase):
+    seed = 5
+    patients = 3
+    appointments_per_patient = 2
+
+    def test_scores_match_instance_methods(self):
+        EpworthScale.objects.filter(apnoea=Apnoea.objects.first()).delete()
+        ApnoeaScore.objects.all().delete()
+        SF36Score.objects.all().delete()
+        call_command('recompute_scores', workers=1, chunk_size=2, stdout=io.StringIO())
+        expected = [(apnoea.pk, apnoea.get_epworth_points(), apnoea.get_epworth_scale(), apnoea.get_apnoea_points(),
+                     apnoea.has_apnoea_suggestions(), apnoea.at_apnoea_risk()) for apnoea in Apnoea.objects.all()]
+        scores = ApnoeaScore.objects.values_list('apnoea', 'epworth_points', 'epworth_band', 'apnoea_points',
+                                                 'has_suggestions', 'at_risk')
+        self.assertEqual(sorted(scores), sorted(expected))
+        totals = dict(SF36Score.objects.values_list('lifequality', 'total'))
+        self.assertEqual(totals, dict((lifequality.pk, lifequality.get_sf36_points_sum())
+                                      for lifequality in LifeQuality.objects.all()))
+
+
+class StoredScoreSignalsTest(TransactionTestCase):
+    def setUp(self):
+        FixtureGenerator(seed=11).generate(1, 1)
+        self.lifequality = LifeQuality.objects.get()
+        self.calls = []
+        refresh = SF36ScoreManager.refresh
+
+        def counting_refresh(manager, ids):
+            self.calls.append(sorted(ids))
+            return refresh(manager, ids)
+        SF36ScoreManager.refresh = counting_refresh
+        self.addCleanup(setattr, SF36ScoreManager, 'refresh', refresh)
+
+    def assertScoreCurrent(self):
+        lifequality = LifeQuality.objects.get()
+        self.assertEqual(SF36Score.objects.get(pk=lifequality.pk).total, lifequality.get_sf36_points_sum())
+
+    def test_save_refreshes_once_per_transaction(self):
+        with transaction.atomic():
+            for row in self.lifequality.moodsymptom_set.all():
+                row.freq = 'a'
+                row.save()
+            self.lifequality.save()
+        self.assertEqual(self.calls, [[self.lifequality.pk]])
+        self.assertScoreCurrent()
+
+    def test_delete_refreshes(self):
+        self.lifequality.moodsymptom_set.all().delete()
+        self.assertEqual(self.calls, [[self.lifequality.pk]])
+        self.assertScoreCurrent()
+
+
+class IndicatorTest(FixtureTestCase):
+    seed = 6
+    patients = 3
+    appointments_per_patient = 2
+
+    def test_stored_columns_match_expressions(self):
+        stored = Appointment.objects.with_indicators().values_list('pk', *INDICATORS)
+        computed = Appointment.objects.with_indicators(computed=True).values_list('pk', *INDICATORS)
+        for row, expected in zip(sorted(stored), sorted(computed)):
+            for value, expected_value in zip(row, expected):
+                self.assertAlmostEqual(value, expected_value)
+
+    def test_threshold_query(self):
+        pressure = BodyPressure.objects.first()
+        pressure.systolic_left, pressure.systolic_right = 180, 150
+        pressure.diastolic_left = pressure.diastolic_right = 105
+        pressure.save()
+        self.assertEqual(pressure.mean_arterial_pressure, 127.5)
+        appointments = Appointment.objects.with_indicators().filter(mean_arterial_pressure__gt=110,
+                                                                    inter_arm_difference__gte=30)
+        self.assertIn(pressure.appointment_id, appointments.values_list('pk', flat=True))
+
+
+class TimelineTest(FixtureTestCase):
+    seed = 7
+    patients = 2
+    appointments_per_patient = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TimelineTest, cls).setUpTestData()
+        first = Appointment.objects.all()[0]
+        Appointment.objects.filter(pk=first.pk).update(time=None)
+        Appointment.objects.create(patient=first.patient, date=first.date, time=None)
+
+    def walk(self, **kwargs):
+        ids, page = [], Appointment.objects.timeline(per_page=3, **kwargs)
+        while True:
+            ids.extend(obj.pk for obj in page)
+            if not page.has_next():
+                return ids, page
+            page = Appointment.objects.timeline(per_page=3, after=page.next_cursor, **kwargs)
+
+    def test_pages_cover_ordered_visits(self):
+        visits = sorted(Appointment.objects.all(), key=lambda obj: (obj.date, obj.time or datetime.time.max, obj.pk),
+                        reverse=True)
+        ids, last = self.walk()
+        self.assertEqual(ids, [obj.pk for obj in visits])
+        previous = Appointment.objects.timeline(per_page=3, before=last.previous_cursor)
+        self.assertEqual([obj.pk for obj in previous], ids[-len(last) - 3:-len(last)])
+
+    def test_patient_timeline(self):
+        patient = Patient.objects.first()
+        ids, _ = self.walk(patient=patient)
+        self.assertEqual(sorted(ids), sorted(patient.appointments.values_list('pk', flat=True)))
+
+    def changelist(self, **params):
+        model_admin = AppointmentAdmin(Appointment, site)
+        model_admin.list_per_page = 3
+        request = RequestFactory().get('/', params)
+        request.user = self.user
+        return model_admin.changelist_view(request).context_data['cl']
+
+    def test_changelist_pages_by_cursor(self):
+        self.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin')
+        expected, _ = self.walk()
+        ids, cl = [], self.changelist()
+        while True:
+            ids.extend(obj.pk for obj in cl.result_list)
+            if not cl.keyset_page.has_next():
+                break
+            cl = self.changelist(after=cl.keyset_page.next_cursor)
+        self.assertEqual(ids, expected)
+        self.assertIsNone(self.changelist(o='2').keyset_page)
+
+
+class ChangelistQueriesTest(FixtureTestCase):
+    seed = 8
+    patients = 3
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin')
+
+    def queries(self, model_admin, per_page):
+        model_admin.list_per_page = per_page
+        request = RequestFactory().get('/')
+        request.user = self.user
+        with CaptureQueriesContext(connections['default']) as context:
+            model_admin.changelist_view(request).render()
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        for model, admin_class in ((BodyPressure, VisitSectionAdmin), (HipotensionChemical, HipotensionChemicalAdmin)):
+            count = model.objects.count()
+            self.assertGreater(count, 2)
+            self.assertEqual(self.queries(admin_class(model, site), 2), self.queries(admin_class(model, site), count))
+
+
+@override_settings(PNT_REPLICA_DB='replica')
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        routers.finish()
+        self.router = routers.ReplicaRouter()
+
+    def tearDown(self):
+        routers.finish()
+
+    def test_reads_in_replica_block(self):
+        self.assertIsNone(self.router.db_for_read(Patient))
+        with routers.use_replica():
+            self.assertEqual(self.router.db_for_read(Patient), 'replica')
+            with routers.force_primary():
+                self.assertIsNone(self.router.db_for_read(Patient))
+
+    def test_routing_write_is_not_a_write(self):
+        self.assertIsNone(self.router.db_for_write(Patient))
+        with routers.use_replica():
+            self.assertEqual(self.router.db_for_read(Patient), 'replica')
+
+    def test_primary_after_write_in_request(self):
+        routers.reset()
+        routers.written()
+        with routers.use_replica():
+            self.assertIsNone(self.router.db_for_read(Patient))
+        with routers.use_replica():
+            self.assertIsNone(self.router.db_for_read(Patient))
+        routers.reset()
+        with routers.use_replica():
+            self.assertEqual(self.router.db_for_read(Patient), 'replica')
+
+    def test_primary_after_write_until_finish(self):
+        with routers.use_replica():
+            routers.written()
+            self.assertIsNone(self.router.db_for_read(Patient))
+        with routers.use_replica():
+            self.assertIsNone(self.router.db_for_read(Patient))
+        routers.finish()
+        with routers.use_replica():
+            self.assertEqual(self.router.db_for_read(Patient), 'replica')
+
+
+@skipUnless('replica' in settings.DATABASES, u"Wymaga aliasu 'replica' w DATABASES (TEST MIRROR lub osobny plik).")
+@override_settings(PNT_REPLICA_DB='replica', DATABASE_ROUTERS=['pnt.routers.ReplicaRouter'])
+class ReplicaQueryTest(TestCase):
+    multi_db = True
+
+    def setUp(self):
+        routers.finish()
+
+    def capture(self):
+        return CaptureQueriesContext(connections['default']), CaptureQueriesContext(connections['replica'])
+
+    def test_export_reads_replica(self):
+        primary, replica = self.capture()
+        with primary, replica, tempfile.NamedTemporaryFile(suffix='.csv') as output:
+            export_appointments(output.name)
+        self.assertTrue(replica.captured_queries)
+        self.assertFalse(primary.captured_queries)
+
+    def test_cohort_evaluated_in_replica_block(self):
+        cohort = Cohort(disease(1)).patients()
+        primary, replica = self.capture()
+        with primary, replica:
+            with routers.use_replica():
+                list(cohort)
+        self.assertEqual((len(primary.captured_queries), len(replica.captured_queries)), (0, 1))
+        with primary, replica:
+            list(cohort.all())
+        self.assertEqual((len(primary.captured_queries), len(replica.captured_queries)), (1, 0))
+
+
+class ScorecardTest(FixtureTestCase):
+    seed = 8
+    patients = 3
+    appointments_per_patient = 2
+
+    def test_records_match_models(self):
+        records = dict((record.pk, record) for record in apnoea_records())
+        for apnoea in Apnoea.objects.all():
+            record = records[apnoea.pk]
+            self.assertEqual(record.epworth_points(), apnoea.get_epworth_points())
+            self.assertEqual(record.apnoea_points(), apnoea.get_apnoea_points())
+            self.assertEqual(record.at_apnoea_risk(), apnoea.at_apnoea_risk())
+        lifequality_records()  # wczytuje rejestr categories
+        with self.assertNumQueries(6):
+            records = dict((record.pk, record) for record in lifequality_records())
+        for lifequality in LifeQuality.objects.all():
+            self.assertEqual(records[lifequality.pk].sf36_groups(), lifequality.get_sf36_groups())
+
+
+class ScoreSF36Test(FixtureTestCase):
+    seed = 12
+    patients = 3
+    appointments_per_patient = 2
+
+    def test_matches_instance_methods(self):
+        from scoring import score_sf36
+        first, second = LifeQuality.objects.order_by('pk')[:2]
+        # nieprawidłowe odpowiedzi - get_sf36_groups() rzuca wyjątek, score_sf36() oznacza kwestionariusz
+        LifeQuality.objects.filter(pk=first.pk).update(health_state='')
+        MoodSymptom.objects.filter(pk=second.moodsymptom_set.first().pk).update(freq='z')
+        scores = score_sf36()
+        lifequalities = list(LifeQuality.objects.order_by('pk'))
+        self.assertEqual(list(scores.ids), [lifequality.pk for lifequality in lifequalities])
+        for i, lifequality in enumerate(lifequalities):
+            try:
+                groups = lifequality.get_sf36_groups()
+            except KeyError:
+                self.assertFalse(scores.valid[i], lifequality.pk)
+            else:
+                self.assertTrue(scores.valid[i], lifequality.pk)
+                self.assertEqual(dict((group, int(scores.groups[group][i])) for group in SF36_GROUPS), groups)
+        self.assertEqual(list(scores.valid).count(False), 2)
+
+
+class AnnotateRiskTest(FixtureTestCase):
+    seed = 13
+    patients = 3
+    appointments_per_patient = 2
+
+    def test_matches_instance_methods(self):
+        first, second, third = Apnoea.objects.order_by('pk')[:3]
+        # brak skali Epworth, brak objawów/schorzeń sugerujących bezdech, najniższy przedział Epworth
+        EpworthScale.objects.filter(apnoea=first).delete()
+        ApnoeaRelatedDisease.objects.filter(apnoea=second).delete()
+        ApnoeaIdentification.objects.filter(apnoea=second).delete()
+        EpworthScale.objects.filter(apnoea=third).update(**dict.fromkeys(EPWORTH_FIELDS, '1'))
+        annotated = dict((apnoea.pk, apnoea) for apnoea in Apnoea.objects.annotate_risk())
+        for apnoea in Apnoea.objects.all():
+            row = annotated[apnoea.pk]
+            self.assertEqual((row.epworth_points, row.epworth_band, row.apnoea_points, row.apnoea_suggestions,
+                              row.apnoea_risk_limit, row.apnoea_at_risk),
+                             (apnoea.get_epworth_points(), apnoea.get_epworth_scale(), apnoea.get_apnoea_points(),
+                              apnoea.has_apnoea_suggestions(), apnoea.get_apnoea_risk_limit(), apnoea.at_apnoea_risk()))
+        self.assertIsNone(annotated[first.pk].epworth_points)
+        self.assertFalse(annotated[second.pk].apnoea_suggestions)
+        self.assertEqual(annotated[third.pk].epworth_band, 1)
+
+
+class ExportTest(FixtureTestCase):
+    seed = 17
+    patients = 2
+    appointments_per_patient = 3
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.columns, _ = export_columns()
+        self.rows = [row for rows in iter_rows() for row in rows]
+
+    def test_chunks_cover_every_appointment(self):
+        self.assertEqual([row[0] for row in self.rows], list(Appointment.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual([row for rows in iter_rows(chunk_size=4) for row in rows], self.rows)
+
+    def test_csv_round_trip(self):
+        path = os.path.join(self.directory, 'export.csv')
+        self.assertEqual(export_appointments(path, 'csv', chunk_size=4), len(self.rows))
+        with open(path, 'rb') as stream:
+            lines = list(csv.reader(stream))
+        self.assertEqual(lines[0], [column.name.encode('utf-8') for column in self.columns])
+        self.assertEqual(lines[1:], [[_csv_value(value) for value in row] for row in self.rows])
+
+    @skipUnless(pyarrow, u"Eksport do Parquet wymaga pyarrow.")
+    def test_parquet_round_trip(self):
+        path = os.path.join(self.directory, 'export.parquet')
+        self.assertEqual(export_appointments(path, 'parquet', chunk_size=4), len(self.rows))
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.schema.names, [column.name for column in self.columns])
+        for i, column in enumerate(self.columns):
+            self.assertEqual(table.column(column.name).to_pylist(), [row[i] for row in self.rows], column.name)
+
+
+class SnapshotTest(FixtureTestCase):
+    seed = 18
+    patients = 2
+    appointments_per_patient = 3
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_columns_match_database(self):
+        from snapshot import Snapshot, float_fields, write_snapshot
+        fields = float_fields(Biochemistry)
+        rows = list(Biochemistry.objects.order_by('appointment__date', 'pk')
+                    .values_list('pk', 'appointment__patient_id', 'appointment__date', *fields))
+        self.assertEqual(write_snapshot(self.directory, chunk_size=2)['biochemistry'], len(rows))
+        table = Snapshot(self.directory).table('biochemistry')
+        self.assertEqual(len(table), len(rows))
+        self.assertEqual(table.column('id').tolist(), [row[0] for row in rows])
+        self.assertEqual(table.column('date').tolist(), [row[2] for row in rows])
+        for i, name in enumerate(fields, 3):
+            values = [None if math.isnan(value) else value for value in table.column(name).tolist()]
+            self.assertEqual(values, [row[i] for row in rows], name)
+
+    def test_select_by_dates_and_patients(self):
+        from snapshot import Snapshot, write_snapshot
+        write_snapshot(self.directory)
+        table = Snapshot(self.directory).table('biochemistry')
+        rows = list(Biochemistry.objects.order_by('appointment__date', 'pk')
+                    .values_list('pk', 'appointment__patient_id', 'appointment__date'))
+        middle = rows[len(rows) // 2][2]
+        self.assertEqual(table.select(['id'], date_from=middle)['id'].tolist(),
+                         [pk for pk, _, date in rows if date >= middle])
+        patient_id = rows[0][1]
+        self.assertEqual(table.select(['id'], date_to=middle, patient_ids=[patient_id])['id'].tolist(),
+                         [pk for pk, patient, date in rows if date <= middle and patient == patient_id])
+
+
+class TrajectoryTest(FixtureTestCase):
+    seed = 19
+    patients = 3
+    appointments_per_patient = 3
+
+    def measurements(self):
+        """Pacjent -> lista (SBP, DBP, różnica SBP między ramionami) z obu źródeł pomiarów."""
+        result = {}
+        for pressure in BodyPressure.objects.select_related('appointment'):
+            result.setdefault(pressure.appointment.patient_id, []).append(
+                ((pressure.systolic_left + pressure.systolic_right) / 2.0,
+                 (pressure.diastolic_left + pressure.diastolic_right) / 2.0,
+                 abs(pressure.systolic_left - pressure.systolic_right)))
+        for latest in LatestBP.objects.select_related('casehistory__appointment'):
+            result.setdefault(latest.casehistory.appointment.patient_id, []).append((latest.sbp, latest.dbp, None))
+        return result
+
+    def test_summary_matches_measurements(self):
+        from trajectory import bp_series
+        measurements = self.measurements()
+        summary = bp_series().summary()
+        self.assertEqual(summary['patient_id'].tolist(), sorted(measurements))
+        for i, patient_id in enumerate(summary['patient_id'].tolist()):
+            rows = measurements[patient_id]
+            self.assertEqual(summary['count'][i], len(rows))
+            self.assertAlmostEqual(summary['mean_sbp'][i], sum(row[0] for row in rows) / float(len(rows)))
+            self.assertAlmostEqual(summary['mean_dbp'][i], sum(row[1] for row in rows) / float(len(rows)))
+            self.assertAlmostEqual(summary['max_interarm_difference'][i], max(row[2] for row in rows if row[2] is not None))
+
+    def test_uncontrolled_patients(self):
+        from trajectory import bp_series, uncontrolled_patients
+        high, normal = Patient.objects.order_by('pk')[:2]
+        for patient, sbp, dbp in ((high, 150, 95), (normal, 120, 80)):
+            BodyPressure.objects.filter(appointment__patient=patient).update(
+                systolic_left=sbp, systolic_right=sbp, diastolic_left=dbp, diastolic_right=dbp)
+            LatestBP.objects.filter(casehistory__appointment__patient=patient).update(sbp=sbp, dbp=dbp)
+        uncontrolled = uncontrolled_patients([high.pk, normal.pk])
+        self.assertEqual(uncontrolled, [high.pk])
+        summary = bp_series([high.pk]).summary()
+        self.assertEqual((summary['last_sbp'].tolist(), summary['last_dbp'].tolist()), ([150], [95]))
+        self.assertAlmostEqual(summary['sbp_slope'][0], 0)
+
+
+class BulkHistoryTest(FixtureTestCase):
+    seed = 20
+    patients = 3
+    appointments_per_patient = 1
+
+    def test_bulk_create_writes_history(self):
+        # pacjenci fixture'a zapisywani są przez bulk_create_with_history()
+        rows = history.historical_model(Patient).objects.values_list('id', 'pesel', 'phone_search', 'history_type')
+        self.assertEqual(sorted(rows), sorted((pk, pesel, phone_search, history.HISTORY_CREATED)
+                                              for pk, pesel, phone_search in Patient.objects.values_list(
+                                                  'pk', 'pesel', 'phone_search')))
+
+    def test_bulk_update_writes_history(self):
+        patients = list(Patient.objects.order_by('pk'))
+        for patient in patients:
+            patient.last_name = u"Żółkiewska"
+        self.assertEqual(history.bulk_update_with_history(patients, ['last_name']), len(patients))
+        self.assertEqual(Patient.objects.filter(last_name_search=fold(u"Żółkiewska")).count(), len(patients))
+        changed = history.historical_model(Patient).objects.filter(history_type=history.HISTORY_CHANGED)
+        self.assertEqual(sorted(changed.values_list('id', 'last_name', 'last_name_search')),
+                         [(patient.pk, u"Żółkiewska", fold(u"Żółkiewska")) for patient in patients])
+
+
+class AsOfTest(FixtureTestCase):
+    seed = 21
+    patients = 3
+    appointments_per_patient = 1
+
+    def setUp(self):
+        now = timezone.now()
+        self.created, self.changed, self.deleted = [now - datetime.timedelta(days=days) for days in (3, 2, 1)]
+        records = history.historical_model(Patient).objects
+        self.patients = list(Patient.objects.order_by('pk'))
+        self.names = dict((patient.pk, patient.last_name) for patient in self.patients)
+        records.update(history_date=self.created)
+        changed, self.removed = self.patients[0], self.patients[1]
+        changed.last_name = u"Nowak-Kowalska"
+        history.bulk_update_with_history([changed], ['last_name'])
+        records.filter(history_type=history.HISTORY_CHANGED).update(history_date=self.changed)
+        history.bulk_create_history(Patient, [self.removed], history.HISTORY_DELETED)
+        records.filter(history_type=history.HISTORY_DELETED).update(history_date=self.deleted)
+
+    def test_as_of(self):
+        changed = self.patients[0]
+        hour = datetime.timedelta(hours=1)
+        self.assertIsNone(history.as_of(Patient, changed.pk, self.created - hour))
+        self.assertEqual(history.as_of(Patient, changed.pk, self.created + hour).last_name, self.names[changed.pk])
+        self.assertEqual(history.as_of(Patient, changed.pk, self.changed).last_name, u"Nowak-Kowalska")
+        self.assertIsNotNone(history.as_of(Patient, self.removed.pk, self.changed))
+        self.assertIsNone(history.as_of(Patient, self.removed.pk, self.deleted))
+
+    def test_snapshot_as_of(self):
+        hour = datetime.timedelta(hours=1)
+        before = history.snapshot_as_of(Patient, self.created + hour).values_list('id', 'last_name')
+        self.assertEqual(sorted(before), sorted(self.names.items()))
+        after = dict(history.snapshot_as_of(Patient, self.deleted + hour).values_list('id', 'last_name'))
+        expected = dict(self.names)
+        expected[self.patients[0].pk] = u"Nowak-Kowalska"
+        del expected[self.removed.pk]
+        self.assertEqual(after, expected)
+        self.assertEqual(history.snapshot_as_of(Patient, self.created - hour).count(), 0)
+
+
+class ImporterTest(FixtureTestCase):
+    seed = 22
+    patients = 1
+    appointments_per_patient = 0
+
+    def setUp(self):
+        self.patient = Patient.objects.get()
+        pressure = {'systolic_left': 150, 'systolic_right': 140, 'diastolic_left': 90, 'diastolic_right': 80}
+        visit = lambda day, **sections: json.dumps({'pesel': self.patient.pesel, 'date': '2012-03-%02d' % day,
+                                                    'sections': sections})
+        self.lines = [
+            visit(1, bodypressure=pressure),
+            json.dumps({'pesel': '00000000000', 'date': '2012-03-02'}),
+            '{',
+            visit(4, bodypressure=dict(pressure, systolic_left='abc')),
+            visit(5, bodypressure=pressure),
+        ]
+        self.checkpoints, self.errors = [], {}
+
+    def run_import(self, lines, start_line=0):
+        return VisitImporter(chunk_size=2).run(lines, start_line, self.checkpoints.append,
+                                               lambda line, messages: self.errors.__setitem__(line, messages))
+
+    def test_reports_rejected_rows(self):
+        self.assertEqual(self.run_import(self.lines), (2, 3))
+        self.assertEqual(sorted(self.errors), [2, 3, 4])
+        self.assertEqual(list(self.errors[2]), ['pesel'])
+        self.assertEqual(list(self.errors[3]), ['json'])
+        self.assertEqual([key.rsplit('.', 1)[-1] for key in self.errors[4]], ['systolic_left'])
+        self.assertEqual(self.checkpoints, [2, 5])
+        pressures = BodyPressure.objects.filter(appointment__patient=self.patient)
+        self.assertEqual(sorted(pressures.values_list('appointment__date', 'mean_arterial_pressure')),
+                         [(datetime.date(2012, 3, day), (150 + 140 + 2 * (90 + 80)) / 6.0) for day in (1, 5)])
+
+    def test_resume_from_checkpoint(self):
+        self.run_import(self.lines[:2])
+        self.assertEqual(self.checkpoints, [2])
+        self.assertEqual(self.run_import(self.lines, start_line=self.checkpoints[-1]), (1, 2))
+        self.assertEqual(sorted(self.errors), [2, 3, 4])
+        self.assertEqual(sorted(self.patient.appointments.values_list('date', flat=True)),
+                         [datetime.date(2012, 3, 1), datetime.date(2012, 3, 5)])
+
+
+class ImporterCommitTest(TransactionTestCase):
+    def test_commit_resets_bitmap_index(self):
+        FixtureGenerator(seed=23).generate(1, 0)
+        self.addCleanup(bitmaps.reset_index)
+        index = bitmaps.get_index()
+        pressure = {'systolic_left': 150, 'systolic_right': 140, 'diastolic_left': 90, 'diastolic_right': 80}
+        line = json.dumps({'pesel': Patient.objects.get().pesel, 'date': '2012-03-01',
+                           'sections': {'bodypressure': pressure}})
+        self.assertEqual(VisitImporter().run([line]), (1, 0))
+        self.assertIsNot(bitmaps.get_index(), index)
+        self.assertEqual(bitmaps.get_index().ids(~Term(Disease, 'disease', 0)), [Appointment.objects.get().pk])
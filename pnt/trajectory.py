@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Przebieg ciśnienia tętniczego pacjentów w czasie.
+
+Łączy pomiary BodyPressure (oba ramiona, data wizyty) i LatestBP z historii
+choroby (bez podziału na ramiona, data wizyty z historią choroby) w jednym
+zapytaniu UNION ALL posortowanym po pacjencie i dacie, a statystyki na
+pacjenta (średnie, MAP, nachylenie trendu, różnica między ramionami) liczy
+wektorowo w NumPy.
+"""
+import numpy as np
+from django.db.models import F, Value, FloatField, CharField
+
+from models import BodyPressure, LatestBP
+
+
+# progi nadciśnienia niekontrolowanego w pomiarze gabinetowym [mmHg]
+SBP_LIMIT = 140
+DBP_LIMIT = 90
+
+_COLUMNS = ('bp_patient', 'bp_date', 'bp_sbp_left', 'bp_sbp_right', 'bp_dbp_left', 'bp_dbp_right', 'bp_source')
+
+
+def _annotated(queryset, expressions):
+    # pojedynczo i w stałej kolejności - obie części UNION muszą mieć te same kolumny
+    for name, expression in zip(_COLUMNS, expressions):
+        queryset = queryset.annotate(**{name: expression})
+    return queryset.values_list(*_COLUMNS)
+
+
+def bp_rows(patient_ids=None):
+    """Queryset (UNION ALL) krotek _COLUMNS posortowany po pacjencie i dacie."""
+    missing = Value(None, output_field=FloatField())
+    pressures = BodyPressure.objects.all()
+    latest = LatestBP.objects.all()
+    if patient_ids is not None:
+        pressures = pressures.filter(appointment__patient__in=patient_ids)
+        latest = latest.filter(casehistory__appointment__patient__in=patient_ids)
+    pressures = _annotated(pressures, (F('appointment__patient_id'), F('appointment__date'),
+                                       F('systolic_left'), F('systolic_right'),
+                                       F('diastolic_left'), F('diastolic_right'),
+                                       Value('bodypressure', output_field=CharField())))
+    latest = _annotated(latest, (F('casehistory__appointment__patient_id'), F('casehistory__appointment__date'),
+                                 F('sbp'), missing, F('dbp'), missing,
+                                 Value('latestbp', output_field=CharField())))
+    return pressures.union(latest, all=True).order_by('bp_patient', 'bp_date')
+
+
+def _mean_arms(left, right):
+    return np.where(np.isnan(right), left, (left + right) / 2.0)
+
+
+class BPSeries(object):
+    """
+    Wszystkie pomiary wybranych pacjentów jako tablice posortowane po (pacjent, data).
+    Dla pomiaru obu ramion sbp/dbp to średnia z ramion.
+    """
+    def __init__(self, rows):
+        columns = zip(*rows) if rows else [()] * len(_COLUMNS)
+        floats = lambda values: np.array([np.nan if value is None else value for value in values], dtype=float)
+        self.patient_ids = np.array(columns[0], dtype=np.int64)
+        self.dates = np.array(columns[1], dtype='datetime64[D]')
+        self.sbp_left, self.sbp_right = floats(columns[2]), floats(columns[3])
+        self.dbp_left, self.dbp_right = floats(columns[4]), floats(columns[5])
+        self.sources = np.array(columns[6], dtype=object)
+        self.sbp = _mean_arms(self.sbp_left, self.sbp_right)
+        self.dbp = _mean_arms(self.dbp_left, self.dbp_right)
+
+    def __len__(self):
+        return len(self.patient_ids)
+
+    @property
+    def mean_arterial_pressure(self):
+        return self.dbp + (self.sbp - self.dbp) / 3.0
+
+    @property
+    def interarm_difference(self):
+        return np.abs(self.sbp_left - self.sbp_right)
+
+    def summary(self):
+        """
+        Statystyki na pacjenta (słownik nazwa -> tablica, w kolejności patient_id):
+        liczba pomiarów, średnie SBP/DBP/MAP, nachylenie SBP [mmHg/rok],
+        maksymalna różnica SBP między ramionami, ostatni pomiar i flaga
+        nadciśnienia niekontrolowanego (ostatni pomiar >= SBP_LIMIT/DBP_LIMIT).
+        """
+        patient_ids, starts, counts = np.unique(self.patient_ids, return_index=True, return_counts=True)
+        if not len(patient_ids):
+            return {'patient_id': patient_ids}
+        n = counts.astype(float)
+        years = (self.dates - self.dates.min()).astype(float) / 365.25
+
+        def group_sum(values):
+            return np.add.reduceat(values, starts)
+
+        sx, sy = group_sum(years), group_sum(self.sbp)
+        sxx, sxy = group_sum(years * years), group_sum(years * self.sbp)
+        denominator = n * sxx - sx * sx
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = np.where(denominator > 0, (n * sxy - sx * sy) / denominator, np.nan)
+            interarm = np.fmax.reduceat(self.interarm_difference, starts)
+        last = starts + counts - 1
+        last_sbp, last_dbp = self.sbp[last], self.dbp[last]
+        return {
+            'patient_id': patient_ids,
+            'count': counts,
+            'mean_sbp': sy / n,
+            'mean_dbp': group_sum(self.dbp) / n,
+            'mean_map': group_sum(self.mean_arterial_pressure) / n,
+            'sbp_slope': slope,
+            'max_interarm_difference': interarm,
+            'last_date': self.dates[last],
+            'last_sbp': last_sbp,
+            'last_dbp': last_dbp,
+            'uncontrolled': (last_sbp >= SBP_LIMIT) | (last_dbp >= DBP_LIMIT),
+        }
+
+
+def bp_series(patient_ids=None):
+    return BPSeries(list(bp_rows(patient_ids)))
+
+
+def uncontrolled_patients(patient_ids=None):
+    """Id pacjentów, których ostatni pomiar przekracza SBP_LIMIT lub DBP_LIMIT."""
+    summary = bp_series(patient_ids).summary()
+    if 'uncontrolled' not in summary:
+        return []
+    return summary['patient_id'][summary['uncontrolled']].tolist()
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from django.conf.urls import url
+
+import views
+
+
+urlpatterns = [
+    url(r'^instrumentation/$', views.instrumentation_report, name='pnt_instrumentation_report'),
+]
@@ -1 +1,16 @@
-# Create your views here.
+# -*- coding: utf-8 -*-
+from django.contrib.admin.views.decorators import staff_member_required
+from django.shortcuts import redirect, render
+
+import instrumentation
+
+
+@staff_member_required
+def instrumentation_report(request):
+    """Sumy pomiarów instrumentation (metody i widoki) oraz ostatnie żądania; POST zeruje liczniki."""
+    if request.method == 'POST':
+        instrumentation.reset()
+        return redirect(request.path)
+    context = instrumentation.report()
+    context.update(enabled=instrumentation.enabled(), title=u"Pomiary metod i widoków PNT")
+    return render(request, 'pnt/instrumentation_report.html', context)